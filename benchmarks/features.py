@@ -0,0 +1,118 @@
+"""Benchmark-only features that exercise join models over event entities."""
+
+from spark_preprocessor.features.base import (
+    ColumnSpec,
+    FeatureAssets,
+    FeatureMetadata,
+    FeatureRequirement,
+    JoinModelSpec,
+    SqlmeshModelSpec,
+)
+from spark_preprocessor.features.registry import register_feature
+
+
+class _PersonAggregate:
+    """Aggregate an event entity to one row per person and LEFT JOIN it."""
+
+    def __init__(
+        self,
+        key: str,
+        entity: str,
+        alias: str,
+        columns: dict[str, tuple[str, str]],
+        required: frozenset[str],
+    ) -> None:
+        self._entity = entity
+        self._alias = alias
+        self._columns = columns
+        self.meta = FeatureMetadata(
+            key=key,
+            description=f"Per-person aggregates over {entity}.",
+            params=(),
+            requirements=(FeatureRequirement(entity=entity, columns=required),),
+            provides=tuple(
+                ColumnSpec(name=name, dtype=dtype)
+                for name, (_, dtype) in columns.items()
+            ),
+            compatible_grains=("PERSON",),
+        )
+
+    def build(self, ctx, params: dict[str, object]) -> FeatureAssets:
+        model_name = f"features.{self._alias}__person"
+        aggregates = ",\n  ".join(
+            f"{expression} AS {name}" for name, (expression, _) in self._columns.items()
+        )
+        sql = (
+            f"SELECT\n  person_id,\n  {aggregates}\n"
+            f"FROM semantic.{self._entity}\nGROUP BY person_id"
+        )
+        columns = {"person_id": "STRING"} | {
+            name: "BIGINT" if dtype == "int" else "STRING"
+            for name, (_, dtype) in self._columns.items()
+        }
+        return FeatureAssets(
+            models=[
+                SqlmeshModelSpec(
+                    name=model_name, sql=sql, kind="TABLE", tags=[], columns=columns
+                )
+            ],
+            join_models=[
+                JoinModelSpec(
+                    model_name=model_name,
+                    alias=self._alias,
+                    on=f"{ctx.spine_alias}.person_id = {self._alias}.person_id",
+                    join_type="LEFT",
+                )
+            ],
+            select_expressions=[
+                f"{self._alias}.{name} AS {name}" for name in self._columns
+            ],
+            tests=[],
+        )
+
+
+register_feature(
+    _PersonAggregate(
+        "bench.encounters",
+        "encounters",
+        "enc",
+        {
+            "encounter_count": ("COUNT(*)", "int"),
+            "inpatient_count": (
+                "SUM(CASE WHEN encounter_type = 'inpatient' THEN 1 ELSE 0 END)",
+                "int",
+            ),
+        },
+        frozenset({"person_id", "encounter_type"}),
+    )
+)
+register_feature(
+    _PersonAggregate(
+        "bench.diagnoses",
+        "diagnoses",
+        "dx",
+        {"distinct_icd10_count": ("COUNT(DISTINCT icd10_code)", "int")},
+        frozenset({"person_id", "icd10_code"}),
+    )
+)
+register_feature(
+    _PersonAggregate(
+        "bench.medications",
+        "medications",
+        "rx",
+        {
+            "distinct_ndc_count": ("COUNT(DISTINCT drug_ndc)", "int"),
+            "total_days_supply": ("SUM(days_supply)", "int"),
+        },
+        frozenset({"person_id", "drug_ndc", "days_supply"}),
+    )
+)
+register_feature(
+    _PersonAggregate(
+        "bench.insurance",
+        "insurance",
+        "ins",
+        {"latest_payer": ("MAX_BY(payer, coverage_start)", "str")},
+        frozenset({"person_id", "payer", "coverage_start"}),
+    )
+)
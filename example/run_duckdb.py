@@ -2,17 +2,11 @@
 
 from pathlib import Path
 
-import duckdb
-from sqlmesh.core.config import Config, ModelDefaultsConfig
-from sqlmesh.core.config.connection import DuckDBConnectionConfig
-from sqlmesh.core.config.gateway import GatewayConfig
-from sqlmesh.core.context import Context
-
-from spark_preprocessor.compiler import compile_pipeline
+from spark_preprocessor.runtime.local import execute_local, parse_source
 
 
 def main() -> None:
-    """Compile the example pipeline and apply it using DuckDB."""
+    """Compile the example pipeline, apply it using DuckDB, and stream the output."""
 
     base_dir = Path(__file__).resolve().parent
     data_path = base_dir / "data" / "patients.csv"
@@ -21,38 +15,18 @@ def main() -> None:
             "Missing data. Run `uv run python example/generate_data.py` first."
         )
 
-    pipeline_path = base_dir / "pipeline.yaml"
-    out_dir = base_dir / "out"
-    compile_pipeline(pipeline_path, out_dir)
-
-    db_path = base_dir / "duckdb.db"
-    conn = duckdb.connect(str(db_path))
-    conn.execute(
-        "CREATE OR REPLACE TABLE patients_raw AS SELECT * FROM read_csv_auto(?)",
-        [str(data_path)],
+    reader = execute_local(
+        base_dir / "pipeline.yaml",
+        base_dir / "out",
+        [parse_source(f"patients_raw={data_path}")],
+        database=base_dir / "duckdb.db",
     )
-    conn.close()
-
-    config = Config(
-        gateways={
-            "": GatewayConfig(
-                connection=DuckDBConnectionConfig(database=str(db_path)),
-            )
-        },
-        model_defaults=ModelDefaultsConfig(dialect="spark"),
-    )
-    context = Context(paths=out_dir, config=config)
-    plan = context.plan(no_prompts=True)
-    context.apply(plan)
-
-    conn = duckdb.connect(str(db_path))
-    rows = conn.execute(
-        "SELECT person_id, age, age_bucket FROM semantic.enriched_example ORDER BY person_id LIMIT 5"
-    ).fetchall()
-    conn.close()
+    table = reader.read_all()
 
+    print(f"Output rows: {table.num_rows}")
     print("Sample rows:")
-    for row in rows:
+    sample = table.select(["person_id", "age", "age_bucket"]).sort_by("person_id")
+    for row in sample.slice(0, 5).to_pylist():
         print(row)
 
 
@@ -1,5 +1,12 @@
 """spark-preprocessor package."""
 
-from spark_preprocessor.cli import main
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the CLI; imported on call so importing the package stays cheap."""
+
+    from spark_preprocessor.cli import main as cli_main
+
+    cli_main(argv)
+
 
 __all__ = ["main"]
@@ -0,0 +1,177 @@
+"""Single-file packaged projects for deployment.
+
+A project archive is a zip of the compiled project tree plus
+`manifest/archive.json` (format version and pipeline identity). Every file is
+verified against `manifest/files.json` when the archive is read.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+
+from spark_preprocessor.errors import ConfigurationError, ValidationError
+
+if TYPE_CHECKING:
+    from spark_preprocessor.compiler import CompiledProject
+
+ARCHIVE_FORMAT_VERSION = 1
+ARCHIVE_MANIFEST_PATH = "manifest/archive.json"
+FILES_MANIFEST_PATH = "manifest/files.json"
+
+# A fixed timestamp keeps archives of identical projects byte-identical.
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def files_manifest(files: dict[str, str]) -> dict[str, dict[str, object]]:
+    """SHA-256 and byte size of every project file, keyed by relative path."""
+
+    manifest: dict[str, dict[str, object]] = {}
+    for relative, text in files.items():
+        content = text.encode("utf-8")
+        manifest[relative] = {
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "size": len(content),
+        }
+    return manifest
+
+
+def write_archive(project: "CompiledProject", path: str | Path) -> Path:
+    """Write a compiled project as a single zip archive.
+
+    The archive is written to a temporary file beside `path` and renamed into
+    place, so readers see either the previous archive or the complete new one.
+
+    Args:
+        project: Compiled project to package.
+        path: Archive file to create or replace.
+
+    Returns:
+        The archive path.
+    """
+
+    path = Path(path)
+    report = project.report
+    files = {
+        **project.files,
+        FILES_MANIFEST_PATH: json.dumps(
+            {"files": files_manifest(project.files)}, indent=2, sort_keys=True
+        ),
+        ARCHIVE_MANIFEST_PATH: json.dumps(
+            {
+                "format_version": ARCHIVE_FORMAT_VERSION,
+                "pipeline_name": report.pipeline_name,
+                "pipeline_version": report.pipeline_version,
+                "compiled_at": report.compiled_at,
+            },
+            indent=2,
+            sort_keys=True,
+        ),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, staging = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with (
+            os.fdopen(fd, "wb") as handle,
+            zipfile.ZipFile(handle, "w", zipfile.ZIP_DEFLATED) as archive,
+        ):
+            for relative in sorted(files):
+                info = zipfile.ZipInfo(relative, date_time=_ZIP_DATE_TIME)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, files[relative])
+        os.replace(staging, path)
+    except BaseException:
+        Path(staging).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def read_archive(path: str | Path) -> dict[str, bytes]:
+    """Read and verify a project archive in memory.
+
+    Args:
+        path: Archive written by `write_archive`.
+
+    Returns:
+        File contents keyed by relative path, including the manifests.
+
+    Raises:
+        ConfigurationError: If the file is not a supported project archive.
+        ValidationError: If a file is missing, unexpected, or does not match
+            its recorded hash.
+    """
+
+    path = Path(path)
+    try:
+        with zipfile.ZipFile(path) as archive:
+            contents = {
+                info.filename: archive.read(info)
+                for info in archive.infolist()
+                if not info.is_dir()
+            }
+    except (OSError, zipfile.BadZipFile) as exc:
+        raise ConfigurationError(f"Cannot read project archive {path}: {exc}") from exc
+
+    try:
+        metadata = json.loads(contents[ARCHIVE_MANIFEST_PATH])
+        expected = json.loads(contents[FILES_MANIFEST_PATH])["files"]
+    except (KeyError, ValueError, TypeError) as exc:
+        raise ConfigurationError(f"Not a project archive: {path}") from exc
+    version = metadata.get("format_version")
+    if version != ARCHIVE_FORMAT_VERSION:
+        raise ConfigurationError(
+            f"Unsupported project archive format {version!r} in {path} "
+            f"(expected {ARCHIVE_FORMAT_VERSION})"
+        )
+
+    unexpected = sorted(
+        set(contents) - set(expected) - {FILES_MANIFEST_PATH, ARCHIVE_MANIFEST_PATH}
+    )
+    if unexpected:
+        raise ValidationError(
+            f"Project archive {path} has unlisted files: {unexpected}"
+        )
+    for relative, entry in expected.items():
+        _check_relative_path(path, relative)
+        content = contents.get(relative)
+        if content is None:
+            raise ValidationError(f"Project archive {path} is missing {relative}")
+        if hashlib.sha256(content).hexdigest() != entry["sha256"]:
+            raise ValidationError(f"Project archive {path} has a corrupt {relative}")
+    return contents
+
+
+@contextmanager
+def open_project(path: str | Path) -> Iterator[Path]:
+    """Yield a project directory for a compiled project directory or archive.
+
+    Directories are used as they are. Archives are verified and extracted once
+    to a temporary directory that is removed on exit.
+    """
+
+    path = Path(path)
+    if not path.is_file():
+        yield path
+        return
+    contents = read_archive(path)
+    with tempfile.TemporaryDirectory(prefix="spark-preprocessor-project-") as tmp:
+        root = Path(tmp)
+        for relative, content in contents.items():
+            target = root / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+        yield root
+
+
+def _check_relative_path(archive: Path, relative: str) -> None:
+    parts = PurePosixPath(relative).parts
+    if not parts or relative.startswith("/") or ".." in parts:
+        raise ValidationError(
+            f"Project archive {archive} has an unsafe path: {relative}"
+        )
@@ -0,0 +1,416 @@
+"""End-to-end execution benchmarks of compiled pipelines on DuckDB."""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Self
+
+import structlog
+import yaml
+
+from spark_preprocessor.errors import ConfigurationError, ValidationError
+from spark_preprocessor.runtime.checkpoint import ModelEntry
+from spark_preprocessor.runtime.local import LocalSource, run_local
+from spark_preprocessor.schema import load_pipeline_document
+from spark_preprocessor.synthetic import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_PROFILES,
+    FORMAT_VERSION,
+    generate_dataset,
+)
+
+# Fractional slack over the baseline per metric; `min_seconds` is the absolute
+# slowdown below which timing noise on fast models is ignored.
+DEFAULT_TOLERANCE = {"seconds": 0.5, "peak_rss_mb": 0.5, "min_seconds": 1.0}
+
+
+@dataclass(frozen=True)
+class BenchmarkSuite:
+    """A `suite.yaml`: reference pipelines, data scales, and baselines."""
+
+    root: Path
+    pipelines: list[Path]
+    scales: list[int]
+    seed: int = 42
+    baselines: Path | None = None
+    features: Path | None = None
+    tolerance: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TOLERANCE))
+
+
+@dataclass(frozen=True)
+class ModelTiming:
+    model: str
+    seconds: float
+    rows: int | None
+    rows_per_second: float | None
+    peak_rss_mb: float
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    pipeline: str
+    persons: int
+    seconds: float
+    models: list[ModelTiming]
+
+
+@dataclass(frozen=True)
+class Regression:
+    pipeline: str
+    persons: int
+    model: str
+    metric: str
+    baseline: float | None
+    observed: float | None
+
+    def render(self) -> str:
+        if self.metric == "baseline":
+            return f"{self.pipeline}@{self.persons} {self.model}: no baseline"
+        return (
+            f"{self.pipeline}@{self.persons} {self.model} {self.metric}: "
+            f"baseline {self.baseline}, observed {self.observed}"
+        )
+
+
+def load_suite(path: str | Path) -> BenchmarkSuite:
+    """Load a benchmark suite; relative paths resolve against its directory."""
+
+    path = Path(path)
+    try:
+        payload = yaml.safe_load(path.read_text()) or {}
+        root = path.parent
+        return BenchmarkSuite(
+            root=root,
+            pipelines=[root / pipeline for pipeline in payload["pipelines"]],
+            scales=[int(scale) for scale in payload["scales"]],
+            seed=int(payload.get("seed", 42)),
+            baselines=root / payload["baselines"] if payload.get("baselines") else None,
+            features=root / payload["features"] if payload.get("features") else None,
+            tolerance=DEFAULT_TOLERANCE | dict(payload.get("tolerance") or {}),
+        )
+    except (OSError, yaml.YAMLError, KeyError, TypeError, ValueError) as exc:
+        raise ConfigurationError(f"Invalid benchmark suite: {path}") from exc
+
+
+def run_benchmark(
+    pipeline_path: Path,
+    data_dir: Path,
+    work_dir: Path,
+    *,
+    persons: int,
+    memory_limit: str | None = None,
+    threads: int | None = None,
+) -> BenchmarkResult:
+    """Compile and run one pipeline against generated data, timing each model.
+
+    Mapped tables named `<schema>.<entity>` are bound to `data_dir/<entity>`.
+    """
+
+    document = load_pipeline_document(pipeline_path)
+    tables = {
+        mapping.table
+        for mappings in (document.mapping.entities, document.mapping.references)
+        for mapping in mappings.values()
+    }
+    sources = [
+        LocalSource(table=table, path=data_dir / table.split(".")[-1], format="parquet")
+        for table in sorted(tables)
+    ]
+    missing = [str(source.path) for source in sources if not source.path.exists()]
+    if missing:
+        raise ConfigurationError(f"Benchmark data not found: {missing}")
+
+    run_dir = work_dir / document.pipeline.name / str(persons)
+    database = run_dir / "bench.duckdb"
+    database.unlink(missing_ok=True)
+    timings: list[ModelTiming] = []
+    sampler = _PeakRssSampler()
+
+    def record(model: ModelEntry, seconds: float, rows: int | None) -> None:
+        timings.append(
+            ModelTiming(
+                model=model.name,
+                seconds=round(seconds, 3),
+                rows=rows,
+                rows_per_second=round(rows / seconds, 1) if rows and seconds else None,
+                peak_rss_mb=round(sampler.take_peak() / 2**20, 1),
+            )
+        )
+
+    started = time.perf_counter()
+    with sampler:
+        run_local(
+            pipeline_path,
+            run_dir / "project",
+            sources,
+            database=database,
+            memory_limit=memory_limit,
+            threads=threads,
+            on_model_applied=record,
+        )
+    return BenchmarkResult(
+        pipeline=document.pipeline.name,
+        persons=persons,
+        seconds=round(time.perf_counter() - started, 3),
+        models=timings,
+    )
+
+
+def compare_to_baselines(
+    results: list[BenchmarkResult],
+    baselines: dict,
+    tolerance: dict[str, float],
+    required_scales: list[int] | None = None,
+) -> list[Regression]:
+    """Find models that got slower, heavier, or changed row counts.
+
+    Row counts must match exactly (synthetic data is seeded, so a change means
+    the SQL changed, e.g. a join fan-out). Time and memory may exceed the
+    baseline by the given fractional tolerance, and time must also grow by at
+    least `min_seconds`. At `required_scales` (a suite's configured scales) a
+    model without a baseline is a regression of metric `baseline`; at other
+    scales it is not compared.
+    """
+
+    required = set(required_scales or [])
+    regressions: list[Regression] = []
+    for result in results:
+        expected = baselines.get(result.pipeline, {}).get(str(result.persons), {})
+        for timing in result.models:
+            baseline = expected.get(timing.model)
+            if baseline is None:
+                if result.persons in required:
+                    regressions.append(
+                        Regression(
+                            result.pipeline,
+                            result.persons,
+                            timing.model,
+                            "baseline",
+                            None,
+                            None,
+                        )
+                    )
+                continue
+
+            failed: list[tuple[str, float]] = []
+            if baseline.get("rows") != timing.rows:
+                failed.append(("rows", timing.rows))
+            for metric in ("seconds", "peak_rss_mb"):
+                limit = baseline.get(metric)
+                observed = getattr(timing, metric)
+                if limit is None or observed <= limit * (1 + tolerance[metric]):
+                    continue
+                if metric == "seconds" and observed - limit < tolerance["min_seconds"]:
+                    continue
+                failed.append((metric, observed))
+            regressions.extend(
+                Regression(
+                    result.pipeline,
+                    result.persons,
+                    timing.model,
+                    metric,
+                    baseline.get(metric),
+                    observed,
+                )
+                for metric, observed in failed
+            )
+    return regressions
+
+
+def record_baselines(results: list[BenchmarkResult], baselines: dict) -> dict:
+    """Return `baselines` updated with the given results."""
+
+    updated = {pipeline: dict(scales) for pipeline, scales in baselines.items()}
+    for result in results:
+        updated.setdefault(result.pipeline, {})[str(result.persons)] = {
+            timing.model: {
+                "seconds": timing.seconds,
+                "rows": timing.rows,
+                "peak_rss_mb": timing.peak_rss_mb,
+            }
+            for timing in result.models
+        }
+    return updated
+
+
+def run_suite(
+    suite_path: str | Path,
+    work_dir: str | Path,
+    *,
+    scales: list[int] | None = None,
+    update_baselines: bool = False,
+    memory_limit: str | None = None,
+    threads: int | None = None,
+) -> tuple[list[BenchmarkResult], list[Regression]]:
+    """Run every pipeline of a suite at each scale and compare to baselines.
+
+    Synthetic data is generated once per scale under `work_dir/data/<persons>`
+    and reused while its seed, size, chunk size, cardinality profiles and
+    generator format version match.
+
+    Returns:
+        The results and any regressions; every model run at one of the suite's
+        configured scales needs a baseline. With `update_baselines`, the
+        baselines file is rewritten from the results and no regressions are
+        reported.
+    """
+
+    suite = load_suite(suite_path)
+    work_dir = Path(work_dir)
+    if suite.features is not None:
+        _load_features(suite.features)
+
+    results: list[BenchmarkResult] = []
+    log = structlog.get_logger()
+    for persons in scales or suite.scales:
+        data_dir = work_dir / "data" / str(persons)
+        _ensure_data(data_dir, persons, suite.seed)
+        for pipeline_path in suite.pipelines:
+            result = run_benchmark(
+                pipeline_path,
+                data_dir,
+                work_dir / "runs",
+                persons=persons,
+                memory_limit=memory_limit,
+                threads=threads,
+            )
+            log.info(
+                "benchmark_complete",
+                pipeline=result.pipeline,
+                persons=persons,
+                seconds=result.seconds,
+            )
+            results.append(result)
+
+    (work_dir / "results.json").write_text(
+        json.dumps([asdict(result) for result in results], indent=2)
+    )
+    baselines = _load_baselines(suite.baselines)
+    if update_baselines:
+        if suite.baselines is None:
+            raise ConfigurationError("Benchmark suite has no baselines file")
+        suite.baselines.write_text(
+            json.dumps(record_baselines(results, baselines), indent=2, sort_keys=True)
+            + "\n"
+        )
+        return results, []
+    return results, compare_to_baselines(
+        results, baselines, suite.tolerance, required_scales=suite.scales
+    )
+
+
+def check_regressions(regressions: list[Regression]) -> None:
+    """Raise ValidationError if any benchmark regressed."""
+
+    if not regressions:
+        return
+    details = "; ".join(regression.render() for regression in regressions)
+    raise ValidationError(f"Benchmark regressions ({len(regressions)}): {details}")
+
+
+def _ensure_data(data_dir: Path, persons: int, seed: int) -> None:
+    """Generate the scale's data unless a matching dataset is already there."""
+
+    expected = {
+        "persons": persons,
+        "seed": seed,
+        "chunk_size": DEFAULT_CHUNK_SIZE,
+        "format_version": FORMAT_VERSION,
+        "profiles": {
+            entity: asdict(profile) for entity, profile in DEFAULT_PROFILES.items()
+        },
+    }
+    summary_path = data_dir / "synthetic.json"
+    try:
+        summary = json.loads(summary_path.read_text())
+    except (OSError, ValueError):
+        summary = {}
+    if isinstance(summary, dict) and all(
+        summary.get(key) == value for key, value in expected.items()
+    ):
+        return
+    generate_dataset(
+        data_dir, persons=persons, seed=seed, chunk_size=DEFAULT_CHUNK_SIZE
+    )
+
+
+def _load_baselines(path: Path | None) -> dict:
+    if path is None or not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except ValueError as exc:
+        raise ConfigurationError(f"Invalid baselines file: {path}") from exc
+
+
+def _load_features(path: Path) -> None:
+    """Import a suite's feature module once so its features are registered."""
+
+    module_name = f"_benchmark_features_{abs(hash(path.resolve()))}"
+    if module_name in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ConfigurationError(f"Cannot load benchmark features: {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+
+
+class _PeakRssSampler:
+    """Samples process RSS on a background thread and tracks the peak.
+
+    DuckDB runs in-process, so RSS covers the engine's memory. Where
+    `/proc/self/statm` is unavailable, the process high-water mark from
+    `getrusage` is used instead and cannot be reset between models.
+    """
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self._interval = interval
+        self._peak = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> Self:
+        self._peak = _current_rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def take_peak(self) -> int:
+        """Return the peak since the previous call and start a new window."""
+
+        current = _current_rss()
+        with self._lock:
+            peak = max(self._peak, current)
+            self._peak = current
+        return peak
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            rss = _current_rss()
+            with self._lock:
+                self._peak = max(self._peak, rss)
+
+
+def _current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+        return peak if sys.platform == "darwin" else peak * 1024
@@ -4,20 +4,34 @@ import argparse
 import logging
 from pathlib import Path
 
-import structlog
-from sqlglot import parse_one
+from spark_preprocessor.errors import ConfigurationError, SparkPreprocessorError
 
-from spark_preprocessor.compiler import compile_pipeline
-from spark_preprocessor.errors import SparkPreprocessorError
-from spark_preprocessor.scaffold import scaffold_pipeline
+# Subcommands import their dependencies when they run, and structlog is only
+# imported (and configured) on the first log call, so `--help` and `scaffold`
+# pay for neither structlog nor the compiler, sqlglot or SQLMesh.
+
+_logging_configured = False
 
 
 def _configure_logging() -> None:
+    import structlog
+
     structlog.configure(
         wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
     )
 
 
+def _logger():
+    global _logging_configured
+
+    import structlog
+
+    if not _logging_configured:
+        _configure_logging()
+        _logging_configured = True
+    return structlog.get_logger()
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="spark-preprocessor")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -25,6 +39,114 @@ def _build_parser() -> argparse.ArgumentParser:
     compile_parser = subparsers.add_parser("compile", help="Compile a pipeline")
     compile_parser.add_argument("--pipeline", required=True, type=Path)
     compile_parser.add_argument("--out", required=True, type=Path)
+    compile_parser.add_argument("--schema-snapshot", type=Path, default=None)
+    compile_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Recompile when the pipeline, snapshot or feature modules change",
+    )
+    compile_parser.add_argument(
+        "--features-module",
+        action="append",
+        default=None,
+        type=Path,
+        metavar="PATH",
+        help="Local feature module to load (and watch) before compiling",
+    )
+    compile_parser.add_argument(
+        "--document-cache",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Cache validated pipeline documents by content hash in DIR",
+    )
+    compile_parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Write the project as a single zip archive at --out",
+    )
+    compile_parser.add_argument(
+        "--capture-plans",
+        action="store_true",
+        help="EXPLAIN every model on DuckDB and write manifest/plans.json",
+    )
+    compile_parser.add_argument(
+        "--plan-source",
+        action="append",
+        default=None,
+        metavar="TABLE=PATH",
+        help="Sample data for a mapped table during plan capture (repeatable)",
+    )
+    compile_parser.add_argument(
+        "--lineage",
+        action="store_true",
+        help="Trace output columns to physical columns in manifest/lineage.json",
+    )
+
+    project_parser = subparsers.add_parser(
+        "compile-project",
+        help="Compile pipelines that share a mapping into one SQLMesh project",
+    )
+    project_parser.add_argument(
+        "--pipeline",
+        required=True,
+        action="append",
+        type=Path,
+        help="Pipeline to include (repeatable)",
+    )
+    project_parser.add_argument("--out", required=True, type=Path)
+    project_parser.add_argument("--schema-snapshot", type=Path, default=None)
+    project_parser.add_argument(
+        "--features-module",
+        action="append",
+        default=None,
+        type=Path,
+        metavar="PATH",
+        help="Local feature module to load before compiling",
+    )
+    project_parser.add_argument(
+        "--lineage",
+        action="store_true",
+        help="Write each pipeline's column lineage under manifest/pipelines/",
+    )
+
+    plan_diff_parser = subparsers.add_parser(
+        "plan-diff", help="Compare the captured plans of two compiled projects"
+    )
+    plan_diff_parser.add_argument("--before", required=True, type=Path)
+    plan_diff_parser.add_argument("--after", required=True, type=Path)
+    plan_diff_parser.add_argument(
+        "--cardinality-factor",
+        type=float,
+        default=None,
+        help="Report estimated cardinalities that grow by more than this factor",
+    )
+
+    lineage_parser = subparsers.add_parser(
+        "lineage", help="List output columns fed by a physical column"
+    )
+    lineage_parser.add_argument("--project", required=True, type=Path)
+    lineage_parser.add_argument(
+        "--column", required=True, metavar="TABLE.COLUMN", help="Physical column"
+    )
+
+    features_parser = subparsers.add_parser(
+        "features", help="Inspect the feature registry"
+    )
+    features_subparsers = features_parser.add_subparsers(
+        dest="features_command", required=True
+    )
+    search_parser = features_subparsers.add_parser(
+        "search", help="Find features by output, requirement, or grain"
+    )
+    search_parser.add_argument("--provides", default=None, metavar="COLUMN")
+    search_parser.add_argument("--requires", default=None, metavar="ENTITY[.COLUMN]")
+    search_parser.add_argument("--grain", default=None)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Serve compile requests on a Unix socket"
+    )
+    serve_parser.add_argument("--socket", required=True, type=Path)
 
     render_parser = subparsers.add_parser(
         "render-sql", help="Render SQL from a pipeline"
@@ -42,12 +164,133 @@ def _build_parser() -> argparse.ArgumentParser:
     scaffold_parser.add_argument("--mapping", required=True, type=Path)
     scaffold_parser.add_argument("--out", required=True, type=Path)
 
+    preflight_parser = subparsers.add_parser(
+        "preflight",
+        help="Check mapped physical tables/columns against a DuckDB catalog",
+    )
+    preflight_parser.add_argument("--pipeline", required=True, type=Path)
+    preflight_parser.add_argument("--duckdb", required=True, type=Path)
+    preflight_parser.add_argument(
+        "--snapshot-out",
+        type=Path,
+        default=None,
+        help="Write the observed physical schema for `compile --schema-snapshot`",
+    )
+
+    run_parser = subparsers.add_parser(
+        "run", help="Compile a pipeline and run it on a local engine"
+    )
+    run_parser.add_argument("--pipeline", required=True, type=Path)
+    run_parser.add_argument("--out", required=True, type=Path)
+    run_parser.add_argument("--engine", choices=["duckdb"], default="duckdb")
+    run_parser.add_argument(
+        "--source",
+        action="append",
+        required=True,
+        metavar="TABLE=PATH",
+        help="Bind a mapped physical table to a CSV/Parquet/Arrow file (repeatable)",
+    )
+    run_parser.add_argument("--database", type=Path, default=Path("local.duckdb"))
+    run_parser.add_argument("--memory-limit", default=None, help="e.g. 8GB")
+    run_parser.add_argument("--threads", type=int, default=None)
+    run_parser.add_argument(
+        "--temp-directory",
+        type=Path,
+        default=None,
+        help="Where DuckDB spills data that exceeds the memory limit",
+    )
+    run_parser.add_argument("--environment", default=None)
+
+    generate_parser = subparsers.add_parser(
+        "generate",
+        help="Generate seeded synthetic Parquet data for the canonical entities",
+    )
+    generate_parser.add_argument("--out", required=True, type=Path)
+    generate_parser.add_argument("--persons", required=True, type=int)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--chunk-size", type=int, default=None)
+    generate_parser.add_argument(
+        "--entity",
+        action="append",
+        default=None,
+        help="Entity to generate (repeatable; default: all six)",
+    )
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="Benchmark reference pipelines on DuckDB against baselines"
+    )
+    bench_parser.add_argument("--suite", required=True, type=Path)
+    bench_parser.add_argument("--work-dir", type=Path, default=Path(".bench"))
+    bench_parser.add_argument(
+        "--scale",
+        action="append",
+        type=int,
+        default=None,
+        help="Persons to generate (repeatable; default: the suite's scales)",
+    )
+    bench_parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help="Record these results as the new baselines instead of comparing",
+    )
+    bench_parser.add_argument("--memory-limit", default=None)
+    bench_parser.add_argument("--threads", type=int, default=None)
+
     return parser
 
 
 def _run_compile(args: argparse.Namespace) -> None:
-    report = compile_pipeline(args.pipeline, args.out)
-    structlog.get_logger().info(
+    if args.watch:
+        _run_watch(args)
+        return
+    from spark_preprocessor.compiler import compile_pipeline
+
+    registry = None
+    if args.features_module:
+        from spark_preprocessor.watch import load_feature_modules
+
+        registry = load_feature_modules(args.features_module)
+    plan_sources = None
+    if args.plan_source:
+        from spark_preprocessor.runtime.local import parse_source
+
+        plan_sources = [parse_source(spec) for spec in args.plan_source]
+    document = None
+    if args.document_cache or args.archive:
+        from spark_preprocessor.schema import load_pipeline_document
+
+        document = load_pipeline_document(args.pipeline, cache_dir=args.document_cache)
+    if args.archive:
+        from spark_preprocessor.archive import write_archive
+        from spark_preprocessor.compiler import compile_document
+        from spark_preprocessor.schema import load_schema_snapshot
+
+        project = compile_document(
+            document,
+            schema_snapshot=(
+                load_schema_snapshot(args.schema_snapshot)
+                if args.schema_snapshot
+                else None
+            ),
+            capture_plans=args.capture_plans or bool(plan_sources),
+            plan_sources=plan_sources,
+            registry=registry,
+            lineage=args.lineage,
+        )
+        write_archive(project, args.out)
+        report = project.report
+    else:
+        report = compile_pipeline(
+            args.pipeline,
+            args.out,
+            schema_snapshot=args.schema_snapshot,
+            capture_plans=args.capture_plans or bool(plan_sources),
+            plan_sources=plan_sources,
+            registry=registry,
+            document=document,
+            lineage=args.lineage,
+        )
+    _logger().info(
         "compile_complete",
         pipeline=report.pipeline_name,
         version=report.pipeline_version,
@@ -55,10 +298,109 @@ def _run_compile(args: argparse.Namespace) -> None:
     )
 
 
+def _run_compile_project(args: argparse.Namespace) -> None:
+    from spark_preprocessor.compiler import compile_project
+
+    registry = None
+    if args.features_module:
+        from spark_preprocessor.watch import load_feature_modules
+
+        registry = load_feature_modules(args.features_module)
+    report = compile_project(
+        args.pipeline,
+        args.out,
+        schema_snapshot=args.schema_snapshot,
+        registry=registry,
+        lineage=args.lineage,
+    )
+    _logger().info(
+        "compile_project_complete",
+        pipelines=[pipeline.pipeline_name for pipeline in report.pipelines],
+        shared_models=sorted(report.shared_models),
+    )
+
+
+def _run_watch(args: argparse.Namespace) -> None:
+    from spark_preprocessor.watch import watch_compile
+
+    if args.capture_plans or args.plan_source:
+        raise ConfigurationError("--watch does not support plan capture")
+    if args.archive:
+        raise ConfigurationError("--watch does not support --archive")
+    if args.lineage:
+        raise ConfigurationError("--watch does not support --lineage")
+    try:
+        watch_compile(
+            args.pipeline,
+            args.out,
+            schema_snapshot=args.schema_snapshot,
+            feature_modules=args.features_module,
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def _run_plan_diff(args: argparse.Namespace) -> None:
+    from spark_preprocessor.plans import (
+        DEFAULT_CARDINALITY_FACTOR,
+        check_plan_diff,
+        diff_plans,
+        load_plans,
+    )
+
+    changes = diff_plans(
+        load_plans(args.before),
+        load_plans(args.after),
+        cardinality_factor=args.cardinality_factor or DEFAULT_CARDINALITY_FACTOR,
+    )
+    log = _logger()
+    for change in changes:
+        log.warning("plan_changed", change=change.render())
+    check_plan_diff(changes)
+    _logger().info("plan_diff_complete", before=str(args.before), after=str(args.after))
+
+
+def _run_lineage(args: argparse.Namespace) -> None:
+    from spark_preprocessor.lineage import affected_outputs, load_lineage
+
+    lineage = load_lineage(args.project)
+    _logger().info(
+        "lineage_complete",
+        column=args.column,
+        output_table=lineage.get("output_table"),
+        outputs=affected_outputs(lineage, args.column),
+    )
+
+
+def _run_features_search(args: argparse.Namespace) -> None:
+    from spark_preprocessor.features import DEFAULT_REGISTRY
+
+    DEFAULT_REGISTRY.load_all()
+    snapshot = DEFAULT_REGISTRY.snapshot()
+    keys = snapshot.search(
+        provides=args.provides, requires=args.requires, grain=args.grain
+    )
+    _logger().info(
+        "features_found",
+        count=len(keys),
+        features={
+            key: [spec.name for spec in snapshot[key].meta.provides] for key in keys
+        },
+    )
+
+
+def _run_serve(args: argparse.Namespace) -> None:
+    from spark_preprocessor.server import serve
+
+    serve(args.socket)
+
+
 def _run_render(args: argparse.Namespace) -> None:
+    from spark_preprocessor.compiler import compile_pipeline
+
     report = compile_pipeline(args.pipeline, args.out)
     rendered_path = args.out / "rendered" / f"enriched__{report.pipeline_name}.sql"
-    structlog.get_logger().info(
+    _logger().info(
         "render_complete",
         pipeline=report.pipeline_name,
         sql_path=str(rendered_path),
@@ -66,41 +408,161 @@ def _run_render(args: argparse.Namespace) -> None:
 
 
 def _run_test(args: argparse.Namespace) -> None:
-    report = compile_pipeline(args.pipeline, args.project)
-    rendered_path = args.project / "rendered" / f"enriched__{report.pipeline_name}.sql"
-    sql = rendered_path.read_text()
-    parse_one(sql, dialect="spark")
-    structlog.get_logger().info(
+    from sqlglot import parse_one
+
+    from spark_preprocessor.compiler import compile_document, write_project
+    from spark_preprocessor.schema import load_pipeline_document
+
+    project = compile_document(load_pipeline_document(args.pipeline))
+    parse_one(project.rendered_sql, dialect="spark")
+    write_project(project, args.project)
+    _logger().info(
         "test_complete",
-        pipeline=report.pipeline_name,
-        sql_path=str(rendered_path),
+        pipeline=project.report.pipeline_name,
+        sql_path=str(
+            args.project / "rendered" / f"enriched__{project.report.pipeline_name}.sql"
+        ),
     )
 
 
 def _run_scaffold(args: argparse.Namespace) -> None:
+    from spark_preprocessor.scaffold import scaffold_pipeline
+
     pipeline_path = scaffold_pipeline(args.mapping, args.out)
-    structlog.get_logger().info(
+    _logger().info(
         "scaffold_complete",
         pipeline_path=str(pipeline_path),
     )
 
 
+def _run_preflight(args: argparse.Namespace) -> None:
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise ConfigurationError(
+            "The preflight command requires the 'duckdb' extra"
+        ) from exc
+    import yaml
+
+    from spark_preprocessor.preflight import check_preflight, run_preflight
+    from spark_preprocessor.schema import load_pipeline_document
+
+    if not args.duckdb.exists():
+        raise ConfigurationError(f"DuckDB database not found: {args.duckdb}")
+    document = load_pipeline_document(args.pipeline)
+    conn = duckdb.connect(str(args.duckdb), read_only=True)
+    try:
+        report = run_preflight(
+            document.mapping, lambda sql: conn.execute(sql).fetchall()
+        )
+    finally:
+        conn.close()
+    if args.snapshot_out:
+        args.snapshot_out.parent.mkdir(parents=True, exist_ok=True)
+        args.snapshot_out.write_text(yaml.safe_dump(report.snapshot, sort_keys=True))
+    check_preflight(report)
+    _logger().info(
+        "preflight_complete",
+        pipeline=document.pipeline.name,
+        tables=report.tables_checked,
+        columns=report.columns_checked,
+    )
+
+
+def _run_local(args: argparse.Namespace) -> None:
+    from spark_preprocessor.runtime.local import parse_source, run_local
+
+    result = run_local(
+        args.pipeline,
+        args.out,
+        [parse_source(spec) for spec in args.source],
+        database=args.database,
+        memory_limit=args.memory_limit,
+        threads=args.threads,
+        temp_directory=args.temp_directory,
+        environment=args.environment,
+    )
+    _logger().info(
+        "run_complete",
+        pipeline=result.pipeline_name,
+        engine=args.engine,
+        database=str(result.database),
+        output_table=result.output_table,
+        applied=len(result.applied_models),
+    )
+
+
+def _run_generate(args: argparse.Namespace) -> None:
+    from spark_preprocessor.synthetic import DEFAULT_CHUNK_SIZE, generate_dataset
+
+    summary = generate_dataset(
+        args.out,
+        persons=args.persons,
+        seed=args.seed,
+        chunk_size=args.chunk_size or DEFAULT_CHUNK_SIZE,
+        entities=args.entity,
+    )
+    _logger().info(
+        "generate_complete",
+        out=str(args.out),
+        seed=summary.seed,
+        rows=summary.row_counts,
+    )
+
+
+def _run_bench(args: argparse.Namespace) -> None:
+    from spark_preprocessor.benchmark import check_regressions, run_suite
+
+    results, regressions = run_suite(
+        args.suite,
+        args.work_dir,
+        scales=args.scale,
+        update_baselines=args.update_baselines,
+        memory_limit=args.memory_limit,
+        threads=args.threads,
+    )
+    check_regressions(regressions)
+    _logger().info(
+        "bench_complete",
+        runs=len(results),
+        results=str(args.work_dir / "results.json"),
+        baselines_updated=args.update_baselines,
+    )
+
+
 def main(argv: list[str] | None = None) -> None:
-    _configure_logging()
     parser = _build_parser()
     args = parser.parse_args(argv)
 
     try:
         if args.command == "compile":
             _run_compile(args)
+        elif args.command == "compile-project":
+            _run_compile_project(args)
+        elif args.command == "plan-diff":
+            _run_plan_diff(args)
+        elif args.command == "lineage":
+            _run_lineage(args)
+        elif args.command == "features":
+            _run_features_search(args)
+        elif args.command == "serve":
+            _run_serve(args)
         elif args.command == "render-sql":
             _run_render(args)
         elif args.command == "test":
             _run_test(args)
         elif args.command == "scaffold":
             _run_scaffold(args)
+        elif args.command == "preflight":
+            _run_preflight(args)
+        elif args.command == "run":
+            _run_local(args)
+        elif args.command == "generate":
+            _run_generate(args)
+        elif args.command == "bench":
+            _run_bench(args)
         else:
             raise ValueError(f"Unknown command: {args.command}")
     except SparkPreprocessorError as exc:
-        structlog.get_logger().error("command_failed", error=str(exc))
+        _logger().error("command_failed", error=str(exc))
         raise SystemExit(1) from exc
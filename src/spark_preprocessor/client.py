@@ -0,0 +1,61 @@
+"""Thin client for `spark-preprocessor serve`.
+
+Uses the standard library only, so a request costs little more than
+interpreter startup; the server does the compiling.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+DEFAULT_TIMEOUT = 300.0
+
+
+def send_request(
+    socket_path: str | Path, request: dict, timeout: float = DEFAULT_TIMEOUT
+) -> dict:
+    """Send one request to a compile server and return its response."""
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(str(socket_path))
+        conn.sendall(json.dumps(request).encode() + b"\n")
+        with conn.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError(f"No response from {socket_path}")
+    return json.loads(line)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="spark-preprocessor-client")
+    parser.add_argument("--socket", required=True, type=Path)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument(
+        "command", choices=("compile", "validate", "render", "ping", "shutdown")
+    )
+    parser.add_argument("--pipeline", type=Path, default=None)
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--schema-snapshot", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    # Paths are resolved here: the server has its own working directory.
+    request: dict[str, object] = {"command": args.command}
+    for key in ("pipeline", "out", "schema_snapshot"):
+        value = getattr(args, key)
+        if value is not None:
+            request[key] = os.path.abspath(value)
+    try:
+        response = send_request(args.socket, request, args.timeout)
+    except (OSError, ValueError) as exc:
+        print(json.dumps({"ok": False, "error": str(exc)}))
+        raise SystemExit(2) from exc
+    if args.command == "render" and response.get("ok"):
+        sys.stdout.write(response["result"]["sql"])
+    else:
+        print(json.dumps(response))
+    if not response.get("ok"):
+        raise SystemExit(1)
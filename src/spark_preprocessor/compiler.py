@@ -1,17 +1,33 @@
 """Pipeline compiler for spark-preprocessor."""
 
 from collections import Counter
-from dataclasses import dataclass
+from collections.abc import Collection, Iterable
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timezone
+import hashlib
+import os
 from pathlib import Path
 import re
-import shutil
-from typing import Iterable
+import tempfile
+from typing import TYPE_CHECKING
 
 import json
 
-from spark_preprocessor import features as feature_registry
-from spark_preprocessor.errors import ConfigurationError, ValidationError
+import structlog
+from sqlglot import exp, parse_one
+from sqlglot.errors import ParseError
+
+from spark_preprocessor.archive import FILES_MANIFEST_PATH, files_manifest
+from spark_preprocessor.features import (
+    DEFAULT_REGISTRY,
+    FeatureRegistry,
+    RegistrySnapshot,
+)
+from spark_preprocessor.errors import (
+    ConfigurationError,
+    FeatureNotFoundError,
+    ValidationError,
+)
 from spark_preprocessor.features.base import (
     BuildContext,
     FeatureAssets,
@@ -21,24 +37,48 @@ from spark_preprocessor.features.base import (
     JoinModelSpec,
     SqlmeshModelSpec,
 )
+from spark_preprocessor.lint import (
+    LintFinding,
+    check_lint,
+    lint_join,
+    lint_model,
+    lint_select_expression,
+    sql_metrics,
+)
 from spark_preprocessor.schema import (
     MappingSpec,
     PipelineDocument,
     load_pipeline_document,
+    load_schema_snapshot,
 )
 from spark_preprocessor.semantic_contract import (
     SemanticContract,
     default_semantic_contract,
 )
 from spark_preprocessor.sqlmesh_project import (
+    ROW_COUNT_AUDIT,
     SqlmeshConfig,
+    render_external_models,
+    render_row_count_audit,
     render_sqlmesh_config,
     render_sqlmesh_model,
+    row_count_audit,
+    unique_audit,
 )
 from spark_preprocessor.profiling import render_profiling_notebook
 
+if TYPE_CHECKING:
+    from spark_preprocessor.runtime.local import LocalSource
+
+
+COMPILE_REPORT_PATH = "manifest/compile_report.json"
+MODELS_MANIFEST_PATH = "manifest/models.json"
+LINEAGE_PATH = "manifest/lineage.json"
+PROJECT_MANIFEST_PATH = "manifest/project.json"
+SHARED_FEATURE_TAG = "shared_feature"
 
 _CANONICAL_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+_IDENTIFIER_PATTERN = re.compile(r"\w+")
 
 
 @dataclass(frozen=True)
@@ -69,24 +109,211 @@ class CompileReport:
     resolved_tables: dict[str, str]
     profiling: dict[str, object]
     compiled_at: str
+    external_models: dict[str, list[str]]
+    lint: dict[str, object] = field(default_factory=dict)
+    feature_tables: dict[str, list[str]] = field(default_factory=dict)
 
 
-def compile_pipeline(pipeline_path: str | Path, out_dir: str | Path) -> CompileReport:
-    """Compile a pipeline YAML into SQLMesh assets and artifacts."""
+@dataclass(frozen=True)
+class CompiledProject:
+    """A compiled SQLMesh project held in memory.
 
-    pipeline_path = Path(pipeline_path)
-    out_dir = Path(out_dir)
+    `files` maps POSIX paths relative to the project root to file contents.
+    """
+
+    report: CompileReport
+    files: dict[str, str]
+
+    @property
+    def rendered_sql(self) -> str:
+        """The pipeline's final query, as written to `rendered/`."""
+
+        return self.files[_rendered_sql_path(self.report.pipeline_name)]
+
+
+@dataclass(frozen=True)
+class ProjectReport:
+    """Summary of several pipelines compiled into one SQLMesh project."""
+
+    pipelines: list[CompileReport]
+    shared_models: dict[str, list[str]]
+
+
+@dataclass(frozen=True)
+class MergedProject:
+    """Several pipelines compiled into one in-memory SQLMesh project."""
+
+    report: ProjectReport
+    files: dict[str, str]
+
+
+@dataclass(frozen=True)
+class _PipelineBuild:
+    """One pipeline's compiled models, before they are rendered to files."""
+
+    report: CompileReport
+    contract: SemanticContract
+    semantic_models: list[SqlmeshModelSpec]
+    features: list[BuiltFeature]
+    final_model: SqlmeshModelSpec
+    rendered_sql: str
+    external_models: list[dict[str, object]]
+    profiling_text: str | None
+
+    @property
+    def models(self) -> list[SqlmeshModelSpec]:
+        """Every model in dependency order."""
+
+        return [
+            *self.semantic_models,
+            *(model for feature in self.features for model in feature.assets.models),
+            self.final_model,
+        ]
+
+
+def compile_pipeline(
+    pipeline_path: str | Path,
+    out_dir: str | Path,
+    schema_snapshot: str | Path | None = None,
+    sqlmesh_config: SqlmeshConfig | None = None,
+    capture_plans: bool = False,
+    plan_sources: "list[LocalSource] | None" = None,
+    registry: FeatureRegistry | None = None,
+    document: PipelineDocument | None = None,
+    lineage: bool = False,
+) -> CompileReport:
+    """Compile a pipeline YAML into SQLMesh assets and artifacts.
+
+    Args:
+        pipeline_path: Path to the pipeline YAML.
+        out_dir: Output directory for the compiled project.
+        schema_snapshot: Optional physical schema snapshot used to type
+            `external_models.yaml`.
+        sqlmesh_config: Project configuration for `sqlmesh.yaml` (defaults to
+            Databricks/Spark only).
+        capture_plans: Also EXPLAIN every model on a scratch DuckDB database
+            and write the plan summaries to `manifest/plans.json`.
+        plan_sources: Sample data for mapped tables during plan capture;
+            unbound tables are planned empty.
+        registry: Feature registry to resolve feature keys from (defaults to
+            the process-wide registry). Lazily registered features the
+            pipeline references are loaded first; the registry's snapshot is
+            then used for the whole compile, so concurrent registrations do
+            not affect it.
+        document: The already loaded document at `pipeline_path`, e.g. from a
+            long-lived process's cache; skips reading the YAML.
+        lineage: Also trace the output columns to physical columns and write
+            `manifest/lineage.json`.
+
+    Returns:
+        CompileReport describing the compiled pipeline.
+    """
+
+    if document is None:
+        document = load_pipeline_document(Path(pipeline_path))
+    project = compile_document(
+        document,
+        schema_snapshot=(
+            load_schema_snapshot(Path(schema_snapshot)) if schema_snapshot else None
+        ),
+        sqlmesh_config=sqlmesh_config,
+        capture_plans=capture_plans,
+        plan_sources=plan_sources,
+        registry=registry,
+        lineage=lineage,
+    )
+    write_project(project, out_dir)
+    return project.report
+
+
+def compile_document(
+    document: PipelineDocument,
+    schema_snapshot: dict[str, dict[str, str]] | None = None,
+    sqlmesh_config: SqlmeshConfig | None = None,
+    capture_plans: bool = False,
+    plan_sources: "list[LocalSource] | None" = None,
+    registry: FeatureRegistry | None = None,
+    lineage: bool = False,
+) -> CompiledProject:
+    """Compile a pipeline document into an in-memory SQLMesh project.
+
+    Nothing is read from or written to disk (plan capture aside, which uses a
+    scratch DuckDB database); see `write_project` to persist the result.
+
+    Args:
+        document: Validated pipeline document, e.g. built in Python.
+        schema_snapshot: Optional physical column types keyed by table, as
+            returned by `load_schema_snapshot`.
+        sqlmesh_config: Project configuration for `sqlmesh.yaml`.
+        capture_plans: Also capture plan summaries as `manifest/plans.json`.
+        plan_sources: Sample data for mapped tables during plan capture.
+        registry: Feature registry to resolve feature keys from (defaults to
+            the process-wide registry).
+        lineage: Also write column lineage as `manifest/lineage.json`.
+
+    Returns:
+        CompiledProject with every artifact and the compile report.
+    """
+
+    build = _build_pipeline(document, schema_snapshot or {}, registry)
+    pipeline_name = document.pipeline.name
+    files = _sqlmesh_project_files(
+        build.semantic_models, build.features, build.final_model, pipeline_name
+    )
+    files[MODELS_MANIFEST_PATH] = json.dumps(
+        {
+            "models": _build_model_manifest(
+                build.semantic_models, build.features, build.final_model, pipeline_name
+            )
+        },
+        indent=2,
+    )
+    files[_rendered_sql_path(pipeline_name)] = build.rendered_sql
+    files[COMPILE_REPORT_PATH] = json.dumps(
+        build.report.__dict__, indent=2, sort_keys=True
+    )
+    if lineage:
+        files[LINEAGE_PATH] = _render_lineage(build, document, schema_snapshot or {})
+    if build.profiling_text:
+        files[f"notebooks/profile__{pipeline_name}.py"] = build.profiling_text
+    files["sqlmesh.yaml"] = render_sqlmesh_config(sqlmesh_config or SqlmeshConfig())
+    files["external_models.yaml"] = render_external_models(build.external_models)
+    if capture_plans:
+        from spark_preprocessor.plans import capture_plans as capture
+
+        files["manifest/plans.json"] = json.dumps(
+            capture(
+                build.models,
+                _physical_column_types(
+                    document.mapping, build.contract, schema_snapshot or {}
+                ),
+                document.mapping,
+                plan_sources,
+            ),
+            indent=2,
+            sort_keys=True,
+        )
+
+    return CompiledProject(report=build.report, files=files)
+
+
+def _build_pipeline(
+    document: PipelineDocument,
+    snapshot: dict[str, dict[str, str]],
+    registry: FeatureRegistry | None,
+) -> "_PipelineBuild":
+    """Validate a pipeline and build its models and report."""
 
     compiled_at = datetime.now(timezone.utc).isoformat()
 
-    document = load_pipeline_document(pipeline_path)
+    registry = registry or DEFAULT_REGISTRY
+    # Only plugin features the pipeline references are imported.
+    registry.load(feature_cfg.key for feature_cfg in document.features)
+    available_features = registry.snapshot()
     contract = default_semantic_contract()
 
     _validate_pipeline(document, contract)
 
-    _wipe_out_dir(out_dir)
-    _ensure_layout(out_dir)
-
     ctx = BuildContext(
         pipeline_name=document.pipeline.name,
         spine_entity=document.pipeline.spine.entity,
@@ -97,34 +324,405 @@ def compile_pipeline(pipeline_path: str | Path, out_dir: str | Path) -> CompileR
     )
 
     semantic_models = _build_semantic_models(document, contract)
-    built_features, skipped = _build_features(document, ctx)
+    external_models, untyped_tables = _build_external_models(
+        document.mapping, contract, snapshot
+    )
+    built_features, skipped = _build_features(
+        document, ctx, available_features, registry
+    )
+    shared_features = document.pipeline.shared_features
+    if shared_features.enabled:
+        _share_feature_models(
+            built_features, semantic_models, shared_features.schema_name
+        )
+
+    model_types = _semantic_column_types(document.mapping, contract)
+    for feature in built_features:
+        for model in feature.assets.models:
+            if model.columns:
+                model_types[model.name] = {
+                    column: _sql_type(dtype) for column, dtype in model.columns.items()
+                }
+    _check_join_key_types(built_features, ctx, model_types)
+    join_grains = _join_grains(
+        built_features, ctx, document.pipeline.spine.key, model_types
+    )
 
     final_model_spec, rendered_sql = _build_final_model(
-        document, ctx, built_features, compiled_at
+        document, ctx, built_features, model_types
     )
 
-    sqlmesh_config = render_sqlmesh_config(SqlmeshConfig())
+    spine_model = f"semantic.{ctx.spine_entity}"
+    join_grains.setdefault(spine_model, set()).add((document.pipeline.spine.key,))
+    semantic_models = [_with_audits(model, join_grains) for model in semantic_models]
+    for feature in built_features:
+        feature.assets = replace(
+            feature.assets,
+            models=[
+                _with_audits(model, join_grains) for model in feature.assets.models
+            ],
+        )
+    final_model_spec = replace(final_model_spec, audits=[row_count_audit(spine_model)])
+
+    lint_config = document.pipeline.lint
+    findings = [
+        finding
+        for finding in _lint_features(built_features, ctx)
+        if finding.rule not in lint_config.ignore
+    ]
+    log = structlog.get_logger()
+    for finding in findings:
+        log.warning("lint_finding", finding=finding.render())
+    check_lint(findings, lint_config.policy)
+    compiled_models = [
+        *semantic_models,
+        *(model for feature in built_features for model in feature.assets.models),
+        final_model_spec,
+    ]
+    metrics = {model.name: sql_metrics(model.sql) for model in compiled_models}
 
     profiling_text = None
     if document.profiling and document.profiling.enabled:
         profiling_text = render_profiling_notebook(document)
 
-    report = _build_compile_report(document, built_features, skipped, compiled_at)
-
-    _write_sqlmesh_project(
-        out_dir,
-        semantic_models,
+    report = _build_compile_report(
+        document,
         built_features,
-        final_model_spec,
-        document.pipeline.name,
+        skipped,
+        compiled_at,
+        external_models={
+            "typed": [model["name"] for model in external_models],
+            "untyped": untyped_tables,
+        },
+        lint={
+            "policy": lint_config.policy,
+            "findings": [asdict(finding) for finding in findings],
+            "metrics": {name: asdict(metric) for name, metric in metrics.items()},
+        },
     )
-    _write_rendered_sql(out_dir, document.pipeline.name, rendered_sql)
-    _write_compile_report(out_dir, report)
-    if profiling_text:
-        _write_profiling_notebook(out_dir, document.pipeline.name, profiling_text)
-    _write_sqlmesh_config(out_dir, sqlmesh_config)
 
-    return report
+    return _PipelineBuild(
+        report=report,
+        contract=contract,
+        semantic_models=semantic_models,
+        features=built_features,
+        final_model=final_model_spec,
+        rendered_sql=rendered_sql,
+        external_models=external_models,
+        profiling_text=profiling_text,
+    )
+
+
+def _render_lineage(
+    build: "_PipelineBuild",
+    document: PipelineDocument,
+    snapshot: dict[str, dict[str, str]],
+) -> str:
+    """Trace a pipeline's output columns and render its `lineage.json`."""
+
+    from spark_preprocessor.lineage import build_lineage
+
+    lineage = build_lineage(
+        build.models,
+        build.final_model.name,
+        _physical_column_types(document.mapping, build.contract, snapshot),
+    )
+    return json.dumps(lineage, indent=2, sort_keys=True)
+
+
+def compile_project(
+    pipeline_paths: list[str | Path],
+    out_dir: str | Path,
+    schema_snapshot: str | Path | None = None,
+    sqlmesh_config: SqlmeshConfig | None = None,
+    registry: FeatureRegistry | None = None,
+    lineage: bool = False,
+) -> ProjectReport:
+    """Compile pipelines that share a mapping into one SQLMesh project.
+
+    See `compile_documents`; the merged project is synced into `out_dir`
+    with `write_project`.
+
+    Returns:
+        ProjectReport with one CompileReport per pipeline.
+    """
+
+    documents = [load_pipeline_document(Path(path)) for path in pipeline_paths]
+    project = compile_documents(
+        documents,
+        schema_snapshot=(
+            load_schema_snapshot(Path(schema_snapshot)) if schema_snapshot else None
+        ),
+        sqlmesh_config=sqlmesh_config,
+        registry=registry,
+        lineage=lineage,
+    )
+    write_project(project, out_dir)
+    return project.report
+
+
+def compile_documents(
+    documents: list[PipelineDocument],
+    schema_snapshot: dict[str, dict[str, str]] | None = None,
+    sqlmesh_config: SqlmeshConfig | None = None,
+    registry: FeatureRegistry | None = None,
+    lineage: bool = False,
+) -> MergedProject:
+    """Compile pipelines that share a mapping into one in-memory project.
+
+    Each pipeline is compiled as `compile_document` would, then the models
+    are merged: semantic views and feature models appear once however many
+    pipelines use them (with the union of their audits), and every pipeline
+    keeps its own final mart, rendered SQL, and profiling notebook. One
+    plan/apply of the project builds every pipeline's output over shared
+    upstream models.
+
+    Per-pipeline manifests (and, with `lineage`, each pipeline's
+    `lineage.json`) move to `manifest/pipelines/<name>/`;
+    `manifest/models.json` lists the merged models in dependency order and
+    `manifest/project.json` records which models are shared.
+
+    Raises:
+        ConfigurationError: If the pipelines do not share a mapping, reuse a
+            pipeline name or output table, or compile different definitions of
+            the same model (e.g. one feature with different parameters).
+    """
+
+    if not documents:
+        raise ConfigurationError("A project needs at least one pipeline")
+    first = documents[0]
+    names: set[str] = set()
+    outputs: set[str] = set()
+    for document in documents:
+        pipeline = document.pipeline
+        if document.mapping != first.mapping:
+            raise ConfigurationError(
+                f"Pipelines '{first.pipeline.name}' and '{pipeline.name}' do not "
+                "share a mapping; compile them as separate projects"
+            )
+        if pipeline.name in names:
+            raise ConfigurationError(f"Duplicate pipeline name: {pipeline.name}")
+        if pipeline.output.table in outputs:
+            raise ConfigurationError(f"Duplicate output table: {pipeline.output.table}")
+        names.add(pipeline.name)
+        outputs.add(pipeline.output.table)
+
+    builds = [
+        _build_pipeline(document, schema_snapshot or {}, registry)
+        for document in documents
+    ]
+    semantic_models: dict[str, SqlmeshModelSpec] = {}
+    feature_models: dict[str, tuple[str, SqlmeshModelSpec]] = {}
+    tests: dict[str, str] = {}
+    users: dict[str, list[str]] = {}
+    for build in builds:
+        name = build.report.pipeline_name
+        for model in build.semantic_models:
+            semantic_models[model.name] = _merge_model(
+                semantic_models.get(model.name), model, users, name
+            )
+        for feature in build.features:
+            for model in feature.assets.models:
+                key, existing = feature_models.get(model.name, (feature.key, None))
+                feature_models[model.name] = (
+                    key,
+                    _merge_model(existing, model, users, name),
+                )
+            for test in feature.assets.tests:
+                if tests.setdefault(test.name, test.yaml) != test.yaml:
+                    raise ConfigurationError(
+                        f"Pipeline '{name}' generates a different test {test.name}"
+                    )
+
+    # First-seen order is a dependency order: every pipeline's models are.
+    entries = [
+        *((model, _semantic_model_path(model)) for model in semantic_models.values()),
+        *(
+            (model, _feature_model_path(key, model))
+            for key, model in feature_models.values()
+        ),
+        *(
+            (build.final_model, _final_model_path(build.report.pipeline_name))
+            for build in builds
+        ),
+    ]
+    files = {path: render_sqlmesh_model(model) for model, path in entries}
+    files[f"audits/{ROW_COUNT_AUDIT}.sql"] = render_row_count_audit()
+    for test_name, test_yaml in tests.items():
+        files[f"tests/{test_name}.yaml"] = test_yaml
+    for build, document in zip(builds, documents, strict=True):
+        name = build.report.pipeline_name
+        files[_rendered_sql_path(name)] = build.rendered_sql
+        files[f"manifest/pipelines/{name}/compile_report.json"] = json.dumps(
+            build.report.__dict__, indent=2, sort_keys=True
+        )
+        if lineage:
+            files[f"manifest/pipelines/{name}/lineage.json"] = _render_lineage(
+                build, document, schema_snapshot or {}
+            )
+        if build.profiling_text:
+            files[f"notebooks/profile__{name}.py"] = build.profiling_text
+
+    shared = {
+        model: pipelines for model, pipelines in users.items() if len(pipelines) > 1
+    }
+    files[MODELS_MANIFEST_PATH] = json.dumps(
+        {"models": _model_manifest(entries)}, indent=2
+    )
+    files[PROJECT_MANIFEST_PATH] = json.dumps(
+        {
+            "pipelines": [build.report.pipeline_name for build in builds],
+            "shared_models": shared,
+        },
+        indent=2,
+        sort_keys=True,
+    )
+    files["sqlmesh.yaml"] = render_sqlmesh_config(sqlmesh_config or SqlmeshConfig())
+    # The mapping and snapshot are shared, so every pipeline types them alike.
+    files["external_models.yaml"] = render_external_models(builds[0].external_models)
+    return MergedProject(
+        report=ProjectReport(
+            pipelines=[build.report for build in builds], shared_models=shared
+        ),
+        files=files,
+    )
+
+
+def _merge_model(
+    existing: SqlmeshModelSpec | None,
+    model: SqlmeshModelSpec,
+    users: dict[str, list[str]],
+    pipeline_name: str,
+) -> SqlmeshModelSpec:
+    """Combine one pipeline's copy of a model with the copies seen so far.
+
+    Copies must match except for their audits, which are combined: each
+    pipeline audits the grains its own joins rely on.
+    """
+
+    owners = users.setdefault(model.name, [])
+    if existing is None:
+        owners.append(pipeline_name)
+        return model
+    if replace(existing, audits=None) != replace(model, audits=None):
+        raise ConfigurationError(
+            f"Pipelines {owners} and '{pipeline_name}' compile different "
+            f"definitions of {model.name}"
+        )
+    owners.append(pipeline_name)
+    audits = list(existing.audits or [])
+    audits.extend(audit for audit in model.audits or [] if audit not in audits)
+    return replace(existing, audits=audits or None)
+
+
+@dataclass(frozen=True)
+class ProjectChanges:
+    """Files `write_project` added, rewrote, or deleted (relative paths)."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+def write_project(
+    project: CompiledProject | MergedProject, out_dir: str | Path
+) -> ProjectChanges:
+    """Sync a compiled project into `out_dir`, touching only what changed.
+
+    Changed and new files are written to a staging directory first and then
+    moved into place one by one with an atomic rename, so readers never see a
+    partially written file. Files whose content is unchanged are left alone
+    (keeping their modification times), and so is a compile report that
+    differs only in `compiled_at`, so recompiling an unchanged pipeline
+    changes no file; files the project no longer contains are deleted. Dot-prefixed entries, such as SQLMesh's `.cache`, are kept.
+    `manifest/files.json` records the SHA-256 of every project file.
+
+    Returns:
+        ProjectChanges describing the sync.
+    """
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    existing = _project_files(out_dir)
+    files = dict(project.files)
+    for relative, text in files.items():
+        if relative in existing and relative.endswith("compile_report.json"):
+            files[relative] = _keep_compile_timestamp(out_dir / relative, text)
+    files[FILES_MANIFEST_PATH] = json.dumps(
+        {"files": files_manifest(files)}, indent=2, sort_keys=True
+    )
+
+    changes = ProjectChanges()
+    with tempfile.TemporaryDirectory(prefix=".staging-", dir=out_dir) as staging:
+        staged: list[str] = []
+        for relative, text in files.items():
+            content = text.encode("utf-8")
+            if relative in existing:
+                if (out_dir / relative).read_bytes() == content:
+                    continue
+                changes.changed.append(relative)
+            else:
+                changes.added.append(relative)
+            path = Path(staging) / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            staged.append(relative)
+        # The file manifest goes last, once the files it describes are in place.
+        staged.sort(key=lambda relative: relative == FILES_MANIFEST_PATH)
+        for relative in staged:
+            target = out_dir / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(Path(staging) / relative, target)
+
+    for relative in sorted(existing - files.keys()):
+        (out_dir / relative).unlink()
+        changes.removed.append(relative)
+    _ensure_layout(out_dir)
+    _remove_empty_dirs(out_dir)
+    changes.added.sort()
+    changes.changed.sort()
+    return changes
+
+
+def _keep_compile_timestamp(path: Path, text: str) -> str:
+    """Return the existing report if only its `compiled_at` differs."""
+
+    current = path.read_text(encoding="utf-8")
+    try:
+        before, after = json.loads(current), json.loads(text)
+    except ValueError:
+        return text
+    if not isinstance(before, dict) or not isinstance(after, dict):
+        return text
+    before.pop("compiled_at", None)
+    after.pop("compiled_at", None)
+    return current if before == after else text
+
+
+def _project_files(out_dir: Path) -> set[str]:
+    files: set[str] = set()
+    for root, dirs, names in os.walk(out_dir):
+        dirs[:] = [name for name in dirs if not name.startswith(".")]
+        relative_root = Path(root).relative_to(out_dir)
+        files.update(
+            (relative_root / name).as_posix()
+            for name in names
+            if not name.startswith(".")
+        )
+    return files
+
+
+def _remove_empty_dirs(out_dir: Path) -> None:
+    layout = {path.relative_to(out_dir) for path in _layout_dirs(out_dir)}
+    for root, dirs, names in os.walk(out_dir, topdown=False):
+        path = Path(root)
+        relative = path.relative_to(out_dir)
+        if path == out_dir or relative in layout:
+            continue
+        if any(part.startswith(".") for part in relative.parts):
+            continue
+        if not names and not any(path.iterdir()):
+            path.rmdir()
 
 
 def _validate_pipeline(document: PipelineDocument, contract: SemanticContract) -> None:
@@ -164,6 +762,12 @@ def _validate_pipeline(document: PipelineDocument, contract: SemanticContract) -
             f"Invalid canonical column names: {sorted(invalid_names)}"
         )
 
+    untyped = _types_without_columns(mapping)
+    if untyped:
+        raise ConfigurationError(
+            f"Mapping types reference unmapped columns: {sorted(untyped)}"
+        )
+
     for entity_name, required in contract.required_columns.items():
         if not mapping.has_entity(entity_name):
             continue
@@ -174,22 +778,21 @@ def _validate_pipeline(document: PipelineDocument, contract: SemanticContract) -
             )
 
 
-def _wipe_out_dir(out_dir: Path) -> None:
-    if out_dir.exists():
-        shutil.rmtree(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-
-def _ensure_layout(out_dir: Path) -> None:
-    for path in [
+def _layout_dirs(out_dir: Path) -> list[Path]:
+    return [
         out_dir / "models" / "semantic",
         out_dir / "models" / "features",
         out_dir / "models" / "marts",
+        out_dir / "audits",
         out_dir / "tests",
         out_dir / "notebooks",
         out_dir / "rendered",
         out_dir / "manifest",
-    ]:
+    ]
+
+
+def _ensure_layout(out_dir: Path) -> None:
+    for path in _layout_dirs(out_dir):
         path.mkdir(parents=True, exist_ok=True)
 
 
@@ -199,23 +802,148 @@ def _build_semantic_models(
     models: list[SqlmeshModelSpec] = []
     mapping = document.mapping
 
+    column_types = _semantic_column_types(mapping, contract)
+
     for entity in sorted(mapping.entities.keys()):
         model_name = f"semantic.{entity}"
-        sql = _render_semantic_sql(
-            mapping.entity_table(entity), mapping.entity_columns(entity)
+        models.append(
+            _semantic_model(
+                model_name,
+                mapping.entity_table(entity),
+                mapping.entity_columns(entity),
+                mapping.entity_types(entity),
+                column_types[model_name],
+            )
         )
-        models.append(SqlmeshModelSpec(name=model_name, sql=sql, kind="VIEW", tags=[]))
 
     for reference in sorted(mapping.references.keys()):
         model_name = f"semantic.reference__{reference}"
-        sql = _render_semantic_sql(
-            mapping.entity_table(reference), mapping.entity_columns(reference)
+        models.append(
+            _semantic_model(
+                model_name,
+                mapping.entity_table(reference),
+                mapping.entity_columns(reference),
+                mapping.entity_types(reference),
+                column_types[model_name],
+            )
         )
-        models.append(SqlmeshModelSpec(name=model_name, sql=sql, kind="VIEW", tags=[]))
 
     return models
 
 
+def _semantic_column_types(
+    mapping: MappingSpec, contract: SemanticContract
+) -> dict[str, dict[str, str | None]]:
+    """Resolve each semantic view's column types, keyed by model name.
+
+    A column keeps the mapped source type the mapping declares; undeclared
+    entity columns fall back to the contract's recommended type (so an
+    untyped `person_id` becomes STRING). References only have declared types.
+    """
+
+    types: dict[str, dict[str, str | None]] = {}
+    for entity in mapping.entities:
+        declared = mapping.entity_types(entity)
+        types[f"semantic.{entity}"] = {
+            column: _sql_type(
+                declared.get(column) or contract.recommended_type(entity, column)
+            )
+            for column in mapping.entity_columns(entity)
+        }
+    for reference in mapping.references:
+        declared = mapping.entity_types(reference)
+        types[f"semantic.reference__{reference}"] = {
+            column: _sql_type(declared.get(column))
+            for column in mapping.entity_columns(reference)
+        }
+    return types
+
+
+def _semantic_model(
+    name: str,
+    table: str,
+    columns: dict[str, str],
+    declared_types: dict[str, str],
+    column_types: dict[str, str | None],
+) -> SqlmeshModelSpec:
+    """Build a semantic view that casts to the resolved column types once.
+
+    Columns whose resolved type differs from the declared physical type are
+    cast. The types become the model's `columns` header when every column is
+    typed.
+    """
+
+    casts = {
+        canonical: dtype
+        for canonical, dtype in column_types.items()
+        if dtype is not None and dtype != _sql_type(declared_types.get(canonical))
+    }
+    return SqlmeshModelSpec(
+        name=name,
+        sql=_render_semantic_sql(table, columns, casts),
+        kind="VIEW",
+        tags=[],
+        columns=_complete_column_types(
+            {column: column_types[column] for column in sorted(columns)}
+        ),
+    )
+
+
+def _build_external_models(
+    mapping: MappingSpec,
+    contract: SemanticContract,
+    snapshot: dict[str, dict[str, str]],
+) -> tuple[list[dict[str, object]], list[str]]:
+    """Describe every mapped physical table for SQLMesh `external_models.yaml`.
+
+    Only schema-qualified tables with every mapped column typed are emitted; a
+    partial schema would hide the other columns from SQLMesh. The remaining
+    tables are returned separately so the report can list them.
+    """
+
+    typed: list[dict[str, object]] = []
+    untyped: list[str] = []
+    for table, columns in sorted(
+        _physical_column_types(mapping, contract, snapshot).items()
+    ):
+        if "." not in table or any(dtype is None for dtype in columns.values()):
+            untyped.append(table)
+            continue
+        typed.append({"name": table, "columns": dict(sorted(columns.items()))})
+    return typed, untyped
+
+
+def _physical_column_types(
+    mapping: MappingSpec,
+    contract: SemanticContract,
+    snapshot: dict[str, dict[str, str]],
+) -> dict[str, dict[str, str | None]]:
+    """Resolve each mapped physical column's type, keyed by table.
+
+    Types come from the schema snapshot, then the mapping's declared `types`,
+    then the contract's recommended type for the canonical column.
+    """
+
+    tables: dict[str, dict[str, str | None]] = {}
+    for mappings, is_entity in ((mapping.entities, True), (mapping.references, False)):
+        for name, entity_mapping in sorted(mappings.items()):
+            table_snapshot = snapshot.get(entity_mapping.table.lower(), {})
+            columns = tables.setdefault(entity_mapping.table, {})
+            for canonical, physical in sorted(entity_mapping.columns.items()):
+                dtype = (
+                    table_snapshot.get(physical.lower())
+                    or entity_mapping.types.get(canonical)
+                    or (
+                        contract.recommended_type(name, canonical)
+                        if is_entity
+                        else None
+                    )
+                )
+                if columns.get(physical) is None:
+                    columns[physical] = dtype
+    return tables
+
+
 def _invalid_canonical_names(
     mapping: MappingSpec,
     contract: SemanticContract,
@@ -235,30 +963,79 @@ def _invalid_canonical_names(
     return invalid
 
 
-def _render_semantic_sql(table: str, columns: dict[str, str]) -> str:
+def _types_without_columns(mapping: MappingSpec) -> set[str]:
+    unmapped: set[str] = set()
+    for mappings in (mapping.entities, mapping.references):
+        for name, entity_mapping in mappings.items():
+            for column in entity_mapping.types:
+                if column not in entity_mapping.columns:
+                    unmapped.add(f"{name}.{column}")
+    return unmapped
+
+
+def _render_semantic_sql(
+    table: str, columns: dict[str, str], casts: dict[str, str] | None = None
+) -> str:
+    casts = casts or {}
     select_lines = [
-        f"  {physical} AS {canonical}"
+        f"  CAST({physical} AS {casts[canonical]}) AS {canonical}"
+        if canonical in casts
+        else f"  {physical} AS {canonical}"
         for canonical, physical in sorted(columns.items())
     ]
     return "SELECT\n" + ",\n".join(select_lines) + f"\nFROM {table}"
 
 
+_DTYPE_ALIASES = {"str": "STRING", "bool": "BOOLEAN", "float": "DOUBLE"}
+
+
+def _sql_type(dtype: str | None) -> str | None:
+    """Normalize a declared type (SQL or `ColumnSpec.dtype` shorthand) to Spark SQL."""
+
+    if dtype is None:
+        return None
+    dtype = _DTYPE_ALIASES.get(dtype.strip().lower(), dtype)
+    try:
+        return exp.DataType.build(dtype, dialect="spark").sql(dialect="spark")
+    except (ParseError, ValueError) as exc:
+        raise ValidationError(f"Invalid column type: {dtype}") from exc
+
+
+def _complete_column_types(
+    column_types: dict[str, str | None],
+) -> dict[str, str] | None:
+    if not column_types or any(dtype is None for dtype in column_types.values()):
+        return None
+    return {name: dtype for name, dtype in column_types.items() if dtype}
+
+
 def _build_features(
-    document: PipelineDocument, ctx: BuildContext
+    document: PipelineDocument,
+    ctx: BuildContext,
+    available_features: RegistrySnapshot | None = None,
+    registry: FeatureRegistry | None = None,
 ) -> tuple[list[BuiltFeature], dict[str, str]]:
+    """Build the pipeline's features in order, skipping or failing per policy.
+
+    `available_features` holds only the features loaded so far. When a select
+    expression references an unqualified column no loaded feature provides,
+    the remaining lazily registered features of `registry` are loaded, so a
+    plugin output the pipeline forgot to include is still reported as a
+    missing dependency rather than failing later as bad SQL.
+    """
+
+    if available_features is None:
+        available_features = DEFAULT_REGISTRY.snapshot()
     features: list[BuiltFeature] = []
     skipped: dict[str, str] = {}
     available_columns: set[str] = set()
-    known_outputs: set[str] = set()
     spine_columns = set(document.pipeline.spine.columns)
     validation_policy = document.pipeline.validation.on_missing_required_column
 
-    for feature_key in feature_registry.list_features():
-        feature = feature_registry.get_feature(feature_key)
-        known_outputs.update({spec.name for spec in feature.meta.provides})
-
     for feature_cfg in document.features:
-        feature = feature_registry.get_feature(feature_cfg.key)
+        feature = available_features.get(feature_cfg.key)
+        if feature is None:
+            raise FeatureNotFoundError(f"Unknown feature key: {feature_cfg.key}")
         metadata = feature.meta
 
         if document.pipeline.grain != "PERSON":
@@ -295,16 +1072,35 @@ def _build_features(
                 f"Feature '{metadata.key}' select aliases do not match provides"
             )
 
+        if registry is not None:
+            unresolved = _unresolved_columns(
+                metadata.key,
+                select_expressions,
+                available_columns | spine_columns | set(available_features.outputs),
+            )
+            providers = registry.lazy_providers(unresolved) if unresolved else []
+            if providers:
+                registry.load(providers)
+                available_features = registry.snapshot()
+
         dependency_miss = _missing_feature_dependencies(
-            select_expressions, available_columns, known_outputs, spine_columns
+            select_expressions,
+            available_columns,
+            available_features.outputs,
+            spine_columns,
         )
         if dependency_miss:
             message = "missing dependent feature outputs"
             if validation_policy == "warn_skip":
                 skipped[metadata.key] = message
                 continue
+            providers = {
+                column: list(available_features.providers(column))
+                for column in sorted(dependency_miss)
+            }
             raise ValidationError(
-                f"Feature '{metadata.key}' has {message}: {dependency_miss}"
+                f"Feature '{metadata.key}' has {message}: {dependency_miss} "
+                f"(provided by {providers})"
             )
 
         features.append(
@@ -320,6 +1116,91 @@ def _build_features(
     return features, skipped
 
 
+def _share_feature_models(
+    features: list[BuiltFeature],
+    semantic_models: list[SqlmeshModelSpec],
+    schema_name: str,
+) -> None:
+    """Content-address materialized feature models into a shared schema.
+
+    Each table model is renamed `<schema_name>.<name>__<hash>`, where the hash
+    covers its kind, columns and SQL and the definitions of the models it
+    reads (semantic views carry the physical tables and column mapping).
+    Pipelines and clients computing the same feature over the same inputs
+    therefore name the same table, which the runtime can reuse. References in
+    later models and joins are rewritten; views are not shared, since they
+    are recomputed on every read anyway.
+    """
+
+    fingerprints = {
+        model.name: hashlib.sha256(render_sqlmesh_model(model).encode()).hexdigest()
+        for model in semantic_models
+    }
+    renames: dict[str, str] = {}
+    for feature in features:
+        models: list[SqlmeshModelSpec] = []
+        for model in feature.assets.models:
+            sql, inputs = _rename_tables(feature.key, model.sql, renames)
+            model = replace(model, sql=sql)
+            digest = hashlib.sha256()
+            for part in (
+                model.kind,
+                json.dumps(model.columns, sort_keys=True),
+                model.sql,
+                *(f"{table}={fingerprints.get(table, '')}" for table in inputs),
+            ):
+                digest.update(part.encode())
+                digest.update(b"\0")
+            if model.kind != "VIEW":
+                name = model.name.rsplit(".", 1)[-1]
+                shared_name = f"{schema_name}.{name}__{digest.hexdigest()[:12]}"
+                renames[model.name] = shared_name
+                model = replace(
+                    model, name=shared_name, tags=[*model.tags, SHARED_FEATURE_TAG]
+                )
+            fingerprints[model.name] = digest.hexdigest()
+            models.append(model)
+        feature.assets = replace(
+            feature.assets,
+            models=models,
+            join_models=[
+                replace(join, model_name=renames.get(join.model_name, join.model_name))
+                for join in feature.assets.join_models
+            ],
+        )
+
+
+def _rename_tables(
+    feature_key: str, sql: str, renames: dict[str, str]
+) -> tuple[str, list[str]]:
+    """Rewrite renamed table references; also return the tables `sql` reads."""
+
+    try:
+        tree = parse_one(sql, dialect="spark")
+    except ParseError as exc:
+        raise ValidationError(
+            f"Feature '{feature_key}' has a model that cannot be parsed: {exc}"
+        ) from exc
+    inputs: set[str] = set()
+    renamed = False
+    for table in tree.find_all(exp.Table):
+        if not table.db:
+            continue  # CTE or unqualified name
+        name = f"{table.db}.{table.name}"
+        if name in renames:
+            db, table_name = renames[name].split(".", 1)
+            table.set("db", exp.to_identifier(db))
+            table.set("this", exp.to_identifier(table_name))
+            name = renames[name]
+            renamed = True
+        inputs.add(name)
+    return (tree.sql(dialect="spark") if renamed else sql), sorted(inputs)
+
+
+def _is_shared(model: SqlmeshModelSpec) -> bool:
+    return SHARED_FEATURE_TAG in model.tags
+
+
 def _validate_params(
     metadata: FeatureMetadata, raw_params: dict[str, object]
 ) -> dict[str, object]:
@@ -433,14 +1314,13 @@ def _parse_select_expressions(
 def _missing_feature_dependencies(
     expressions: list[SelectExpression],
     available_columns: set[str],
-    known_outputs: set[str],
+    known_outputs: Collection[str],
     spine_columns: set[str],
 ) -> set[str]:
     missing: set[str] = set()
     for expr in expressions:
-        referenced = _expression_references(
-            expr.expression, known_outputs - {expr.alias}
-        )
+        referenced = _expression_references(expr.expression, known_outputs)
+        referenced.discard(expr.alias)
         missing.update(referenced - available_columns - spine_columns)
     return missing
 
@@ -449,7 +1329,7 @@ def _build_final_model(
     document: PipelineDocument,
     ctx: BuildContext,
     features: list[BuiltFeature],
-    compiled_at: str,
+    model_types: dict[str, dict[str, str | None]] | None = None,
 ) -> tuple[SqlmeshModelSpec, str]:
     naming = document.pipeline.naming
 
@@ -485,19 +1365,190 @@ def _build_final_model(
 
     model_name = document.pipeline.output.table
     kind = "TABLE" if document.pipeline.output.materialization == "table" else "VIEW"
-    final_sql = _prepend_metadata(document, features, compiled_at, final_sql)
-    model_spec = SqlmeshModelSpec(name=model_name, sql=final_sql, kind=kind, tags=[])
+    final_sql = _prepend_metadata(document, features, final_sql)
+
+    spine_types = (model_types or {}).get(f"semantic.{ctx.spine_entity}", {})
+    column_types: dict[str, str | None] = {
+        column: spine_types.get(column) for column in spine_columns
+    }
+    output_types = _output_types(features)
+    for original, resolved in zip(
+        select_expressions, resolved_expressions, strict=True
+    ):
+        column_types[resolved.alias] = output_types.get(
+            (original.source_feature, original.alias)
+        )
+    ordered = [
+        *spine_columns,
+        *(expr.alias for expr in base_exprs),
+        *(expr.alias for expr in derived_exprs),
+    ]
+    model_spec = SqlmeshModelSpec(
+        name=model_name,
+        sql=final_sql,
+        kind=kind,
+        tags=[],
+        columns=_complete_column_types(
+            {column: column_types[column] for column in ordered}
+        ),
+    )
     return model_spec, final_sql
 
 
+def _output_types(features: list[BuiltFeature]) -> dict[tuple[str, str], str | None]:
+    return {
+        (feature.key, column.name): _sql_type(column.dtype)
+        for feature in features
+        for column in feature.metadata.provides
+    }
+
+
+def _check_join_key_types(
+    features: list[BuiltFeature],
+    ctx: BuildContext,
+    model_types: dict[str, dict[str, str | None]],
+) -> None:
+    """Reject join predicates that compare columns of different known types.
+
+    Each `a.x = b.y` equality in a join's ON clause is checked when both sides
+    resolve to a typed column of the spine or a joined model.
+    """
+
+    alias_types = {ctx.spine_alias: model_types.get(f"semantic.{ctx.spine_entity}", {})}
+    joins = [join for feature in features for join in feature.assets.join_models]
+    for join in joins:
+        alias_types[join.alias] = model_types.get(join.model_name, {})
+
+    mismatches: list[str] = []
+    for join in joins:
+        try:
+            condition = parse_one(join.on, dialect="spark")
+        except ParseError as exc:
+            raise ValidationError(f"Invalid join condition: {join.on}") from exc
+        for equality in condition.find_all(exp.EQ):
+            left, right = equality.this, equality.expression
+            if not isinstance(left, exp.Column) or not isinstance(right, exp.Column):
+                continue
+            left_type = alias_types.get(left.table, {}).get(left.name)
+            right_type = alias_types.get(right.table, {}).get(right.name)
+            if left_type and right_type and left_type != right_type:
+                mismatches.append(
+                    f"{equality.sql(dialect='spark')} ({left_type} vs {right_type})"
+                )
+    if mismatches:
+        raise ValidationError(f"Join key type mismatch: {mismatches}")
+
+
+def _join_grains(
+    features: list[BuiltFeature],
+    ctx: BuildContext,
+    spine_key: str,
+    model_types: dict[str, dict[str, str | None]],
+) -> dict[str, set[tuple[str, ...]]]:
+    """Resolve the column combinations each joined model must be unique on.
+
+    A join's grain is its declared `JoinModelSpec.grain`, else the joined
+    model's columns equated with spine columns in the ON clause. The spine key
+    may only appear in such equalities: a range, inequality or OR-ed predicate
+    on it would match several rows per spine row. A join with neither a
+    declared grain nor any such equality (e.g. `ON j.flag = 1`) cannot be
+    audited for fan-out and is rejected.
+    """
+
+    grains: dict[str, set[tuple[str, ...]]] = {}
+    non_equi: list[str] = []
+    unkeyed: list[str] = []
+    unknown: list[str] = []
+    for feature in features:
+        for join in feature.assets.join_models:
+            condition = parse_one(join.on, dialect="spark")
+            conjuncts = [
+                conjunct.unnest()
+                for conjunct in (
+                    condition.flatten()
+                    if isinstance(condition.unnest(), exp.And)
+                    else [condition]
+                )
+            ]
+            equi_keys: dict[int, str] = {}
+            for conjunct in conjuncts:
+                if not isinstance(conjunct, exp.EQ):
+                    continue
+                sides = (conjunct.this, conjunct.expression)
+                if not all(isinstance(side, exp.Column) for side in sides):
+                    continue
+                for spine_side, join_side in (sides, sides[::-1]):
+                    if (
+                        spine_side.table == ctx.spine_alias
+                        and join_side.table == join.alias
+                    ):
+                        equi_keys[id(spine_side)] = join_side.name
+            uses_key_otherwise = any(
+                column.table == ctx.spine_alias
+                and column.name == spine_key
+                and id(column) not in equi_keys
+                for column in condition.find_all(exp.Column)
+            )
+            if uses_key_otherwise:
+                non_equi.append(f"{feature.key}: {join.on}")
+                continue
+
+            grain = join.grain or tuple(sorted(set(equi_keys.values())))
+            if not grain:
+                unkeyed.append(f"{feature.key}: {join.on}")
+                continue
+            known = model_types.get(join.model_name)
+            if known and not set(grain).issubset(known):
+                unknown.append(f"{join.model_name}: {sorted(set(grain) - set(known))}")
+                continue
+            grains.setdefault(join.model_name, set()).add(tuple(grain))
+
+    if non_equi:
+        raise ValidationError(f"Non-equi joins on spine key '{spine_key}': {non_equi}")
+    if unkeyed:
+        raise ValidationError(
+            "Joins without an equality on a spine column (declare "
+            f"JoinModelSpec.grain to allow them): {unkeyed}"
+        )
+    if unknown:
+        raise ValidationError(f"Join grain references unknown columns: {unknown}")
+    return grains
+
+
+def _with_audits(
+    model: SqlmeshModelSpec, grains: dict[str, set[tuple[str, ...]]]
+) -> SqlmeshModelSpec:
+    audits = list(model.audits or [])
+    for grain in sorted(grains.get(model.name, ())):
+        audit = unique_audit(grain)
+        if audit not in audits:
+            audits.append(audit)
+    return replace(model, audits=audits or None)
+
+
+def _lint_features(
+    features: list[BuiltFeature], ctx: BuildContext
+) -> list[LintFinding]:
+    findings: list[LintFinding] = []
+    for feature in features:
+        for model in feature.assets.models:
+            findings.extend(lint_model(feature.key, model, ctx))
+        for join in feature.assets.join_models:
+            findings.extend(lint_join(feature.key, join))
+        for expression in feature.select_expressions:
+            findings.extend(lint_select_expression(feature.key, expression.expression))
+    return findings
+
+
 def _prepend_metadata(
-    document: PipelineDocument, features: list[BuiltFeature], compiled_at: str, sql: str
+    document: PipelineDocument, features: list[BuiltFeature], sql: str
 ) -> str:
+    # No compile timestamp: an unchanged pipeline must render identical SQL
+    # (it is in the compile report and archive.json instead).
     feature_keys = ", ".join(feature.key for feature in features)
     metadata_lines = [
         f"-- pipeline_name: {document.pipeline.name}",
         f"-- pipeline_version: {document.pipeline.version}",
-        f"-- compiled_at: {compiled_at}",
         f"-- features: {feature_keys}",
     ]
     return "\n".join(metadata_lines) + "\n" + sql
@@ -610,12 +1661,37 @@ def _split_derived_expressions(
     return base, derived
 
 
-def _expression_references(expression: str, candidates: set[str]) -> set[str]:
-    referenced: set[str] = set()
-    for candidate in candidates:
-        if re.search(rf"\b{re.escape(candidate)}\b", expression):
-            referenced.add(candidate)
-    return referenced
+def _unresolved_columns(
+    feature_key: str, expressions: list[SelectExpression], known: set[str]
+) -> set[str]:
+    """Unqualified column references not in `known` (nor the expression's alias)."""
+
+    unresolved: set[str] = set()
+    for expr in expressions:
+        try:
+            tree = parse_one(expr.expression, dialect="spark")
+        except ParseError as exc:
+            raise ValidationError(
+                f"Feature '{feature_key}' has an invalid select expression: "
+                f"{expr.expression}"
+            ) from exc
+        unresolved.update(
+            column.name
+            for column in tree.find_all(exp.Column)
+            if not column.table and column.name != expr.alias
+        )
+    return unresolved - known
+
+
+def _expression_references(expression: str, candidates: Collection[str]) -> set[str]:
+    # Look the expression's identifiers up in `candidates` rather than
+    # searching for each candidate: `candidates` may be every output column in
+    # the registry.
+    return {
+        identifier
+        for identifier in _IDENTIFIER_PATTERN.findall(expression)
+        if identifier in candidates
+    }
 
 
 def _render_join_clauses(features: list[BuiltFeature]) -> list[str]:
@@ -670,6 +1746,8 @@ def _build_compile_report(
     features: list[BuiltFeature],
     skipped: dict[str, str],
     compiled_at: str,
+    external_models: dict[str, list[str]] | None = None,
+    lint: dict[str, object] | None = None,
 ) -> CompileReport:
     resolved_tables = {
         **{
@@ -681,6 +1759,7 @@ def _build_compile_report(
             for name, mapping in document.mapping.references.items()
         },
     }
+    feature_models = [model for feature in features for model in feature.assets.models]
     profiling_payload: dict[str, object] = {}
     if document.profiling:
         profiling_payload = document.profiling.model_dump()
@@ -694,53 +1773,95 @@ def _build_compile_report(
         resolved_tables=resolved_tables,
         profiling=profiling_payload,
         compiled_at=compiled_at,
+        external_models=external_models or {"typed": [], "untyped": []},
+        lint=lint or {},
+        feature_tables={
+            "content_addressed": [
+                model.name for model in feature_models if _is_shared(model)
+            ],
+            "pipeline_local": [
+                model.name for model in feature_models if not _is_shared(model)
+            ],
+        },
     )
 
 
-def _write_sqlmesh_project(
-    out_dir: Path,
+def _semantic_model_path(model: SqlmeshModelSpec) -> str:
+    return f"models/semantic/{model.name.split('.', 1)[1]}.sql"
+
+
+def _feature_model_path(feature_key: str, model: SqlmeshModelSpec) -> str:
+    return f"models/features/{feature_key}/{model.name.replace('.', '__')}.sql"
+
+
+def _final_model_path(pipeline_name: str) -> str:
+    return f"models/marts/enriched__{pipeline_name}.sql"
+
+
+def _build_model_manifest(
     semantic_models: list[SqlmeshModelSpec],
     features: list[BuiltFeature],
     final_model: SqlmeshModelSpec,
     pipeline_name: str,
-) -> None:
-    for model in semantic_models:
-        path = out_dir / "models" / "semantic" / f"{model.name.split('.', 1)[1]}.sql"
-        path.write_text(render_sqlmesh_model(model))
+) -> list[dict[str, object]]:
+    """List every model in dependency order with its compiled fingerprint.
+
+    Semantic views come first, then feature models in pipeline order, then the
+    final mart. The runtime uses this order and the fingerprints to checkpoint
+    and resume applies model by model.
+    """
 
+    entries: list[tuple[SqlmeshModelSpec, str]] = [
+        (model, _semantic_model_path(model)) for model in semantic_models
+    ]
+    for feature in features:
+        entries.extend(
+            (model, _feature_model_path(feature.key, model))
+            for model in feature.assets.models
+        )
+    entries.append((final_model, _final_model_path(pipeline_name)))
+    return _model_manifest(entries)
+
+
+def _model_manifest(
+    entries: list[tuple[SqlmeshModelSpec, str]],
+) -> list[dict[str, object]]:
+    manifest: list[dict[str, object]] = []
+    for model, path in entries:
+        entry: dict[str, object] = {
+            "name": model.name,
+            "path": path,
+            "kind": model.kind,
+            "fingerprint": hashlib.sha256(
+                render_sqlmesh_model(model).encode("utf-8")
+            ).hexdigest(),
+        }
+        if _is_shared(model):
+            entry["shared"] = True
+        manifest.append(entry)
+    return manifest
+
+
+def _rendered_sql_path(pipeline_name: str) -> str:
+    return f"rendered/enriched__{pipeline_name}.sql"
+
+
+def _sqlmesh_project_files(
+    semantic_models: list[SqlmeshModelSpec],
+    features: list[BuiltFeature],
+    final_model: SqlmeshModelSpec,
+    pipeline_name: str,
+) -> dict[str, str]:
+    files = {
+        _semantic_model_path(model): render_sqlmesh_model(model)
+        for model in semantic_models
+    }
     for feature in features:
-        if not feature.assets.models:
-            continue
-        feature_dir = out_dir / "models" / "features" / feature.key
-        feature_dir.mkdir(parents=True, exist_ok=True)
         for model in feature.assets.models:
-            filename = f"{model.name.replace('.', '__')}.sql"
-            (feature_dir / filename).write_text(render_sqlmesh_model(model))
-
-    final_path = out_dir / "models" / "marts" / f"enriched__{pipeline_name}.sql"
-    final_path.write_text(render_sqlmesh_model(final_model))
-
+            files[_feature_model_path(feature.key, model)] = render_sqlmesh_model(model)
+    files[_final_model_path(pipeline_name)] = render_sqlmesh_model(final_model)
+    files[f"audits/{ROW_COUNT_AUDIT}.sql"] = render_row_count_audit()
     for feature in features:
         for test in feature.assets.tests:
-            test_path = out_dir / "tests" / f"{test.name}.yaml"
-            test_path.write_text(test.yaml)
-
-
-def _write_rendered_sql(out_dir: Path, pipeline_name: str, sql: str) -> None:
-    path = out_dir / "rendered" / f"enriched__{pipeline_name}.sql"
-    path.write_text(sql)
-
-
-def _write_compile_report(out_dir: Path, report: CompileReport) -> None:
-    path = out_dir / "manifest" / "compile_report.json"
-    path.write_text(json.dumps(report.__dict__, indent=2, sort_keys=True))
-
-
-def _write_profiling_notebook(out_dir: Path, pipeline_name: str, text: str) -> None:
-    path = out_dir / "notebooks" / f"profile__{pipeline_name}.py"
-    path.write_text(text)
-
-
-def _write_sqlmesh_config(out_dir: Path, text: str) -> None:
-    path = out_dir / "sqlmesh.yaml"
-    path.write_text(text)
+            files[f"tests/{test.name}.yaml"] = test.yaml
+    return files
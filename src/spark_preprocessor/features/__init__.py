@@ -2,11 +2,23 @@
 
 from spark_preprocessor.features.builtins import register_builtins
 from spark_preprocessor.features.registry import (
+    DEFAULT_REGISTRY,
+    FeatureRegistry,
+    RegistrySnapshot,
     get_feature,
     list_features,
     register_feature,
+    registering_into,
 )
 
 register_builtins(register_feature)
 
-__all__ = ["get_feature", "list_features", "register_feature"]
+__all__ = [
+    "DEFAULT_REGISTRY",
+    "FeatureRegistry",
+    "RegistrySnapshot",
+    "get_feature",
+    "list_features",
+    "register_feature",
+    "registering_into",
+]
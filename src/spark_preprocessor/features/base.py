@@ -45,14 +45,23 @@ class SqlmeshModelSpec:
     sql: str
     kind: str
     tags: list[str]
+    columns: dict[str, str] | None = None
+    audits: list[str] | None = None
 
 
 @dataclass(frozen=True)
 class JoinModelSpec:
+    """A model joined onto the spine.
+
+    `grain` lists the joined model's columns it is unique on. When omitted it is
+    inferred from the ON clause's equalities against spine columns.
+    """
+
     model_name: str
     alias: str
     on: str
     join_type: str
+    grain: tuple[str, ...] | None = None
 
 
 @dataclass(frozen=True)
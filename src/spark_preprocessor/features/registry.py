@@ -1,26 +1,369 @@
 """Feature registry."""
 
-from collections.abc import Iterable
+import importlib
+import threading
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from importlib.metadata import entry_points
+from types import MappingProxyType
 
-from spark_preprocessor.errors import FeatureNotFoundError, ValidationError
+from spark_preprocessor.errors import (
+    ConfigurationError,
+    FeatureNotFoundError,
+    ValidationError,
+)
 from spark_preprocessor.features.base import Feature
 
-_REGISTRY: dict[str, Feature] = {}
+
+class RegistrySnapshot(Mapping[str, Feature]):
+    """Immutable mapping of feature key to feature, with lookup indexes.
+
+    Alongside the features it keeps indexes from each provided output column,
+    each required `(entity, column)` and each declared compatible grain to the
+    keys of the features involved, so dependency and candidate lookups do not
+    scan the whole catalog. Indexes are extended incrementally by
+    `with_features`; nothing is ever mutated in place.
+    """
+
+    def __init__(self) -> None:
+        self._features: Mapping[str, Feature] = MappingProxyType({})
+        self._outputs: Mapping[str, tuple[str, ...]] = MappingProxyType({})
+        self._requirements: Mapping[tuple[str, str], tuple[str, ...]] = (
+            MappingProxyType({})
+        )
+        self._grains: Mapping[str, tuple[str, ...]] = MappingProxyType({})
+
+    def __getitem__(self, key: str) -> Feature:
+        return self._features[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._features)
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    @property
+    def outputs(self) -> Mapping[str, tuple[str, ...]]:
+        """Output column -> keys of the features providing it."""
+
+        return self._outputs
+
+    def providers(self, column: str) -> tuple[str, ...]:
+        return self._outputs.get(column, ())
+
+    def requiring(self, entity: str, column: str | None = None) -> tuple[str, ...]:
+        """Keys of features requiring `entity.column` (any column if None)."""
+
+        if column is not None:
+            return self._requirements.get((entity, column), ())
+        keys: dict[str, None] = {}
+        for (required_entity, _), required_by in self._requirements.items():
+            if required_entity == entity:
+                keys.update(dict.fromkeys(required_by))
+        return tuple(keys)
+
+    def compatible_with(self, grain: str) -> tuple[str, ...]:
+        """Keys of features declaring `grain` in `compatible_grains`."""
+
+        return self._grains.get(grain, ())
+
+    def search(
+        self,
+        *,
+        provides: str | None = None,
+        requires: str | None = None,
+        grain: str | None = None,
+    ) -> list[str]:
+        """Keys of features matching every given filter, sorted.
+
+        Args:
+            provides: Output column the feature must provide.
+            requires: `entity` or `entity.column` the feature must require.
+            grain: Grain the feature must declare as compatible.
+        """
+
+        candidates: list[tuple[str, ...]] = []
+        if provides is not None:
+            candidates.append(self.providers(provides))
+        if requires is not None:
+            entity, _, column = requires.partition(".")
+            candidates.append(self.requiring(entity, column or None))
+        if grain is not None:
+            candidates.append(self.compatible_with(grain))
+        if not candidates:
+            return sorted(self._features)
+        matches = set(min(candidates, key=len))
+        for keys in candidates:
+            matches.intersection_update(keys)
+        return sorted(matches)
+
+    def with_features(self, features: Iterable[Feature]) -> "RegistrySnapshot":
+        """Return a new snapshot with `features` added."""
+
+        registered = dict(self._features)
+        # Index entries touched by this batch are accumulated as lists and
+        # frozen once, so adding n features sharing a grain stays linear.
+        outputs: dict[str, list[str]] = {}
+        requirements: dict[tuple[str, str], list[str]] = {}
+        grains: dict[str, list[str]] = {}
+
+        def add(index: dict, current: Mapping, index_key, key: str) -> None:
+            if index_key not in index:
+                index[index_key] = list(current.get(index_key, ()))
+            index[index_key].append(key)
+
+        for feature in features:
+            meta = feature.meta
+            if meta.key in registered:
+                raise ValidationError(f"Feature already registered: {meta.key}")
+            registered[meta.key] = feature
+            for spec in meta.provides:
+                add(outputs, self._outputs, spec.name, meta.key)
+            for requirement in meta.requirements:
+                for column in sorted(requirement.columns):
+                    index_key = (requirement.entity, column)
+                    add(requirements, self._requirements, index_key, meta.key)
+            for grain in meta.compatible_grains or ():
+                add(grains, self._grains, grain, meta.key)
+
+        snapshot = RegistrySnapshot()
+        snapshot._features = MappingProxyType(registered)
+        snapshot._outputs = _merged(self._outputs, outputs)
+        snapshot._requirements = _merged(self._requirements, requirements)
+        snapshot._grains = _merged(self._grains, grains)
+        return snapshot
+
+
+def _merged(current: Mapping, updates: dict) -> Mapping:
+    if not updates:
+        return current
+    merged = dict(current)
+    merged.update((key, tuple(keys)) for key, keys in updates.items())
+    return MappingProxyType(merged)
+
+
+class FeatureRegistry:
+    """Thread-safe feature registry with immutable snapshots.
+
+    Registration is copy-on-write under a lock: every read sees a complete,
+    immutable `RegistrySnapshot`, so compiles running in other threads never
+    observe a partial update and never need to lock. Use `copy()` to derive a
+    registry with extra (e.g. client-specific) features without touching the
+    original.
+
+    Features can also be registered lazily as `key -> "module:attribute"`
+    targets, either explicitly or from the entry points of
+    `entry_point_group`. Targets are imported only when `load` (or `get`)
+    needs their key; discovery reads package metadata only. A lazy feature
+    may declare the columns it provides (entry-point extras, e.g.
+    `"pkg.mod:Feature [risk_score]"`), so `lazy_providers` can find it
+    without importing anything.
+    """
+
+    def __init__(
+        self,
+        features: Iterable[Feature] = (),
+        *,
+        entry_point_group: str | None = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._features = RegistrySnapshot().with_features(features)
+        self._lazy: Mapping[str, str] = MappingProxyType({})
+        self._lazy_outputs: Mapping[str, tuple[str, ...]] = MappingProxyType({})
+        self._entry_point_group = entry_point_group
+        self._discovered = entry_point_group is None
+
+    def register(self, feature: Feature) -> None:
+        self.register_all([feature])
+
+    def register_all(self, features: Iterable[Feature]) -> None:
+        """Register several features with a single copy of the indexes."""
+
+        features = list(features)
+        with self._lock:
+            self._features = self._features.with_features(features)
+
+    def register_lazy(
+        self,
+        manifest: Mapping[str, str],
+        provides: Mapping[str, Iterable[str]] | None = None,
+    ) -> None:
+        """Register feature keys to be imported from `module:attribute` on use.
+
+        `provides` optionally declares the output columns of those keys.
+        """
+
+        outputs = {key: tuple(columns) for key, columns in (provides or {}).items()}
+        with self._lock:
+            self._lazy = MappingProxyType({**self._lazy, **manifest})
+            self._lazy_outputs = MappingProxyType({**self._lazy_outputs, **outputs})
+
+    def load(self, keys: Iterable[str]) -> None:
+        """Import and register the lazily registered features among `keys`.
+
+        Keys that are already registered or unknown are ignored; unknown keys
+        surface as `FeatureNotFoundError` when they are looked up.
+        """
+
+        missing = [key for key in dict.fromkeys(keys) if key not in self._features]
+        if not missing:
+            return
+        manifest = self.manifest()
+        loaded = [
+            _load_feature(key, manifest[key]) for key in missing if key in manifest
+        ]
+        with self._lock:
+            # A plugin module may also register its features on import.
+            fresh = {
+                feature.meta.key: feature
+                for feature in loaded
+                if feature.meta.key not in self._features
+            }
+            self._features = self._features.with_features(fresh.values())
+
+    def load_all(self) -> None:
+        """Import every lazily registered feature."""
+
+        self.load(self.manifest())
+
+    def manifest(self) -> Mapping[str, str]:
+        """Lazily registered (and discovered) keys and their import targets."""
+
+        if not self._discovered:
+            found = list(entry_points(group=self._entry_point_group))
+            discovered = {
+                entry_point.name: _entry_point_target(entry_point)
+                for entry_point in found
+            }
+            outputs = {
+                entry_point.name: tuple(entry_point.extras)
+                for entry_point in found
+                if entry_point.extras
+            }
+            with self._lock:
+                self._lazy = MappingProxyType({**discovered, **self._lazy})
+                self._lazy_outputs = MappingProxyType({**outputs, **self._lazy_outputs})
+                self._discovered = True
+        return self._lazy
+
+    def lazy_providers(self, columns: Iterable[str]) -> list[str]:
+        """Unloaded lazy keys that declare any of `columns` among their outputs."""
+
+        wanted = set(columns)
+        manifest = self.manifest()
+        return [
+            key
+            for key, outputs in self._lazy_outputs.items()
+            if key in manifest
+            and key not in self._features
+            and not wanted.isdisjoint(outputs)
+        ]
+
+    def get(self, key: str) -> Feature:
+        self.load([key])
+        try:
+            return self._features[key]
+        except KeyError as exc:
+            raise FeatureNotFoundError(f"Unknown feature key: {key}") from exc
+
+    def keys(self) -> Iterable[str]:
+        """Registered keys, followed by lazily registered keys not yet loaded."""
+
+        registered = self._features
+        return [
+            *registered.keys(),
+            *(key for key in self.manifest() if key not in registered),
+        ]
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Return the currently loaded features and indexes, immutably."""
+
+        return self._features
+
+    def copy(self) -> "FeatureRegistry":
+        """Return an independent registry starting from the current features."""
+
+        registry = FeatureRegistry(entry_point_group=self._entry_point_group)
+        registry._features = self._features
+        registry._lazy = self._lazy
+        registry._lazy_outputs = self._lazy_outputs
+        registry._discovered = self._discovered
+        return registry
+
+    def restore(self, saved: "FeatureRegistry") -> None:
+        """Reset this registry to the state of `saved`, e.g. an earlier `copy()`.
+
+        Loaded features, lazy registrations and whether entry points were
+        discovered are all restored.
+        """
+
+        with self._lock:
+            self._features = saved._features
+            self._lazy = saved._lazy
+            self._lazy_outputs = saved._lazy_outputs
+            self._entry_point_group = saved._entry_point_group
+            self._discovered = saved._discovered
+
+
+def _entry_point_target(entry_point) -> str:
+    # Extras carry declared outputs, not part of the import target.
+    if entry_point.attr:
+        return f"{entry_point.module}:{entry_point.attr}"
+    return entry_point.module
+
+
+def _load_feature(key: str, target: str) -> Feature:
+    module_name, _, attribute = target.partition(":")
+    try:
+        value: object = importlib.import_module(module_name)
+        for name in attribute.split(".") if attribute else ():
+            value = getattr(value, name)
+    except (ImportError, AttributeError) as exc:
+        raise ConfigurationError(
+            f"Cannot load feature '{key}' from {target}: {exc}"
+        ) from exc
+    feature = value() if isinstance(value, type) else value
+    meta = getattr(feature, "meta", None)
+    if getattr(meta, "key", None) != key:
+        raise ConfigurationError(
+            f"Feature loaded from {target} does not have key '{key}'"
+        )
+    return feature
+
+
+ENTRY_POINT_GROUP = "spark_preprocessor.features"
+
+DEFAULT_REGISTRY = FeatureRegistry(entry_point_group=ENTRY_POINT_GROUP)
+
+
+_TARGET_REGISTRY: ContextVar[FeatureRegistry | None] = ContextVar(
+    "target_registry", default=None
+)
+
+
+@contextmanager
+def registering_into(registry: FeatureRegistry) -> Iterator[FeatureRegistry]:
+    """Direct `register_feature` calls in this context to `registry`.
+
+    Lets feature modules that register themselves on import be (re)loaded
+    into a registry other than `DEFAULT_REGISTRY`.
+    """
+
+    token = _TARGET_REGISTRY.set(registry)
+    try:
+        yield registry
+    finally:
+        _TARGET_REGISTRY.reset(token)
 
 
 def register_feature(feature: Feature) -> None:
-    key = feature.meta.key
-    if key in _REGISTRY:
-        raise ValidationError(f"Feature already registered: {key}")
-    _REGISTRY[key] = feature
+    (_TARGET_REGISTRY.get() or DEFAULT_REGISTRY).register(feature)
 
 
 def get_feature(key: str) -> Feature:
-    try:
-        return _REGISTRY[key]
-    except KeyError as exc:
-        raise FeatureNotFoundError(f"Unknown feature key: {key}") from exc
+    return DEFAULT_REGISTRY.get(key)
 
 
 def list_features() -> Iterable[str]:
-    return _REGISTRY.keys()
+    return DEFAULT_REGISTRY.keys()
@@ -0,0 +1,231 @@
+"""Column-level lineage from output columns back to physical columns."""
+
+import json
+from pathlib import Path
+
+from sqlglot import exp, parse_one
+from sqlglot.errors import SqlglotError
+from sqlglot.lineage import lineage as column_lineage
+from sqlglot.optimizer.qualify import qualify
+from sqlglot.optimizer.scope import Scope, build_scope
+
+from spark_preprocessor.errors import ConfigurationError
+from spark_preprocessor.features.base import SqlmeshModelSpec
+
+LINEAGE_PATH = Path("manifest") / "lineage.json"
+
+
+def build_lineage(
+    models: list[SqlmeshModelSpec],
+    output_model: str,
+    physical_columns: dict[str, dict[str, str | None]] | None = None,
+) -> dict[str, object]:
+    """Trace every output column of `output_model` to physical columns.
+
+    Each model's query is traced one hop at a time; references to other
+    compiled models (semantic views, feature models) are followed until they
+    reach tables the project does not define, i.e. the mapped physical tables.
+    Every model is parsed and qualified once, against the columns of the
+    tables it reads, so stars and unqualified columns bind to their sources.
+
+    Args:
+        models: Every compiled model, including `output_model`.
+        output_model: Name of the final model whose columns are traced.
+        physical_columns: Column types of the mapped physical tables, keyed by
+            table (untyped columns map to None).
+
+    Returns:
+        The `manifest/lineage.json` payload: `columns` maps each output column
+        to its physical `table.column` sources and the models it flows
+        through, `index` maps each physical column to the output columns it
+        feeds, and `unresolved` lists output columns that could not be traced.
+    """
+
+    by_name = {model.name: model for model in models}
+    tracer = _Tracer(by_name, physical_columns or {})
+    columns: dict[str, dict[str, list[str]]] = {}
+    unresolved: list[str] = []
+    for column in tracer.output_columns(output_model):
+        traced = tracer.trace(output_model, column)
+        if traced is None:
+            unresolved.append(column)
+            continue
+        sources, via = traced
+        columns[column] = {"sources": sorted(sources), "models": sorted(via)}
+
+    index: dict[str, list[str]] = {}
+    for column, traced in columns.items():
+        for source in traced["sources"]:
+            index.setdefault(source, []).append(column)
+    return {
+        "output_table": output_model,
+        "columns": columns,
+        "index": {source: sorted(outputs) for source, outputs in sorted(index.items())},
+        "unresolved": unresolved,
+    }
+
+
+def load_lineage(project_dir: str | Path) -> dict[str, object]:
+    """Load `manifest/lineage.json` from a compiled project."""
+
+    path = Path(project_dir) / LINEAGE_PATH
+    if not path.exists():
+        raise ConfigurationError(
+            f"Lineage manifest not found: {path} (compile with --lineage)"
+        )
+    try:
+        payload = json.loads(path.read_text())
+        if not isinstance(payload["index"], dict):
+            raise TypeError("index must be an object")
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ConfigurationError(f"Invalid lineage manifest: {path}") from exc
+    return payload
+
+
+def affected_outputs(lineage: dict[str, object], physical_column: str) -> list[str]:
+    """List the output columns fed by a physical `table.column`.
+
+    Matching is case-insensitive, and a partially qualified name matches any
+    fully qualified one it is a suffix of (`patients.dob` matches
+    `catalog.raw.patients.dob`).
+    """
+
+    wanted = physical_column.lower()
+    outputs: set[str] = set()
+    for source, columns in lineage["index"].items():
+        key = source.lower()
+        if key == wanted or key.endswith(f".{wanted}"):
+            outputs.update(columns)
+    return sorted(outputs)
+
+
+class _Tracer:
+    """Follows column lineage across models, caching each model column.
+
+    Each model is parsed, qualified and scoped once; its output columns then
+    type the schema of the models that read it.
+    """
+
+    def __init__(
+        self,
+        models: dict[str, SqlmeshModelSpec],
+        physical_columns: dict[str, dict[str, str | None]],
+    ) -> None:
+        self._models = models
+        self._physical = {
+            table.lower(): columns for table, columns in physical_columns.items()
+        }
+        self._scopes: dict[str, Scope | None] = {}
+        self._cache: dict[tuple[str, str], tuple[set[str], set[str]] | None] = {}
+
+    def output_columns(self, model: str) -> list[str]:
+        """Return a model's output columns (empty if it cannot be parsed)."""
+
+        scope = self._scope(model)
+        return [] if scope is None else list(scope.expression.named_selects)
+
+    def trace(self, model: str, column: str) -> tuple[set[str], set[str]] | None:
+        """Return the physical sources and upstream models of a model column."""
+
+        key = (model, column)
+        if key not in self._cache:
+            self._cache[key] = None  # guards against reference cycles
+            self._cache[key] = self._trace(model, column)
+        return self._cache[key]
+
+    def _scope(self, model: str) -> Scope | None:
+        if model not in self._scopes:
+            self._scopes[model] = None  # guards against reference cycles
+            self._scopes[model] = self._qualify(self._models[model])
+        return self._scopes[model]
+
+    def _qualify(self, model: SqlmeshModelSpec) -> Scope | None:
+        try:
+            expression = parse_one(model.sql, dialect="spark")
+            schema: dict[str, dict[str, str]] = {}
+            for table in expression.find_all(exp.Table):
+                name = _table_name(table)
+                columns = self._table_columns(name)
+                if columns:
+                    schema[name] = columns
+            qualified = qualify(
+                expression,
+                dialect="spark",
+                schema=_nested_schema(schema),
+                validate_qualify_columns=False,
+                identify=False,
+            )
+        except SqlglotError:
+            return None
+        return build_scope(qualified)
+
+    def _table_columns(self, table: str) -> dict[str, str]:
+        if table in self._models:
+            model = self._models[table]
+            types = model.columns or {}
+            return {
+                column: types.get(column) or "UNKNOWN"
+                for column in self.output_columns(table)
+            }
+        return {
+            column: dtype or "UNKNOWN"
+            for column, dtype in self._physical.get(table.lower(), {}).items()
+        }
+
+    def _trace(self, model: str, column: str) -> tuple[set[str], set[str]] | None:
+        scope = self._scope(model)
+        if scope is None:
+            return None
+        try:
+            root = column_lineage(
+                column, scope.expression, scope=scope, dialect="spark", copy=False
+            )
+        except SqlglotError:
+            return None
+
+        sources: set[str] = set()
+        via: set[str] = set()
+        for node in root.walk():
+            if node.downstream:
+                continue
+            if isinstance(node.expression, exp.Placeholder):
+                # sqlglot could not bind the column to a source (ambiguous or
+                # unknown reference).
+                return None
+            if not isinstance(node.expression, exp.Table):
+                continue
+            table = _table_name(node.expression)
+            source_column = node.name.split(".")[-1]
+            if table not in self._models:
+                sources.add(f"{table}.{source_column}")
+                continue
+            upstream = self.trace(table, source_column)
+            if upstream is None:
+                return None
+            via.add(table)
+            sources.update(upstream[0])
+            via.update(upstream[1])
+        return sources, via
+
+
+def _nested_schema(tables: dict[str, dict[str, str]]) -> dict[str, object]:
+    """Nest `catalog.db.table` names the way sqlglot's schema expects.
+
+    sqlglot needs every table at the same depth; shorter names are padded
+    with a placeholder catalog, which still matches them by suffix.
+    """
+
+    depth = max((len(name.split(".")) for name in tables), default=0)
+    nested: dict[str, object] = {}
+    for name, columns in tables.items():
+        parts = name.split(".")
+        parts = ["_"] * (depth - len(parts)) + parts
+        level = nested
+        for part in parts[:-1]:
+            level = level.setdefault(part, {})
+        level[parts[-1]] = columns
+    return nested
+
+
+def _table_name(table: exp.Table) -> str:
+    return ".".join(part.name for part in table.parts)
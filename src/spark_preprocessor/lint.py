@@ -0,0 +1,231 @@
+"""Compile-time lint of feature SQL for known-expensive patterns."""
+
+from dataclasses import dataclass
+
+from sqlglot import exp, parse_one
+from sqlglot.errors import ParseError
+
+from spark_preprocessor.errors import ValidationError
+from spark_preprocessor.features.base import (
+    BuildContext,
+    JoinModelSpec,
+    SqlmeshModelSpec,
+)
+
+# Rule id -> severity. `error` findings fail compilation under `lint.policy: fail`.
+RULES = {
+    "order-by-in-view": "error",
+    "order-by-without-limit": "warning",
+    "select-star-raw-table": "error",
+    "select-star": "warning",
+    "udf-call": "warning",
+    "cross-join": "error",
+    "non-equi-join": "error",
+    "distinct-over-history": "warning",
+    "subquery-in-select": "warning",
+}
+
+
+@dataclass(frozen=True)
+class LintFinding:
+    """A known-expensive pattern in a feature's SQL."""
+
+    rule: str
+    severity: str
+    feature: str
+    location: str
+    message: str
+
+    def render(self) -> str:
+        return (
+            f"[{self.severity}] {self.feature} ({self.location}) "
+            f"{self.rule}: {self.message}"
+        )
+
+
+@dataclass(frozen=True)
+class SqlMetrics:
+    """Size and complexity of one compiled model's SQL."""
+
+    join_count: int
+    expression_depth: int
+    sql_size: int
+
+
+def lint_model(
+    feature: str, model: SqlmeshModelSpec, ctx: BuildContext
+) -> list[LintFinding]:
+    """Lint a feature model's query."""
+
+    tree = _parse(model.sql)
+    location = model.name
+    findings: list[LintFinding] = []
+
+    for order in tree.find_all(exp.Order):
+        if isinstance(order.parent, exp.Window):
+            continue
+        if order.parent is not None and order.parent.args.get("limit"):
+            continue
+        rule = "order-by-in-view" if model.kind == "VIEW" else "order-by-without-limit"
+        findings.append(
+            _finding(rule, feature, location, "ORDER BY without LIMIT is discarded")
+        )
+
+    raw_tables = {table.lower() for table in _mapped_tables(ctx)}
+    history = {
+        f"semantic.{entity}"
+        for entity in ctx.mapping.entities
+        if entity != ctx.spine_entity
+    }
+    for select in tree.find_all(exp.Select):
+        sources = _source_tables(select)
+        if any(_is_star(projection) for projection in select.expressions):
+            raw = sorted(source for source in sources if source in raw_tables)
+            if raw:
+                findings.append(
+                    _finding(
+                        "select-star-raw-table",
+                        feature,
+                        location,
+                        f"SELECT * over mapped physical table(s) {raw}",
+                    )
+                )
+            else:
+                findings.append(
+                    _finding("select-star", feature, location, "SELECT * projection")
+                )
+        if select.args.get("distinct") and not select.args.get("where"):
+            scanned = sorted(source for source in sources if source in history)
+            if scanned:
+                findings.append(
+                    _finding(
+                        "distinct-over-history",
+                        feature,
+                        location,
+                        f"unfiltered SELECT DISTINCT over {scanned}",
+                    )
+                )
+
+    for join in tree.find_all(exp.Join):
+        on = join.args.get("on")
+        if on is None and not join.args.get("using"):
+            findings.append(
+                _finding("cross-join", feature, location, join.sql(dialect="spark"))
+            )
+        elif on is not None and not _has_column_equality(on):
+            findings.append(
+                _finding("non-equi-join", feature, location, on.sql(dialect="spark"))
+            )
+
+    findings.extend(_udf_calls(tree, feature, location))
+    return findings
+
+
+def lint_join(feature: str, join: JoinModelSpec) -> list[LintFinding]:
+    """Lint how a feature model is joined onto the spine."""
+
+    location = f"join {join.alias}"
+    condition = _parse(join.on)
+    if _has_column_equality(condition):
+        return []
+    return [_finding("non-equi-join", feature, location, join.on)]
+
+
+def lint_select_expression(feature: str, expression: str) -> list[LintFinding]:
+    """Lint one `<expression> AS <alias>` select expression."""
+
+    tree = _parse(expression)
+    location = "select"
+    findings = _udf_calls(tree, feature, location)
+    if any(tree.find_all(exp.Subquery)):
+        findings.append(
+            _finding(
+                "subquery-in-select",
+                feature,
+                location,
+                f"subquery evaluated per spine row: {expression}",
+            )
+        )
+    return findings
+
+
+def sql_metrics(sql: str) -> SqlMetrics:
+    """Measure join count, AST depth and size of a query."""
+
+    tree = _parse(sql)
+    return SqlMetrics(
+        join_count=sum(1 for _ in tree.find_all(exp.Join)),
+        expression_depth=max(node.depth for node in tree.walk()),
+        sql_size=len(sql),
+    )
+
+
+def check_lint(findings: list[LintFinding], policy: str) -> None:
+    """Raise ValidationError on error findings under the `fail` policy."""
+
+    errors = [finding for finding in findings if finding.severity == "error"]
+    if policy != "fail" or not errors:
+        return
+    details = "; ".join(finding.render() for finding in errors)
+    raise ValidationError(f"Lint failed ({len(errors)} errors): {details}")
+
+
+def _finding(rule: str, feature: str, location: str, message: str) -> LintFinding:
+    return LintFinding(
+        rule=rule,
+        severity=RULES[rule],
+        feature=feature,
+        location=location,
+        message=message,
+    )
+
+
+def _parse(sql: str) -> exp.Expression:
+    try:
+        return parse_one(sql, dialect="spark")
+    except ParseError as exc:
+        raise ValidationError(f"Invalid SQL: {sql}") from exc
+
+
+def _udf_calls(tree: exp.Expression, feature: str, location: str) -> list[LintFinding]:
+    # Functions sqlglot does not recognize as Spark builtins are parsed as
+    # `Anonymous`; they are typically (Python) UDFs.
+    names = sorted({call.name for call in tree.find_all(exp.Anonymous)})
+    return [
+        _finding("udf-call", feature, location, f"call to non-builtin function {name}")
+        for name in names
+    ]
+
+
+def _is_star(projection: exp.Expression) -> bool:
+    return isinstance(projection, exp.Star) or (
+        isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star)
+    )
+
+
+def _source_tables(select: exp.Select) -> set[str]:
+    sources = [select.args.get("from"), *(select.args.get("joins") or [])]
+    return {
+        ".".join(part.name for part in table.parts).lower()
+        for source in sources
+        if source is not None
+        for table in [source.this]
+        if isinstance(table, exp.Table)
+    }
+
+
+def _has_column_equality(condition: exp.Expression) -> bool:
+    return any(
+        isinstance(eq.this, exp.Column)
+        and isinstance(eq.expression, exp.Column)
+        and (eq.this.table != eq.expression.table or not eq.this.table)
+        for eq in condition.find_all(exp.EQ)
+    )
+
+
+def _mapped_tables(ctx: BuildContext) -> set[str]:
+    return {
+        entity_mapping.table.replace("`", "").replace('"', "")
+        for mappings in (ctx.mapping.entities, ctx.mapping.references)
+        for entity_mapping in mappings.values()
+    }
@@ -0,0 +1,296 @@
+"""Query-plan snapshots of compiled models and structural plan diffs."""
+
+import json
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import structlog
+from sqlglot import exp, transpile
+from sqlglot.errors import ParseError
+
+from spark_preprocessor.errors import ConfigurationError, ValidationError
+from spark_preprocessor.features.base import SqlmeshModelSpec
+from spark_preprocessor.preflight import parse_table_ref
+from spark_preprocessor.runtime.local import (
+    LocalSource,
+    bind_sources,
+    build_gateway,
+)
+from spark_preprocessor.schema import MappingSpec
+
+PLANS_PATH = Path("manifest") / "plans.json"
+
+# Estimated cardinalities that grow by more than this factor are reported.
+DEFAULT_CARDINALITY_FACTOR = 10.0
+
+
+@dataclass(frozen=True)
+class PlanChange:
+    """A structural difference between two captured plans of one model.
+
+    `engine_change` marks differences between snapshots captured on different
+    engine versions, which may come from the engine rather than the SQL.
+    """
+
+    model: str
+    change: str
+    before: object
+    after: object
+    engine_change: bool = False
+
+    def render(self) -> str:
+        rendered = f"{self.model} {self.change}: {self.before} -> {self.after}"
+        return f"{rendered} (engine change)" if self.engine_change else rendered
+
+
+def capture_plans(
+    models: list[SqlmeshModelSpec],
+    tables: dict[str, dict[str, str | None]],
+    mapping: MappingSpec,
+    sources: list[LocalSource] | None = None,
+) -> dict[str, object]:
+    """EXPLAIN every model against a scratch DuckDB database.
+
+    Mapped tables bound in `sources` are read from sample data; the others are
+    created empty with the given column types (untyped columns become
+    VARCHAR). Models are explained in order and then materialized, so each
+    plan sees its upstream models. A model DuckDB cannot plan (e.g. one using
+    Spark-only functions) records the error instead and, if it declares
+    `columns`, is stood in for by an empty table of that shape.
+
+    Args:
+        models: Compiled models in dependency order.
+        tables: Physical column types keyed by mapped table.
+        mapping: Mapping whose tables the models read.
+        sources: Optional sample data for some of the mapped tables.
+
+    Returns:
+        The `manifest/plans.json` payload.
+    """
+
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise ConfigurationError("Plan capture requires the 'duckdb' extra") from exc
+
+    sources = sources or []
+    sampled = {source.table for source in sources}
+    log = structlog.get_logger()
+    summaries: dict[str, dict[str, object]] = {}
+    with tempfile.TemporaryDirectory(prefix="spark-preprocessor-plans-") as tmp:
+        gateway = build_gateway(mapping, Path(tmp) / "plans.duckdb")
+        bind_sources(gateway, sources)
+        conn = duckdb.connect(gateway.database)
+        try:
+            for name, path in gateway.catalogs.items():
+                conn.execute(f"ATTACH '{path}' AS {name}")
+            for table, columns in sorted(tables.items()):
+                if table not in sampled:
+                    _create_empty_table(conn, table, columns)
+            for model in models:
+                try:
+                    sql = transpile(model.sql, read="spark", write="duckdb")[0]
+                    plan = conn.execute(f"EXPLAIN (FORMAT JSON) {sql}").fetchall()
+                    summaries[model.name] = {
+                        "kind": model.kind,
+                        **summarize_plan(json.loads(plan[0][1])),
+                    }
+                    _create_schema(conn, model.name)
+                    relation = "TABLE" if model.kind == "TABLE" else "VIEW"
+                    conn.execute(f"CREATE OR REPLACE {relation} {model.name} AS {sql}")
+                except (ParseError, duckdb.Error) as exc:
+                    log.warning("plan_capture_failed", model=model.name, error=str(exc))
+                    summaries[model.name] = {"kind": model.kind, "error": str(exc)}
+                    if model.columns:
+                        # Keep downstream models plannable from the declared shape.
+                        _create_empty_table(conn, model.name, model.columns)
+        finally:
+            conn.close()
+
+    return {
+        "engine": "duckdb",
+        "engine_version": duckdb.__version__,
+        "tables": {
+            table: "sample" if table in sampled else "empty" for table in sorted(tables)
+        },
+        "models": summaries,
+    }
+
+
+def summarize_plan(plan: list[dict]) -> dict[str, object]:
+    """Reduce a DuckDB JSON plan to its joins, shape, and root cardinality."""
+
+    joins: list[dict[str, object]] = []
+
+    def walk(node: dict) -> str:
+        name = node.get("name", "")
+        extra = node.get("extra_info") or {}
+        if name.endswith("_JOIN") or name == "CROSS_PRODUCT":
+            joins.append(
+                {
+                    "operator": name,
+                    "join_type": "CROSS"
+                    if name == "CROSS_PRODUCT"
+                    else extra.get("Join Type"),
+                    "estimated_cardinality": _cardinality(extra),
+                }
+            )
+        children = [walk(child) for child in node.get("children") or []]
+        return f"{name}({', '.join(children)})" if children else name
+
+    shape = ", ".join(walk(node) for node in plan)
+    return {
+        "shape": shape,
+        "join_count": len(joins),
+        "cross_products": sum(join["join_type"] == "CROSS" for join in joins),
+        "joins": joins,
+        "estimated_cardinality": _cardinality(
+            (plan[0].get("extra_info") or {}) if plan else {}
+        ),
+    }
+
+
+def load_plans(project_dir: str | Path) -> dict[str, object]:
+    """Load `manifest/plans.json` from a compiled project."""
+
+    path = Path(project_dir) / PLANS_PATH
+    if not path.exists():
+        raise ConfigurationError(
+            f"No plan snapshot at {path} (compile with --capture-plans)"
+        )
+    try:
+        payload = json.loads(path.read_text())
+        if not isinstance(payload["models"], dict):
+            raise TypeError("models must be an object")
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ConfigurationError(f"Invalid plan snapshot: {path}") from exc
+    return payload
+
+
+def diff_plans(
+    before: dict[str, object],
+    after: dict[str, object],
+    *,
+    cardinality_factor: float = DEFAULT_CARDINALITY_FACTOR,
+) -> list[PlanChange]:
+    """List structural plan changes between two snapshots, model by model.
+
+    Reported changes are added/removed models, models that stopped (or
+    started) planning, join count and join operator/type changes, new cross
+    products, plan shape changes, and estimated cardinalities that grew by more
+    than `cardinality_factor` (only when both snapshots have non-zero
+    estimates, i.e. were captured over sample data).
+
+    Snapshots captured on different engines or engine versions are reported
+    as an `engine` change first, and every model change is then labelled as
+    an engine change.
+    """
+
+    old_models = before["models"]
+    new_models = after["models"]
+    old_engine = _engine(before)
+    new_engine = _engine(after)
+    engine_change = old_engine != new_engine
+    changes: list[PlanChange] = []
+    if engine_change:
+        changes.append(PlanChange("engine", "engine_version", old_engine, new_engine))
+    for model in sorted(old_models.keys() | new_models.keys()):
+        old, new = old_models.get(model), new_models.get(model)
+        if old is None or new is None:
+            changes.append(
+                PlanChange(
+                    model,
+                    "model",
+                    "absent" if old is None else "present",
+                    "absent" if new is None else "present",
+                    engine_change,
+                )
+            )
+            continue
+        if "error" in old or "error" in new:
+            if old.get("error") != new.get("error"):
+                changes.append(
+                    PlanChange(
+                        model,
+                        "error",
+                        old.get("error"),
+                        new.get("error"),
+                        engine_change,
+                    )
+                )
+            continue
+
+        for key in ("join_count", "cross_products"):
+            if old[key] != new[key]:
+                changes.append(
+                    PlanChange(model, key, old[key], new[key], engine_change)
+                )
+        old_joins, new_joins = _join_signature(old), _join_signature(new)
+        if old_joins != new_joins:
+            changes.append(
+                PlanChange(model, "joins", old_joins, new_joins, engine_change)
+            )
+        elif old["shape"] != new["shape"]:
+            changes.append(
+                PlanChange(model, "shape", old["shape"], new["shape"], engine_change)
+            )
+
+        old_rows = old.get("estimated_cardinality") or 0
+        new_rows = new.get("estimated_cardinality") or 0
+        if old_rows and new_rows > old_rows * cardinality_factor:
+            changes.append(
+                PlanChange(
+                    model, "estimated_cardinality", old_rows, new_rows, engine_change
+                )
+            )
+    return changes
+
+
+def check_plan_diff(changes: list[PlanChange]) -> None:
+    """Raise ValidationError if any plan changed structurally."""
+
+    if not changes:
+        return
+    details = "; ".join(change.render() for change in changes)
+    raise ValidationError(f"Plan changes ({len(changes)}): {details}")
+
+
+def _engine(snapshot: dict) -> str:
+    return f"{snapshot.get('engine')} {snapshot.get('engine_version')}"
+
+
+def _join_signature(summary: dict) -> list[str]:
+    return [f"{join['join_type']} {join['operator']}" for join in summary["joins"]]
+
+
+def _cardinality(extra: dict) -> int | None:
+    value = extra.get("Estimated Cardinality")
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _create_schema(conn, table: str) -> None:
+    ref = parse_table_ref(table)
+    if ref.schema is not None:
+        schema = f"{ref.catalog}.{ref.schema}" if ref.catalog else ref.schema
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+
+
+def _create_empty_table(conn, table: str, columns: dict[str, str | None]) -> None:
+    _create_schema(conn, table)
+    definitions = ", ".join(
+        f"{name} {_duckdb_type(dtype)}" for name, dtype in columns.items()
+    )
+    conn.execute(f"CREATE OR REPLACE TABLE {table} ({definitions})")
+
+
+def _duckdb_type(dtype: str | None) -> str:
+    if dtype is None:
+        return "VARCHAR"
+    try:
+        return exp.DataType.build(dtype, dialect="spark").sql(dialect="duckdb")
+    except (ParseError, ValueError):
+        return "VARCHAR"
@@ -0,0 +1,243 @@
+"""Pre-flight validation of mapped physical tables and columns."""
+
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from spark_preprocessor.errors import ValidationError
+from spark_preprocessor.schema import MappingSpec
+
+DEFAULT_COLUMNS_RELATION = "information_schema.columns"
+DATABRICKS_COLUMNS_RELATION = "system.information_schema.columns"
+
+_TYPE_FAMILIES = {
+    "string": {"string", "varchar", "char", "text", "character varying", "character"},
+    "integer": {
+        "tinyint",
+        "smallint",
+        "int",
+        "integer",
+        "bigint",
+        "long",
+        "short",
+        "byte",
+        "hugeint",
+        "int1",
+        "int2",
+        "int4",
+        "int8",
+        "utinyint",
+        "usmallint",
+        "uinteger",
+        "ubigint",
+    },
+    "fractional": {"float", "double", "real", "decimal", "numeric", "float4", "float8"},
+    "boolean": {"boolean", "bool"},
+    "date": {"date"},
+    "timestamp": {
+        "timestamp",
+        "timestamp_ntz",
+        "timestamp_ltz",
+        "timestamptz",
+        "datetime",
+        "timestamp with time zone",
+        "timestamp without time zone",
+    },
+    "binary": {"binary", "blob", "bytea", "varbinary"},
+}
+
+# Physical families that can be read safely where another family is declared.
+_WIDENING = {("integer", "fractional"), ("date", "timestamp")}
+
+
+@dataclass(frozen=True)
+class TableRef:
+    """A physical table identifier split into catalog/schema/name parts."""
+
+    identifier: str
+    catalog: str | None
+    schema: str | None
+    name: str
+
+
+@dataclass(frozen=True)
+class PreflightIssue:
+    table: str
+    column: str | None
+    problem: str
+
+    def render(self) -> str:
+        target = f"{self.table}.{self.column}" if self.column else self.table
+        return f"{target}: {self.problem}"
+
+
+@dataclass(frozen=True)
+class PreflightReport:
+    tables_checked: int
+    columns_checked: int
+    issues: list[PreflightIssue]
+    snapshot: dict[str, dict[str, str]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+def parse_table_ref(identifier: str) -> TableRef:
+    """Split a 1-3 part table identifier, stripping identifier quotes."""
+
+    parts = [part.strip('`"') for part in identifier.split(".")]
+    if not 1 <= len(parts) <= 3 or not all(parts):
+        raise ValidationError(f"Invalid table identifier: {identifier}")
+    padded = [None] * (3 - len(parts)) + parts
+    return TableRef(
+        identifier=identifier, catalog=padded[0], schema=padded[1], name=parts[-1]
+    )
+
+
+def render_catalog_query(
+    tables: Iterable[TableRef], columns_relation: str = DEFAULT_COLUMNS_RELATION
+) -> str:
+    """Render one information_schema query covering every table.
+
+    `system.information_schema.columns` spans every Databricks catalog, so
+    there a name without a catalog is resolved in `current_catalog()`.
+    """
+
+    predicates: list[str] = []
+    for table in sorted(set(tables), key=lambda ref: ref.identifier):
+        clauses = [f"lower(table_name) = {_literal(table.name)}"]
+        if table.schema is not None:
+            clauses.append(f"lower(table_schema) = {_literal(table.schema)}")
+        if table.catalog is not None:
+            clauses.append(f"lower(table_catalog) = {_literal(table.catalog)}")
+        elif columns_relation == DATABRICKS_COLUMNS_RELATION:
+            clauses.append("lower(table_catalog) = lower(current_catalog())")
+        predicates.append("(" + " AND ".join(clauses) + ")")
+    return (
+        "SELECT table_catalog, table_schema, table_name, column_name, data_type\n"
+        f"FROM {columns_relation}\n"
+        "WHERE " + "\n  OR ".join(predicates)
+    )
+
+
+def columns_relation_for(dialect: str) -> str:
+    """Pick the information_schema relation for an engine dialect."""
+
+    if dialect in {"databricks", "spark"}:
+        return DATABRICKS_COLUMNS_RELATION
+    return DEFAULT_COLUMNS_RELATION
+
+
+def run_preflight(
+    mapping: MappingSpec,
+    fetchall: Callable[[str], list[tuple]],
+    columns_relation: str = DEFAULT_COLUMNS_RELATION,
+) -> PreflightReport:
+    """Check mapped tables/columns against catalog metadata.
+
+    Args:
+        mapping: Mapping whose physical tables and columns are checked.
+        fetchall: Executes a SQL query and returns all rows.
+        columns_relation: Fully qualified `information_schema.columns` relation.
+
+    Returns:
+        PreflightReport listing missing tables/columns and type mismatches.
+    """
+
+    targets = [
+        (name, entity_mapping)
+        for mappings in (mapping.entities, mapping.references)
+        for name, entity_mapping in sorted(mappings.items())
+    ]
+    refs = {
+        entity_mapping.table: parse_table_ref(entity_mapping.table)
+        for _, entity_mapping in targets
+    }
+    if not refs:
+        return PreflightReport(tables_checked=0, columns_checked=0, issues=[])
+
+    rows = fetchall(render_catalog_query(refs.values(), columns_relation))
+
+    issues: list[PreflightIssue] = []
+    snapshot: dict[str, dict[str, str]] = {}
+    columns_checked = 0
+    for _, entity_mapping in targets:
+        ref = refs[entity_mapping.table]
+        catalog_columns = _columns_for(ref, rows)
+        if catalog_columns:
+            snapshot[ref.identifier] = catalog_columns
+        else:
+            issues.append(PreflightIssue(ref.identifier, None, "table not found"))
+            continue
+        for canonical, physical in sorted(entity_mapping.columns.items()):
+            columns_checked += 1
+            found = catalog_columns.get(physical.lower())
+            if found is None:
+                issues.append(
+                    PreflightIssue(ref.identifier, physical, "column not found")
+                )
+                continue
+            declared = entity_mapping.types.get(canonical)
+            if declared and not types_compatible(declared, found):
+                issues.append(
+                    PreflightIssue(
+                        ref.identifier,
+                        physical,
+                        f"type mismatch: declared {declared}, found {found}",
+                    )
+                )
+
+    return PreflightReport(
+        tables_checked=len(refs),
+        columns_checked=columns_checked,
+        issues=issues,
+        snapshot=snapshot,
+    )
+
+
+def check_preflight(report: PreflightReport) -> None:
+    """Raise ValidationError if the pre-flight report has issues."""
+
+    if report.ok:
+        return
+    details = "; ".join(issue.render() for issue in report.issues)
+    raise ValidationError(f"Pre-flight failed ({len(report.issues)} issues): {details}")
+
+
+def type_family(sql_type: str) -> str:
+    """Normalize a SQL type name to a coarse family (e.g. VARCHAR(10) -> string)."""
+
+    base = re.sub(r"\(.*\)$", "", sql_type.strip().lower()).strip()
+    if base.startswith(("array", "map", "struct")) or base.endswith("[]"):
+        return "complex"
+    for family, names in _TYPE_FAMILIES.items():
+        if base in names:
+            return family
+    return base
+
+
+def types_compatible(declared: str, physical: str) -> bool:
+    declared_family = type_family(declared)
+    physical_family = type_family(physical)
+    if declared_family == physical_family:
+        return True
+    return (physical_family, declared_family) in _WIDENING
+
+
+def _columns_for(ref: TableRef, rows: list[tuple]) -> dict[str, str]:
+    columns: dict[str, str] = {}
+    for catalog, schema, name, column, data_type in rows:
+        if str(name).lower() != ref.name.lower():
+            continue
+        if ref.schema is not None and str(schema).lower() != ref.schema.lower():
+            continue
+        if ref.catalog is not None and str(catalog).lower() != ref.catalog.lower():
+            continue
+        columns[str(column).lower()] = str(data_type)
+    return columns
+
+
+def _literal(value: str) -> str:
+    escaped = value.lower().replace("'", "''")
+    return f"'{escaped}'"
@@ -2,22 +2,216 @@
 
 import argparse
 import logging
+import time
+from collections.abc import Callable
 from pathlib import Path
 
 import structlog
 
+from spark_preprocessor.archive import open_project
 from spark_preprocessor.errors import SparkPreprocessorError
+from spark_preprocessor.preflight import (
+    check_preflight,
+    columns_relation_for,
+    run_preflight,
+)
+from spark_preprocessor.runtime.checkpoint import (
+    Checkpoint,
+    CompletedModel,
+    ModelEntry,
+    default_checkpoint_path,
+    environment_table,
+    load_checkpoint,
+    load_model_manifest,
+    resume_index,
+    save_checkpoint,
+)
+from spark_preprocessor.runtime.shared_tables import (
+    is_fresh,
+    load_shared_record,
+    record_shared_table,
+)
 from spark_preprocessor.schema import load_pipeline_document
 
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="spark-preprocessor-apply")
     parser.add_argument("--pipeline", required=True, type=Path)
-    parser.add_argument("--project", required=True, type=Path)
+    parser.add_argument(
+        "--project",
+        required=True,
+        type=Path,
+        help="Compiled project directory or project archive (.zip)",
+    )
     parser.add_argument("--environment", default=None)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip models completed by a previous run with the same fingerprint",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help=(
+            "Checkpoint file (default: <project>/.checkpoints/<environment>.json, "
+            "or .checkpoints/<archive name>/<environment>.json beside an archive)"
+        ),
+    )
+    parser.add_argument(
+        "--preflight",
+        action="store_true",
+        help="Validate mapped tables/columns against the catalog before planning",
+    )
+    parser.add_argument(
+        "--shared-max-age",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help=(
+            "Reuse shared feature tables materialized at most this long ago "
+            "(default: always recompute them)"
+        ),
+    )
     return parser
 
 
+def apply_models(
+    context,
+    models: list[ModelEntry],
+    *,
+    environment: str | None,
+    checkpoint_path: Path,
+    resume: bool = False,
+    on_model_applied: Callable[[ModelEntry, float, int | None], None] | None = None,
+    shared_max_age: float | None = None,
+) -> list[str]:
+    """Apply models one at a time in dependency order, checkpointing each.
+
+    Shared feature tables (content-addressed by the compiler) are restated,
+    so their data is recomputed from the current upstream tables, unless
+    `shared_max_age` is given. Then a table another pipeline or run already
+    materialized is reused when its registry record is at most that many
+    seconds old, its row count still matches, and SQLMesh's interval state
+    (which SQLMesh must keep in a store shared by those pipelines) has no
+    missing interval for it; otherwise it is restated.
+
+    Args:
+        context: SQLMesh context for the compiled project.
+        models: Models in dependency order (from `manifest/models.json`).
+        environment: SQLMesh environment name, or None for prod.
+        checkpoint_path: Where completed models are recorded.
+        resume: Reuse verified models from an existing checkpoint.
+        on_model_applied: Called after each applied model with the model, the
+            plan/apply wall time in seconds, and its row count (None for views).
+        shared_max_age: Maximum age of a reusable shared table in seconds
+            (None to always recompute shared tables).
+
+    Returns:
+        Names of the models that were applied (not reused). Whether each
+        shared table was reused or recomputed is recorded in the checkpoint
+        (`CompletedModel.shared_table`) and logged as `shared_tables`.
+    """
+
+    log = structlog.get_logger()
+    adapter = context.engine_adapter
+    if resume:
+        checkpoint = load_checkpoint(checkpoint_path, environment)
+    else:
+        checkpoint = Checkpoint(environment=environment)
+
+    def verify(model: ModelEntry, record: CompletedModel) -> bool:
+        table = environment_table(model.name, environment)
+        if not adapter.table_exists(table):
+            return False
+        if record.row_count is None:
+            return True
+        return _row_count(adapter, table) == record.row_count
+
+    start = resume_index(models, checkpoint, verify) if resume else 0
+    for model in models[:start]:
+        log.info("model_reused", model=model.name)
+    for model in models[start:]:
+        checkpoint.completed.pop(model.name, None)
+    save_checkpoint(checkpoint_path, checkpoint)
+
+    def recorded_fresh(model: ModelEntry) -> bool:
+        if shared_max_age is None:
+            return False
+        table = environment_table(model.name, environment)
+        if not adapter.table_exists(table):
+            return False
+        record = load_shared_record(adapter, model, environment)
+        if record is None or not is_fresh(record, shared_max_age):
+            return False
+        return _row_count(adapter, table) == record.row_count
+
+    recomputed: set[str] = set()
+
+    def plan_model(model: ModelEntry) -> tuple[object, bool]:
+        # Returns the plan and whether it reuses a shared table as is. A plan
+        # with missing intervals computes the model anyway. One without them
+        # keeps the existing data, so shared tables (unless reusable) and
+        # models downstream of a shared table recomputed in this run are
+        # restated.
+        plan = context.plan(
+            environment=environment, no_prompts=True, select_models=[model.name]
+        )
+        fqn = context.get_model(model.name).fqn
+        if model.shared and not plan.missing_intervals and recorded_fresh(model):
+            return plan, True
+        stale = model.shared or not recomputed.isdisjoint(context.dag.upstream(fqn))
+        if stale:
+            recomputed.add(fqn)
+        if plan.missing_intervals or not stale:
+            return plan, False
+        return context.plan(
+            environment=environment,
+            no_prompts=True,
+            select_models=[model.name],
+            restate_models=[model.name],
+        ), False
+
+    applied: list[str] = []
+    for model in models[start:]:
+        started = time.perf_counter()
+        plan, reused = plan_model(model)
+        context.apply(plan)
+        elapsed = time.perf_counter() - started
+        row_count = None
+        if model.kind != "VIEW":
+            row_count = _row_count(adapter, environment_table(model.name, environment))
+        if reused:
+            checkpoint.record(model, row_count, shared_table="reused")
+            save_checkpoint(checkpoint_path, checkpoint)
+            log.info("shared_table_reused", model=model.name, rows=row_count)
+            continue
+        if model.shared and row_count is not None:
+            record_shared_table(adapter, model, environment, row_count)
+        checkpoint.record(
+            model, row_count, shared_table="recomputed" if model.shared else None
+        )
+        save_checkpoint(checkpoint_path, checkpoint)
+        applied.append(model.name)
+        log.info(
+            "model_applied", model=model.name, rows=row_count, seconds=round(elapsed, 3)
+        )
+        if on_model_applied is not None:
+            on_model_applied(model, elapsed, row_count)
+    outcomes: dict[str, list[str]] = {"reused": [], "recomputed": []}
+    for name, record in checkpoint.completed.items():
+        if record.shared_table is not None:
+            outcomes[record.shared_table].append(name)
+    if any(outcomes.values()):
+        log.info("shared_tables", **outcomes)
+    return applied
+
+
+def _row_count(adapter, table: str) -> int:
+    row = adapter.fetchone(f"SELECT COUNT(*) FROM {table}")
+    return int(row[0])
+
+
 def main(argv: list[str] | None = None) -> None:
     structlog.configure(
         wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
@@ -31,9 +225,8 @@ def main(argv: list[str] | None = None) -> None:
         from sqlmesh.core.context import Context
 
         document = load_pipeline_document(args.pipeline)
-        context = Context(paths=args.project)
-        plan = context.plan(environment=args.environment, no_prompts=True)
-        context.apply(plan)
+        with open_project(args.project) as project_dir:
+            _apply(Context(paths=project_dir), document, project_dir, args)
         log.info(
             "apply_complete",
             pipeline=document.pipeline.name,
@@ -46,3 +239,36 @@ def main(argv: list[str] | None = None) -> None:
     except Exception as exc:  # noqa: BLE001 - boundary logging for Databricks runtime
         log.error("apply_failed", error=str(exc))
         raise
+
+
+def _apply(context, document, project_dir: Path, args: argparse.Namespace) -> None:
+    log = structlog.get_logger()
+    if args.preflight:
+        adapter = context.engine_adapter
+        report = run_preflight(
+            document.mapping,
+            adapter.fetchall,
+            columns_relation_for(adapter.dialect),
+        )
+        check_preflight(report)
+        log.info(
+            "preflight_complete",
+            tables=report.tables_checked,
+            columns=report.columns_checked,
+        )
+    models = load_model_manifest(project_dir)
+    if models is None:
+        if args.resume:
+            log.warning("resume_unavailable", reason="missing model manifest")
+        plan = context.plan(environment=args.environment, no_prompts=True)
+        context.apply(plan)
+    else:
+        apply_models(
+            context,
+            models,
+            environment=args.environment,
+            checkpoint_path=args.checkpoint
+            or default_checkpoint_path(args.project, args.environment),
+            resume=args.resume,
+            shared_max_age=args.shared_max_age,
+        )
@@ -0,0 +1,160 @@
+"""Model-level checkpoints for resumable runtime applies."""
+
+import json
+import os
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from spark_preprocessor.errors import ConfigurationError
+
+
+@dataclass(frozen=True)
+class ModelEntry:
+    """A compiled model as listed in `manifest/models.json`."""
+
+    name: str
+    path: str
+    kind: str
+    fingerprint: str
+    shared: bool = False
+
+
+@dataclass(frozen=True)
+class CompletedModel:
+    """Checkpoint record for a model whose apply finished.
+
+    `shared_table` is "reused" or "recomputed" for shared feature tables and
+    None for every other model.
+    """
+
+    fingerprint: str
+    completed_at: str
+    row_count: int | None = None
+    shared_table: str | None = None
+
+
+@dataclass
+class Checkpoint:
+    """Completed models for one project/environment, keyed by model name."""
+
+    environment: str | None
+    completed: dict[str, CompletedModel] = field(default_factory=dict)
+
+    def record(
+        self,
+        model: ModelEntry,
+        row_count: int | None = None,
+        shared_table: str | None = None,
+    ) -> None:
+        self.completed[model.name] = CompletedModel(
+            fingerprint=model.fingerprint,
+            completed_at=datetime.now(UTC).isoformat(),
+            row_count=row_count,
+            shared_table=shared_table,
+        )
+
+
+def load_model_manifest(project_dir: Path) -> list[ModelEntry] | None:
+    """Load the ordered model list emitted by the compiler.
+
+    Args:
+        project_dir: Compiled SQLMesh project directory.
+
+    Returns:
+        Models in dependency order, or None if the project has no model manifest.
+
+    Raises:
+        ConfigurationError: If the manifest exists but is malformed.
+    """
+
+    path = project_dir / "manifest" / "models.json"
+    if not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text())
+        return [ModelEntry(**entry) for entry in payload["models"]]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ConfigurationError(f"Invalid model manifest: {path}") from exc
+
+
+def default_checkpoint_path(project_dir: Path, environment: str | None) -> Path:
+    filename = f"{environment or 'prod'}.json"
+    if project_dir.is_file():
+        # Archives are extracted to a temporary directory; checkpoint beside them.
+        return project_dir.parent / ".checkpoints" / project_dir.stem / filename
+    return project_dir / ".checkpoints" / filename
+
+
+def load_checkpoint(path: Path, environment: str | None) -> Checkpoint:
+    """Load a checkpoint, returning an empty one if it is missing or stale.
+
+    A checkpoint recorded for a different environment is treated as empty.
+    """
+
+    if not path.exists():
+        return Checkpoint(environment=environment)
+    try:
+        payload = json.loads(path.read_text())
+        completed = {
+            name: CompletedModel(**record)
+            for name, record in payload["completed"].items()
+        }
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ConfigurationError(f"Invalid checkpoint file: {path}") from exc
+    if payload.get("environment") != environment:
+        return Checkpoint(environment=environment)
+    return Checkpoint(environment=environment, completed=completed)
+
+
+def save_checkpoint(path: Path, checkpoint: Checkpoint) -> None:
+    """Persist a checkpoint atomically so a crash never leaves a partial file."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "environment": checkpoint.environment,
+        "completed": {
+            name: asdict(record) for name, record in checkpoint.completed.items()
+        },
+    }
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+    os.replace(tmp_path, path)
+
+
+def resume_index(
+    models: list[ModelEntry],
+    checkpoint: Checkpoint,
+    verify: Callable[[ModelEntry, CompletedModel], bool],
+) -> int:
+    """Return the index of the first model that must be (re)applied.
+
+    A model is reusable only if its checkpoint fingerprint matches the compiled
+    fingerprint and `verify` confirms its output is still in place. Every model
+    after the first non-reusable one is re-applied as well.
+    """
+
+    for index, model in enumerate(models):
+        record = checkpoint.completed.get(model.name)
+        if record is None or record.fingerprint != model.fingerprint:
+            return index
+        if not verify(model, record):
+            return index
+    return len(models)
+
+
+def environment_table(name: str, environment: str | None) -> str:
+    """Resolve a model name to the view SQLMesh exposes in an environment.
+
+    Mirrors SQLMesh's default `schema` suffix target: `db.tbl` becomes
+    `db__dev.tbl` in the `dev` environment.
+    """
+
+    if environment in (None, "prod"):
+        return name
+    parts = name.split(".")
+    if len(parts) < 2:
+        return name
+    parts[-2] = f"{parts[-2]}__{environment}"
+    return ".".join(parts)
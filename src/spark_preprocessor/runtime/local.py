@@ -0,0 +1,396 @@
+"""Local DuckDB execution of a compiled pipeline."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import structlog
+
+from spark_preprocessor.compiler import compile_pipeline
+from spark_preprocessor.errors import ConfigurationError
+from spark_preprocessor.preflight import parse_table_ref
+from spark_preprocessor.runtime.apply_pipeline import apply_models
+from spark_preprocessor.runtime.checkpoint import (
+    ModelEntry,
+    default_checkpoint_path,
+    environment_table,
+    load_model_manifest,
+)
+from spark_preprocessor.schema import MappingSpec, load_pipeline_document
+from spark_preprocessor.sqlmesh_project import DuckDBGatewayConfig, SqlmeshConfig
+
+SOURCE_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+# Catalog names DuckDB reserves; a main database named after one cannot be
+# attached alongside other catalogs.
+_RESERVED_CATALOGS = {"main", "memory", "system", "temp"}
+
+DEFAULT_BATCH_SIZE = 1_000_000
+
+
+@dataclass(frozen=True)
+class LocalSource:
+    """A physical table bound to a local file or directory."""
+
+    table: str
+    path: Path
+    format: str
+
+
+@dataclass(frozen=True)
+class LocalRunResult:
+    """Outcome of a local run."""
+
+    pipeline_name: str
+    output_table: str
+    database: Path
+    applied_models: list[str]
+    gateway: DuckDBGatewayConfig
+
+
+def parse_source(spec: str) -> LocalSource:
+    """Parse a `TABLE=PATH` source binding.
+
+    The format is taken from the file suffix. A directory is read as a
+    (possibly hive-partitioned) Parquet dataset.
+    """
+
+    table, separator, raw_path = spec.partition("=")
+    if not separator or not table.strip() or not raw_path.strip():
+        raise ConfigurationError(f"Invalid source (expected TABLE=PATH): {spec}")
+    path = Path(raw_path.strip()).expanduser().resolve()
+    if path.is_dir():
+        source_format = "parquet"
+    else:
+        source_format = SOURCE_FORMATS.get(path.suffix.lower())
+        if source_format is None:
+            raise ConfigurationError(
+                f"Unsupported source format for {path} "
+                f"(expected one of {sorted(SOURCE_FORMATS)})"
+            )
+    if not path.exists():
+        raise ConfigurationError(f"Source not found: {path}")
+    return LocalSource(table=table.strip(), path=path, format=source_format)
+
+
+def build_gateway(
+    mapping: MappingSpec,
+    database: Path,
+    *,
+    memory_limit: str | None = None,
+    threads: int | None = None,
+    temp_directory: Path | None = None,
+) -> DuckDBGatewayConfig:
+    """Build the DuckDB gateway for a mapping.
+
+    Catalogs of 3-part mapped tables (other than the main database) are attached
+    as sibling DuckDB files so the semantic views resolve unchanged.
+    """
+
+    database = database.resolve()
+    catalogs = {
+        ref.catalog: str(database.with_name(f"{ref.catalog}.duckdb"))
+        for ref in (parse_table_ref(table) for table in _mapped_tables(mapping))
+        if ref.catalog is not None and ref.catalog != database.stem
+    }
+    if catalogs and database.stem in _RESERVED_CATALOGS:
+        raise ConfigurationError(
+            f"DuckDB database name '{database.stem}' is reserved; "
+            "choose another file name"
+        )
+    return DuckDBGatewayConfig(
+        database=str(database),
+        catalogs=dict(sorted(catalogs.items())),
+        memory_limit=memory_limit,
+        threads=threads,
+        temp_directory=str(temp_directory) if temp_directory else None,
+    )
+
+
+def bind_sources(gateway: DuckDBGatewayConfig, sources: list[LocalSource]) -> None:
+    """Expose each source under its physical table name in the DuckDB database.
+
+    CSV and Parquet sources become views that DuckDB scans lazily, so inputs
+    never have to fit in memory. Arrow IPC sources are streamed into a table
+    through a PyArrow dataset.
+    """
+
+    duckdb = _import_duckdb()
+    Path(gateway.database).parent.mkdir(parents=True, exist_ok=True)
+    conn = duckdb.connect(gateway.database, config=gateway.connector_config())
+    try:
+        for name, path in gateway.catalogs.items():
+            conn.execute(f"ATTACH IF NOT EXISTS {_literal(path)} AS {name}")
+        for source in sources:
+            ref = parse_table_ref(source.table)
+            if ref.schema is not None:
+                schema = f"{ref.catalog}.{ref.schema}" if ref.catalog else ref.schema
+                conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+            if source.format == "arrow":
+                _load_arrow(conn, source)
+            else:
+                conn.execute(
+                    f"CREATE OR REPLACE VIEW {source.table} AS "
+                    f"SELECT * FROM {_scan_sql(source)}"
+                )
+    finally:
+        conn.close()
+
+
+def sqlmesh_config(gateway: DuckDBGatewayConfig):
+    """Build the SQLMesh `Config` for a DuckDB gateway.
+
+    SQLMesh does not read `sqlmesh.yaml`, so the gateway rendered there is
+    mirrored programmatically for local runs.
+    """
+
+    from sqlmesh.core.config import Config, ModelDefaultsConfig
+    from sqlmesh.core.config.connection import DuckDBConnectionConfig
+    from sqlmesh.core.config.gateway import GatewayConfig
+
+    connection = {
+        key: value for key, value in gateway.connection().items() if key != "type"
+    }
+    return Config(
+        gateways={
+            "duckdb": GatewayConfig(connection=DuckDBConnectionConfig(**connection))
+        },
+        default_gateway="duckdb",
+        model_defaults=ModelDefaultsConfig(dialect="spark"),
+    )
+
+
+def run_local(
+    pipeline_path: str | Path,
+    out_dir: str | Path,
+    sources: list[LocalSource],
+    *,
+    database: str | Path,
+    memory_limit: str | None = None,
+    threads: int | None = None,
+    temp_directory: str | Path | None = None,
+    environment: str | None = None,
+    on_model_applied: Callable[[ModelEntry, float, int | None], None] | None = None,
+) -> LocalRunResult:
+    """Compile a pipeline and apply it against a local DuckDB database.
+
+    Args:
+        pipeline_path: Path to the pipeline YAML.
+        out_dir: Output directory for the compiled project.
+        sources: Bindings for every mapped physical table.
+        database: DuckDB database file that receives sources and outputs.
+        memory_limit: DuckDB `memory_limit` (e.g. "8GB").
+        threads: DuckDB worker threads.
+        temp_directory: Where DuckDB spills data that exceeds the memory limit.
+        environment: Optional SQLMesh environment.
+        on_model_applied: Per-model callback, see `apply_models`.
+
+    Returns:
+        LocalRunResult naming the output table and the applied models.
+
+    Raises:
+        ConfigurationError: If sources do not match the mapped tables.
+    """
+
+    from sqlmesh.core.context import Context
+
+    pipeline_path = Path(pipeline_path)
+    out_dir = Path(out_dir)
+    database = Path(database)
+
+    document = load_pipeline_document(pipeline_path)
+    _check_sources(document.mapping, sources)
+    gateway = build_gateway(
+        document.mapping,
+        database,
+        memory_limit=memory_limit,
+        threads=threads,
+        temp_directory=Path(temp_directory) if temp_directory else None,
+    )
+
+    report = compile_pipeline(
+        pipeline_path, out_dir, sqlmesh_config=SqlmeshConfig(duckdb=gateway)
+    )
+    bind_sources(gateway, sources)
+
+    context = Context(paths=out_dir, config=sqlmesh_config(gateway))
+    try:
+        applied = apply_models(
+            context,
+            load_model_manifest(out_dir) or [],
+            environment=environment,
+            checkpoint_path=default_checkpoint_path(out_dir, environment),
+            on_model_applied=on_model_applied,
+        )
+    finally:
+        context.close()
+    structlog.get_logger().info(
+        "local_run_complete",
+        pipeline=report.pipeline_name,
+        database=str(database),
+        models=len(applied),
+    )
+    return LocalRunResult(
+        pipeline_name=report.pipeline_name,
+        output_table=environment_table(report.output_table, environment),
+        database=database.resolve(),
+        applied_models=applied,
+        gateway=gateway,
+    )
+
+
+def read_output(
+    gateway: DuckDBGatewayConfig,
+    table: str,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
+    """Stream a table from a local DuckDB database as Arrow record batches.
+
+    The database is opened read-only and closed once the reader is exhausted.
+
+    Args:
+        gateway: Gateway the table was written through.
+        table: Table or view to read.
+        batch_size: Maximum rows per record batch.
+
+    Returns:
+        A `pyarrow.RecordBatchReader` over the table.
+    """
+
+    duckdb = _import_duckdb()
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ConfigurationError(
+            "Arrow output requires the 'duckdb' extra (pyarrow)"
+        ) from exc
+
+    conn = duckdb.connect(
+        gateway.database, read_only=True, config=gateway.connector_config()
+    )
+    try:
+        for name, path in gateway.catalogs.items():
+            conn.execute(f"ATTACH {_literal(path)} AS {name} (READ_ONLY)")
+        result = conn.execute(f"SELECT * FROM {table}")
+        # `to_arrow_reader` replaces `fetch_record_batch` in newer DuckDB releases.
+        to_reader = (
+            getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+        )
+        reader = to_reader(batch_size)
+    except Exception:
+        conn.close()
+        raise
+
+    def batches():
+        try:
+            yield from reader
+        finally:
+            conn.close()
+
+    return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+
+def execute_local(
+    pipeline_path: str | Path,
+    out_dir: str | Path,
+    sources: list[LocalSource],
+    *,
+    database: str | Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    memory_limit: str | None = None,
+    threads: int | None = None,
+    temp_directory: str | Path | None = None,
+    environment: str | None = None,
+):
+    """Compile and run a pipeline locally, streaming the output as Arrow.
+
+    Batches are handed over without converting rows to Python objects, so the
+    reader can feed `pyarrow.Table`, pandas (`reader.read_pandas()`) or polars
+    (`polars.from_arrow(reader)`) directly. Arguments match `run_local`.
+
+    Returns:
+        A `pyarrow.RecordBatchReader` over the pipeline's output table.
+    """
+
+    result = run_local(
+        pipeline_path,
+        out_dir,
+        sources,
+        database=database,
+        memory_limit=memory_limit,
+        threads=threads,
+        temp_directory=temp_directory,
+        environment=environment,
+    )
+    return read_output(result.gateway, result.output_table, batch_size=batch_size)
+
+
+def _mapped_tables(mapping: MappingSpec) -> set[str]:
+    return {
+        entity_mapping.table
+        for mappings in (mapping.entities, mapping.references)
+        for entity_mapping in mappings.values()
+    }
+
+
+def _check_sources(mapping: MappingSpec, sources: list[LocalSource]) -> None:
+    tables = _mapped_tables(mapping)
+    bound = [source.table for source in sources]
+    duplicates = sorted({table for table in bound if bound.count(table) > 1})
+    if duplicates:
+        raise ConfigurationError(f"Sources bound more than once: {duplicates}")
+    unknown = sorted(set(bound) - tables)
+    if unknown:
+        raise ConfigurationError(f"Sources do not match mapped tables: {unknown}")
+    missing = sorted(tables - set(bound))
+    if missing:
+        raise ConfigurationError(f"Mapped tables without a source: {missing}")
+
+
+def _scan_sql(source: LocalSource) -> str:
+    if source.format == "csv":
+        return f"read_csv_auto({_literal(str(source.path))})"
+    if source.path.is_dir():
+        pattern = _literal(str(source.path / "**" / "*.parquet"))
+        return f"read_parquet({pattern}, hive_partitioning = true)"
+    return f"read_parquet({_literal(str(source.path))})"
+
+
+def _load_arrow(conn, source: LocalSource) -> None:
+    try:
+        import pyarrow.dataset as ds
+    except ImportError as exc:
+        raise ConfigurationError(
+            "Arrow sources require the 'duckdb' extra (pyarrow)"
+        ) from exc
+
+    dataset = ds.dataset(str(source.path), format="ipc")
+    conn.register("_arrow_source", dataset)
+    try:
+        conn.execute(
+            f"CREATE OR REPLACE TABLE {source.table} AS SELECT * FROM _arrow_source"
+        )
+    finally:
+        conn.unregister("_arrow_source")
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise ConfigurationError("Local execution requires the 'duckdb' extra") from exc
+    return duckdb
+
+
+def _literal(value: str) -> str:
+    escaped = value.replace("'", "''")
+    return f"'{escaped}'"
@@ -0,0 +1,81 @@
+"""Records of shared feature tables, for reuse across pipelines and runs.
+
+Shared feature models are content-addressed by the compiler, so a table with
+the same name was built from the same SQL over the same inputs. The runtime
+records each one it materializes in a registry table in the shared schema.
+Shared tables are recomputed by default; a caller that opts in with a maximum
+age reuses a table when its record is recent enough, the row count still
+matches, and SQLMesh has no missing interval for it (see `apply_models`).
+"""
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from spark_preprocessor.runtime.checkpoint import ModelEntry, environment_table
+
+SHARED_TABLE_REGISTRY = "shared_table_registry"
+
+
+@dataclass(frozen=True)
+class SharedTableRecord:
+    """Registry entry for a materialized shared feature table."""
+
+    row_count: int
+    materialized_at: str
+
+
+def registry_table(model_name: str, environment: str | None) -> str:
+    """Registry table beside a shared model, in the same environment schema."""
+
+    schema = model_name.rsplit(".", 1)[0]
+    return environment_table(f"{schema}.{SHARED_TABLE_REGISTRY}", environment)
+
+
+def load_shared_record(
+    adapter, model: ModelEntry, environment: str | None
+) -> SharedTableRecord | None:
+    """Return the registry entry for `model`, or None if it was never recorded."""
+
+    table = registry_table(model.name, environment)
+    if not adapter.table_exists(table):
+        return None
+    rows = adapter.fetchall(
+        f"SELECT row_count, materialized_at FROM {table} "
+        f"WHERE name = {_literal(model.name)}"
+    )
+    if not rows:
+        return None
+    row_count, materialized_at = max(rows, key=lambda row: row[1])
+    return SharedTableRecord(
+        row_count=int(row_count), materialized_at=str(materialized_at)
+    )
+
+
+def record_shared_table(
+    adapter, model: ModelEntry, environment: str | None, row_count: int
+) -> None:
+    """Record that `model` was just materialized with `row_count` rows."""
+
+    table = registry_table(model.name, environment)
+    name = _literal(model.name)
+    materialized_at = _literal(datetime.now(UTC).isoformat())
+    adapter.execute(
+        f"CREATE TABLE IF NOT EXISTS {table} "
+        "(name STRING, row_count BIGINT, materialized_at STRING)"
+    )
+    adapter.execute(f"DELETE FROM {table} WHERE name = {name}")
+    adapter.execute(
+        f"INSERT INTO {table} VALUES ({name}, {int(row_count)}, {materialized_at})"
+    )
+
+
+def is_fresh(record: SharedTableRecord, max_age: float) -> bool:
+    """Whether a record is at most `max_age` seconds old."""
+
+    materialized_at = datetime.fromisoformat(record.materialized_at)
+    age = datetime.now(UTC) - materialized_at
+    return age.total_seconds() <= max_age
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
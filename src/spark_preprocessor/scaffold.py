@@ -1,16 +1,28 @@
-"""Scaffold utilities for generating pipeline templates."""
+"""Scaffold utilities for generating pipeline templates.
 
+Scaffolding only needs the mapping's entity and column names, so it reads
+them without importing `schema` (pydantic and the full document models);
+the scaffolded pipeline is validated in full when it is compiled.
+"""
+
+import json
+import os
 from pathlib import Path
 
 import yaml
 
 from spark_preprocessor.errors import ConfigurationError
-from spark_preprocessor.schema import MappingSpec, load_mapping_spec
+
+# libyaml's loader is several times faster; PyYAML may be built without it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def scaffold_pipeline(mapping_path: Path, out_dir: Path) -> Path:
     """Create a starter pipeline YAML from a mapping file.
 
+    The pipeline includes the mapping file by relative path instead of
+    copying it, so pipelines scaffolded from one mapping share it.
+
     Args:
         mapping_path: Path to the mapping YAML (mapping-only or full document).
         out_dir: Directory where the scaffolded pipeline.yaml will be written.
@@ -22,11 +34,13 @@ def scaffold_pipeline(mapping_path: Path, out_dir: Path) -> Path:
         ConfigurationError: If the mapping file is invalid.
     """
 
-    mapping = load_mapping_spec(mapping_path)
-    spine_entity, spine_key, spine_columns = _default_spine(mapping)
+    entities = _mapping_entities(mapping_path)
+    spine_entity, spine_key, spine_columns = _default_spine(entities)
 
+    out_dir.mkdir(parents=True, exist_ok=True)
+    include = Path(os.path.relpath(mapping_path.resolve(), out_dir.resolve()))
     payload = {
-        "mapping": mapping.model_dump(),
+        "mapping": {"include": include.as_posix()},
         "pipeline": {
             "name": "pipeline_name",
             "version": "v0.1.0",
@@ -58,25 +72,56 @@ def scaffold_pipeline(mapping_path: Path, out_dir: Path) -> Path:
         },
     }
 
-    out_dir.mkdir(parents=True, exist_ok=True)
     pipeline_path = out_dir / "pipeline.yaml"
     pipeline_path.write_text(yaml.safe_dump(payload, sort_keys=False))
     return pipeline_path
 
 
-def _default_spine(mapping: MappingSpec) -> tuple[str, str, list[str]]:
-    if not mapping.entities:
+def _mapping_entities(path: Path) -> dict[str, list[str]]:
+    """Canonical columns per entity of a mapping file (mapping-only or full document)."""
+
+    if not path.exists():
+        raise ConfigurationError(f"Mapping file not found: {path}")
+    content = path.read_bytes()
+    try:
+        if path.suffix.lower() == ".json":
+            data = json.loads(content)
+        else:
+            data = yaml.load(content, Loader=_YAML_LOADER)
+    except (ValueError, yaml.YAMLError) as exc:
+        raise ConfigurationError(f"Invalid mapping file {path}: {exc}") from exc
+    if isinstance(data, dict) and "mapping" in data:
+        data = data["mapping"]
+    if not isinstance(data, dict):
+        raise ConfigurationError("Mapping YAML must be a mapping at the top level")
+    if "include" in data:
+        raise ConfigurationError(
+            f"Mapping file {path} cannot include other mapping files"
+        )
+    entities = data.get("entities") or {}
+    if not isinstance(entities, dict) or not all(
+        isinstance(entity, dict) and isinstance(entity.get("columns"), dict)
+        for entity in entities.values()
+    ):
+        raise ConfigurationError("Mapping YAML failed validation")
+    return {name: list(entity["columns"]) for name, entity in entities.items()}
+
+
+def _default_spine(entities: dict[str, list[str]]) -> tuple[str, str, list[str]]:
+    if not entities:
         raise ConfigurationError("Mapping must define at least one entity.")
 
-    if "patients" in mapping.entities:
+    if "patients" in entities:
         entity = "patients"
     else:
-        entity = sorted(mapping.entities.keys())[0]
+        entity = min(entities)
 
-    columns = mapping.entities[entity].columns
+    columns = entities[entity]
+    if not columns:
+        raise ConfigurationError(f"Mapping entity '{entity}' has no columns.")
     if "person_id" in columns:
         key = "person_id"
     else:
-        key = sorted(columns.keys())[0]
+        key = min(columns)
 
     return entity, key, [key]
@@ -1,13 +1,44 @@
 """Pydantic schemas for pipeline and mapping specifications."""
 
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Literal
 
+import pydantic
 import yaml
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 
 from spark_preprocessor.errors import ConfigurationError
 
+_MAPPING_CACHE_SIZE = 32
+_MAPPING_CACHE: "OrderedDict[str, MappingSpec]" = OrderedDict()
+_MAPPING_CACHE_LOCK = threading.Lock()
+
+# libyaml's loader is several times faster; PyYAML may be built without it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _load_data(path: Path) -> object:
+    """Parse a YAML or (by suffix) JSON file."""
+
+    content = path.read_bytes()
+    return _parse_data(path, content)
+
+
+def _parse_data(path: Path, content: bytes) -> object:
+    if path.suffix.lower() == ".json":
+        try:
+            return json.loads(content)
+        except ValueError as exc:
+            raise ConfigurationError(f"Invalid JSON in {path}: {exc}") from exc
+    return yaml.load(content, Loader=_YAML_LOADER)
+
 
 class EntityMapping(BaseModel):
     """Mapping for a canonical entity or reference table."""
@@ -16,6 +47,7 @@ class EntityMapping(BaseModel):
 
     table: str
     columns: dict[str, str]
+    types: dict[str, str] = Field(default_factory=dict)
 
 
 class MappingSpec(BaseModel):
@@ -53,12 +85,23 @@ class MappingSpec(BaseModel):
             return self.references[entity].columns
         raise ConfigurationError(f"Unknown entity or reference: {entity}")
 
+    def entity_types(self, entity: str) -> dict[str, str]:
+        if entity in self.entities:
+            return self.entities[entity].types
+        if entity in self.references:
+            return self.references[entity].types
+        raise ConfigurationError(f"Unknown entity or reference: {entity}")
+
 
 def load_mapping_spec(path: Path) -> MappingSpec:
-    """Load a mapping specification from YAML.
+    """Load a mapping specification from YAML or JSON.
+
+    Specs are cached in-process by the file's content hash, so pipelines (or
+    repeated compiles) sharing a mapping file parse and validate it once. The
+    returned spec may be shared and must not be mutated.
 
     Args:
-        path: Path to the mapping YAML.
+        path: Path to the mapping file (mapping-only or full document).
 
     Returns:
         Parsed MappingSpec.
@@ -69,16 +112,136 @@ def load_mapping_spec(path: Path) -> MappingSpec:
 
     if not path.exists():
         raise ConfigurationError(f"Mapping file not found: {path}")
-    data = yaml.safe_load(path.read_text())
+    content = path.read_bytes()
+    key = hashlib.sha256(content).hexdigest()
+    with _MAPPING_CACHE_LOCK:
+        cached = _MAPPING_CACHE.get(key)
+        if cached is not None:
+            _MAPPING_CACHE.move_to_end(key)
+            return cached
+
+    data = _parse_data(path, content)
     if not isinstance(data, dict):
         raise ConfigurationError("Mapping YAML must be a mapping at the top level")
     if "mapping" in data:
         data = data["mapping"]
+    if isinstance(data, dict) and "include" in data:
+        raise ConfigurationError(
+            f"Mapping file {path} cannot include other mapping files"
+        )
     try:
-        return MappingSpec.model_validate(data)
+        spec = MappingSpec.model_validate(data)
     except Exception as exc:
         raise ConfigurationError("Mapping YAML failed validation") from exc
 
+    with _MAPPING_CACHE_LOCK:
+        _MAPPING_CACHE[key] = spec
+        while len(_MAPPING_CACHE) > _MAPPING_CACHE_SIZE:
+            _MAPPING_CACHE.popitem(last=False)
+    return spec
+
+
+def _resolve_mapping(data: object, base_dir: Path) -> tuple[object, list[str]]:
+    """Resolve a document's `mapping: {include: ...}` section.
+
+    Included files are merged in order (a later file's entity replaces an
+    earlier one's); `entities`/`references` given next to `include` are then
+    deep-merged over them, and `null` removes an entry. Returns the mapping
+    (unchanged if it has no include) and the include paths as written.
+    """
+
+    if not isinstance(data, dict) or "include" not in data:
+        return data, []
+    includes = data["include"]
+    if isinstance(includes, str):
+        includes = [includes]
+    if not (
+        isinstance(includes, list)
+        and includes
+        and all(isinstance(include, str) for include in includes)
+    ):
+        raise ConfigurationError("mapping.include must be a path or a list of paths")
+    overrides = {key: value for key, value in data.items() if key != "include"}
+    unknown = set(overrides) - {"entities", "references"}
+    if unknown:
+        raise ConfigurationError(
+            f"Unknown keys next to mapping.include: {sorted(unknown)}"
+        )
+
+    specs = [load_mapping_spec(base_dir / include) for include in includes]
+    if len(specs) == 1 and not overrides:
+        return specs[0], includes
+
+    sections: dict[str, dict[str, EntityMapping]] = {
+        "entities": {},
+        "references": {},
+    }
+    for spec in specs:
+        sections["entities"].update(spec.entities)
+        sections["references"].update(spec.references)
+    for section, entries in overrides.items():
+        if not isinstance(entries, dict):
+            raise ConfigurationError(f"mapping.{section} must be a mapping")
+        for name, override in entries.items():
+            if override is None:
+                sections[section].pop(name, None)
+                continue
+            base = sections[section].get(name)
+            merged = _deep_merge(base.model_dump(), override) if base else override
+            try:
+                sections[section][name] = EntityMapping.model_validate(merged)
+            except Exception as exc:
+                raise ConfigurationError(
+                    f"Mapping override for {section}.{name} failed validation"
+                ) from exc
+    # Included entries are already validated; only overrides were re-checked.
+    return MappingSpec.model_construct(**sections), includes
+
+
+def _deep_merge(base: dict[str, Any], override: object) -> object:
+    if not isinstance(override, dict):
+        return override
+    merged = dict(base)
+    for key, value in override.items():
+        current = merged.get(key)
+        merged[key] = (
+            _deep_merge(current, value) if isinstance(current, dict) else value
+        )
+    return merged
+
+
+def load_schema_snapshot(path: Path) -> dict[str, dict[str, str]]:
+    """Load a physical schema snapshot from YAML or JSON.
+
+    The snapshot maps table identifiers to `{physical_column: sql_type}`.
+    Table and column names are lower-cased for case-insensitive lookups.
+
+    Args:
+        path: Path to the snapshot file.
+
+    Returns:
+        Mapping of table identifier to column types.
+
+    Raises:
+        ConfigurationError: If the file is missing or malformed.
+    """
+
+    if not path.exists():
+        raise ConfigurationError(f"Schema snapshot not found: {path}")
+    data = _load_data(path)
+    if not isinstance(data, dict) or not all(
+        isinstance(columns, dict) for columns in data.values()
+    ):
+        raise ConfigurationError(
+            "Schema snapshot must map table identifiers to column types"
+        )
+    return {
+        str(table).lower(): {
+            str(column).lower(): str(dtype) for column, dtype in columns.items()
+        }
+        for table, columns in data.items()
+    }
+
 
 class PrefixingConfig(BaseModel):
     """Config for column name prefixing."""
@@ -107,6 +270,40 @@ class ValidationConfig(BaseModel):
     on_missing_required_column: Literal["fail", "warn_skip"] = "fail"
 
 
+class LintConfig(BaseModel):
+    """Compile-time SQL cost lint options."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    policy: Literal["warn", "fail"] = "warn"
+    ignore: list[str] = Field(default_factory=list)
+
+    @field_validator("ignore")
+    @classmethod
+    def _known_rules(cls, ignore: list[str]) -> list[str]:
+        if not ignore:
+            return ignore
+        # Imported lazily: the lint module pulls in sqlglot.
+        from spark_preprocessor.lint import RULES
+
+        unknown = sorted(set(ignore) - set(RULES))
+        if unknown:
+            raise ConfigurationError(
+                f"Unknown lint rule ids in lint.ignore: {unknown} "
+                f"(known: {sorted(RULES)})"
+            )
+        return ignore
+
+
+class SharedFeaturesConfig(BaseModel):
+    """Content-addressed feature tables shared across pipelines."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    schema_name: str = "shared_features"
+
+
 class SpineConfig(BaseModel):
     """Spine configuration for the pipeline."""
 
@@ -138,6 +335,8 @@ class PipelineMeta(BaseModel):
     output: OutputConfig
     naming: NamingConfig = Field(default_factory=NamingConfig)
     validation: ValidationConfig = Field(default_factory=ValidationConfig)
+    lint: LintConfig = Field(default_factory=LintConfig)
+    shared_features: SharedFeaturesConfig = Field(default_factory=SharedFeaturesConfig)
 
 
 class FeatureConfig(BaseModel):
@@ -173,12 +372,32 @@ class PipelineDocument(BaseModel):
     features: list[FeatureConfig] = Field(default_factory=list)
     profiling: ProfilingConfig | None = None
 
+    _mapping_files: tuple[Path, ...] = PrivateAttr(default=())
+
+    @property
+    def mapping_files(self) -> tuple[Path, ...]:
+        """Mapping files included by the loaded document, in include order."""
+
+        return self._mapping_files
+
+
+def load_pipeline_document(
+    path: Path, cache_dir: Path | None = None
+) -> PipelineDocument:
+    """Load a pipeline document from YAML or JSON.
 
-def load_pipeline_document(path: Path) -> PipelineDocument:
-    """Load a pipeline document from YAML.
+    Files with a `.json` suffix are parsed as JSON; anything else as YAML
+    (with libyaml when available). `mapping` may be given inline or as
+    `{include: <path or paths>, entities: ..., references: ...}`, with paths
+    relative to the document (see `_resolve_mapping`).
 
     Args:
-        path: Path to the YAML document.
+        path: Path to the pipeline document.
+        cache_dir: Optional directory of validated documents, keyed by the
+            file's content hash (and checked against the included mapping
+            files). A hit skips parsing and validation; a miss stores the
+            validated document for next time. Entries are JSON and are
+            validated again when read.
 
     Returns:
         Parsed PipelineDocument.
@@ -189,10 +408,82 @@ def load_pipeline_document(path: Path) -> PipelineDocument:
 
     if not path.exists():
         raise ConfigurationError(f"Pipeline file not found: {path}")
-    data = yaml.safe_load(path.read_text())
+    content = path.read_bytes()
+    cache_path = None
+    if cache_dir is not None:
+        key = hashlib.sha256(_document_schema_fingerprint() + content).hexdigest()
+        cache_path = Path(cache_dir) / f"{key}.json"
+        cached = _read_cached_document(cache_path, path.parent)
+        if cached is not None:
+            return cached
+
+    data = _parse_data(path, content)
     if not isinstance(data, dict):
         raise ConfigurationError("Pipeline YAML must be a mapping at the top level")
+    mapping, includes = _resolve_mapping(data.get("mapping"), path.parent)
+    if includes:
+        data = {**data, "mapping": mapping}
     try:
-        return PipelineDocument.model_validate(data)
+        document = PipelineDocument.model_validate(data)
     except Exception as exc:  # pydantic validation errors are already informative
         raise ConfigurationError("Pipeline YAML failed validation") from exc
+    document._mapping_files = tuple(path.parent / include for include in includes)
+    if cache_path is not None:
+        _write_cached_document(cache_path, document, includes)
+    return document
+
+
+@functools.cache
+def _document_schema_fingerprint() -> bytes:
+    # Cached documents are only valid for the schema (and the pydantic
+    # serialization) that produced them.
+    schema = json.dumps(PipelineDocument.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(f"{pydantic.VERSION}|{schema}".encode()).digest()
+
+
+def _read_cached_document(path: Path, base_dir: Path) -> PipelineDocument | None:
+    # An entry is two lines: the included mapping files with their hashes,
+    # then the document as JSON.
+    try:
+        header, body = path.read_bytes().split(b"\n", 1)
+        includes = [
+            (str(include), str(digest)) for include, digest in json.loads(header)
+        ]
+        document = PipelineDocument.model_validate_json(body)
+    except (OSError, ValueError, TypeError, ConfigurationError):
+        # Missing, corrupt or stale entries are misses; pydantic's
+        # ValidationError and JSON decode errors are ValueErrors.
+        return None
+    mapping_files = []
+    for include, digest in includes:
+        mapping_file = base_dir / include
+        try:
+            current = hashlib.sha256(mapping_file.read_bytes()).hexdigest()
+        except OSError:
+            return None
+        if current != digest:
+            return None
+        mapping_files.append(mapping_file)
+    document._mapping_files = tuple(mapping_files)
+    return document
+
+
+def _write_cached_document(
+    path: Path, document: PipelineDocument, includes: list[str]
+) -> None:
+    # Included mapping files are recorded by hash and rechecked on every hit.
+    header = json.dumps(
+        [
+            [include, hashlib.sha256(mapping_file.read_bytes()).hexdigest()]
+            for include, mapping_file in zip(includes, document.mapping_files)
+        ]
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, staging = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(header + "\n" + document.model_dump_json())
+        os.replace(staging, path)
+    except BaseException:
+        Path(staging).unlink(missing_ok=True)
+        raise
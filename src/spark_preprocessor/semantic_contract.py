@@ -34,10 +34,12 @@ def default_semantic_contract() -> SemanticContract:
         "insurance": frozenset({"person_id"}),
         "diagnoses": frozenset({"person_id"}),
     }
+    recommended = {entity: {"person_id": "STRING"} for entity in required}
+    recommended["patients"]["date_of_birth"] = "DATE"
     return SemanticContract(
         version="v1",
         required_columns=required,
         optional_columns={},
-        recommended_types={},
+        recommended_types=recommended,
         naming_rules=("lower_snake_case",),
     )
@@ -0,0 +1,216 @@
+"""Long-lived compile server on a local Unix socket."""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import structlog
+
+from spark_preprocessor.compiler import (
+    CompiledProject,
+    CompileReport,
+    compile_document,
+    write_project,
+)
+from spark_preprocessor.errors import ConfigurationError, SparkPreprocessorError
+from spark_preprocessor.features import DEFAULT_REGISTRY, FeatureRegistry
+from spark_preprocessor.schema import (
+    PipelineDocument,
+    load_pipeline_document,
+    load_schema_snapshot,
+)
+
+COMMANDS = ("compile", "validate", "render", "ping", "shutdown")
+
+
+class CompileService:
+    """Handles compile requests, keeping parsed pipeline documents warm.
+
+    Documents are cached by path and reloaded when the modification time or
+    size of the file, or of a mapping file it includes, changes. Requests may
+    run concurrently; compiles into the same output directory are serialized.
+    """
+
+    def __init__(self, registry: FeatureRegistry | None = None) -> None:
+        self._registry = registry or DEFAULT_REGISTRY
+        self._lock = threading.Lock()
+        self._documents: dict[
+            Path,
+            tuple[
+                tuple[int, int],
+                PipelineDocument,
+                tuple[tuple[Path, tuple[int, int] | None], ...],
+            ],
+        ] = {}
+        self._out_locks: dict[Path, threading.Lock] = {}
+
+    def handle(self, request: dict) -> dict[str, object]:
+        """Run one request and return its JSON-serializable response.
+
+        Requests are `{"command": ..., "pipeline": ..., "out": ...}`;
+        `out` is only read by compile, which alone writes the project, and
+        `schema_snapshot` is optional for compile, validate and render.
+        Responses are `{"ok": true, "result": ...}` or
+        `{"ok": false, "error": ...}`.
+        """
+
+        command = request.get("command")
+        try:
+            if command not in COMMANDS:
+                raise ConfigurationError(f"Unknown command: {command}")
+            if command in ("ping", "shutdown"):
+                return {"ok": True, "result": {"pid": os.getpid()}}
+            pipeline = Path(_required(request, "pipeline"))
+            if command == "validate":
+                project = self._compile_document(request, pipeline)
+                return {"ok": True, "result": _validation(project.report)}
+            if command == "render":
+                project = self._compile_document(request, pipeline)
+                return {"ok": True, "result": {"sql": project.rendered_sql}}
+            out_dir = Path(_required(request, "out"))
+            with self._out_lock(out_dir):
+                project = self._compile_document(request, pipeline)
+                write_project(project, out_dir)
+            return {"ok": True, "result": asdict(project.report)}
+        except SparkPreprocessorError as exc:
+            return {"ok": False, "error": str(exc)}
+
+    def _compile_document(self, request: dict, pipeline: Path) -> CompiledProject:
+        snapshot_path = request.get("schema_snapshot")
+        return compile_document(
+            self._document(pipeline),
+            schema_snapshot=(
+                load_schema_snapshot(Path(snapshot_path)) if snapshot_path else None
+            ),
+            registry=self._registry,
+        )
+
+    def _document(self, path: Path) -> PipelineDocument:
+        path = path.resolve()
+        version = _file_version(path)
+        if version is None:
+            raise ConfigurationError(f"Pipeline file not found: {path}")
+        cached = self._documents.get(path)
+        if cached is not None and cached[0] == version:
+            document, mapping_versions = cached[1], cached[2]
+            if all(
+                _file_version(mapping_file) == mapping_version
+                for mapping_file, mapping_version in mapping_versions
+            ):
+                return document
+        document = load_pipeline_document(path)
+        mapping_versions = tuple(
+            (mapping_file, _file_version(mapping_file))
+            for mapping_file in document.mapping_files
+        )
+        with self._lock:
+            self._documents[path] = (version, document, mapping_versions)
+        return document
+
+    def _out_lock(self, out_dir: Path) -> threading.Lock:
+        with self._lock:
+            return self._out_locks.setdefault(out_dir.resolve(), threading.Lock())
+
+
+def serve(socket_path: str | Path, registry: FeatureRegistry | None = None) -> None:
+    """Serve compile requests on a Unix socket until a `shutdown` request.
+
+    Each connection carries one newline-terminated JSON request and receives
+    one newline-terminated JSON response (see `CompileService.handle`).
+    """
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise ConfigurationError("serve requires Unix domain sockets")
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            raise ConfigurationError(f"A server is already listening on {socket_path}")
+        socket_path.unlink()
+
+    service = CompileService(registry)
+    log = structlog.get_logger()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            started = time.perf_counter()
+            line = self.rfile.readline()
+            if not line:
+                return  # a connection closed unsent, e.g. `_is_listening`
+            request, error = _read_request(line)
+            if error is not None:
+                response: dict[str, object] = {"ok": False, "error": error}
+            else:
+                try:
+                    response = service.handle(request)
+                except Exception as exc:  # keep serving after unexpected errors
+                    log.exception("request_failed", command=request.get("command"))
+                    response = {"ok": False, "error": f"Internal error: {exc}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            log.info(
+                "request_handled",
+                command=request.get("command"),
+                ok=response["ok"],
+                ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+            if request.get("command") == "shutdown":
+                threading.Thread(target=server.shutdown, daemon=True).start()
+
+    server = socketserver.ThreadingUnixStreamServer(str(socket_path), Handler)
+    server.daemon_threads = True
+    log.info("serve_started", socket=str(socket_path), pid=os.getpid())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+        log.info("serve_stopped", socket=str(socket_path))
+
+
+def _read_request(line: bytes) -> tuple[dict, str | None]:
+    """Parse a request line; an invalid one yields `{}` and an error message."""
+
+    try:
+        request = json.loads(line)
+    except ValueError as exc:
+        return {}, f"Invalid request: {exc}"
+    if not isinstance(request, dict):
+        return {}, "Invalid request: request must be a JSON object"
+    return request, None
+
+
+def _required(request: dict, key: str) -> str:
+    value = request.get(key)
+    if not isinstance(value, str) or not value:
+        raise ConfigurationError(f"Request is missing '{key}'")
+    return value
+
+
+def _validation(report: CompileReport) -> dict[str, object]:
+    return {
+        "pipeline": report.pipeline_name,
+        "included_features": report.included_features,
+        "skipped_features": report.skipped_features,
+        "lint": report.lint.get("findings", []),
+    }
+
+
+def _file_version(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _is_listening(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
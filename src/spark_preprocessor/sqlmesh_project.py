@@ -1,6 +1,7 @@
 """Helpers for generating SQLMesh project artifacts."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Iterable
 
 import yaml
@@ -8,12 +9,57 @@ import yaml
 from spark_preprocessor.features.base import SqlmeshModelSpec
 
 
+@dataclass(frozen=True)
+class DuckDBGatewayConfig:
+    """Local DuckDB gateway used by `spark-preprocessor run --engine duckdb`.
+
+    `catalogs` maps extra catalog names (from 3-part mapped tables) to the
+    DuckDB files attached under them. `memory_limit`, `threads` and
+    `temp_directory` are passed to DuckDB so large inputs spill to disk instead
+    of exhausting memory.
+    """
+
+    database: str
+    catalogs: dict[str, str] = field(default_factory=dict)
+    memory_limit: str | None = None
+    threads: int | None = None
+    temp_directory: str | None = None
+
+    @property
+    def catalog(self) -> str:
+        """Name DuckDB gives the main database (its file stem)."""
+
+        return Path(self.database).stem
+
+    def connector_config(self) -> dict[str, object]:
+        settings = {
+            "memory_limit": self.memory_limit,
+            "threads": self.threads,
+            "temp_directory": self.temp_directory,
+        }
+        return {name: value for name, value in settings.items() if value is not None}
+
+    def connection(self) -> dict[str, object]:
+        """SQLMesh `duckdb` connection settings for this gateway."""
+
+        connection: dict[str, object] = {"type": "duckdb"}
+        if self.catalogs:
+            connection["catalogs"] = {self.catalog: self.database, **self.catalogs}
+        else:
+            connection["database"] = self.database
+        connector_config = self.connector_config()
+        if connector_config:
+            connection["connector_config"] = connector_config
+        return connection
+
+
 @dataclass(frozen=True)
 class SqlmeshConfig:
     """Minimal SQLMesh project configuration."""
 
     engine_type: str = "databricks"
     dialect: str = "spark"
+    duckdb: DuckDBGatewayConfig | None = None
 
 
 def render_sqlmesh_model(spec: SqlmeshModelSpec) -> str:
@@ -24,11 +70,50 @@ def render_sqlmesh_model(spec: SqlmeshModelSpec) -> str:
     if spec.tags:
         tags = ", ".join(spec.tags)
         header_items.append(f"tags [{tags}]")
+    if spec.columns:
+        columns = ",\n    ".join(
+            f"{name} {dtype}" for name, dtype in spec.columns.items()
+        )
+        header_items.append(f"columns (\n    {columns}\n  )")
+    if spec.audits:
+        audits = ",\n    ".join(spec.audits)
+        header_items.append(f"audits (\n    {audits}\n  )")
     header_body = ",\n  ".join(header_items)
     header = f"MODEL (\n  {header_body}\n);"
     return f"{header}\n\n{spec.sql.strip()}\n"
 
 
+ROW_COUNT_AUDIT = "assert_row_count_matches_spine"
+
+
+def unique_audit(columns: Iterable[str]) -> str:
+    """Reference SQLMesh's built-in uniqueness audit over a column combination."""
+
+    return f"unique_combination_of_columns(columns := ({', '.join(columns)}))"
+
+
+def row_count_audit(spine_model: str) -> str:
+    """Reference the row-count audit comparing a model with the spine."""
+
+    return f"{ROW_COUNT_AUDIT}(spine := {spine_model})"
+
+
+def render_row_count_audit() -> str:
+    """Render the `audits/` file defining the row-count audit.
+
+    It returns a row (failing the audit) when the audited model and the spine
+    model passed as `spine` have different row counts.
+    """
+
+    return (
+        f"AUDIT (\n  name {ROW_COUNT_AUDIT}\n);\n\n"
+        "SELECT model_rows.row_count, spine_rows.row_count AS spine_row_count\n"
+        "FROM (SELECT COUNT(*) AS row_count FROM @this_model) AS model_rows\n"
+        "CROSS JOIN (SELECT COUNT(*) AS row_count FROM @spine) AS spine_rows\n"
+        "WHERE model_rows.row_count <> spine_rows.row_count\n"
+    )
+
+
 def render_sqlmesh_config(config: SqlmeshConfig) -> str:
     """Render sqlmesh.yaml content."""
 
@@ -36,9 +121,17 @@ def render_sqlmesh_config(config: SqlmeshConfig) -> str:
         "model_defaults": {"dialect": config.dialect},
         "engine": {"type": config.engine_type},
     }
+    if config.duckdb is not None:
+        payload["gateways"] = {"duckdb": {"connection": config.duckdb.connection()}}
     return yaml.safe_dump(payload, sort_keys=False)
 
 
+def render_external_models(models: Iterable[dict[str, object]]) -> str:
+    """Render external_models.yaml content from `{name, columns}` entries."""
+
+    return yaml.safe_dump(list(models), sort_keys=False)
+
+
 def render_models(specs: Iterable[SqlmeshModelSpec]) -> dict[str, str]:
     """Render a mapping from model name to SQL content."""
 
@@ -0,0 +1,431 @@
+"""Seeded, vectorized synthetic data for the canonical entities.
+
+Persons are generated in fixed-size chunks. Each chunk and entity draws its own
+random stream from `(seed, chunk index, entity)`, builds Arrow columns with
+NumPy (code frequencies are ranked once per seed, so every chunk shares the
+same common codes), and is written as one Parquet file per entity and partition before the
+next chunk starts, so memory stays bounded by the chunk size rather than the
+dataset size.
+Output is reproducible for the same seed, person count and chunk size.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+
+from spark_preprocessor.errors import ConfigurationError
+
+DEFAULT_CHUNK_SIZE = 250_000
+# Bumped whenever the same seed, size and profiles would generate different
+# data, so cached datasets (e.g. the benchmark suite's) are regenerated.
+FORMAT_VERSION = 2
+
+_EPOCH = date(1970, 1, 1)
+_BIRTH_RANGE = (date(1930, 1, 1), date(2015, 12, 31))
+_EVENT_RANGE = (date(2015, 1, 1), date(2024, 12, 31))
+_AS_OF_RANGE = (date(2025, 1, 1), date(2025, 12, 31))
+
+
+@dataclass(frozen=True)
+class CardinalityProfile:
+    """Negative-binomial rows-per-person distribution for an event entity.
+
+    `mean` is the expected rows per person; a smaller `dispersion` gives a
+    heavier tail (a few persons with very many rows) and more persons with none.
+    """
+
+    mean: float
+    dispersion: float
+    minimum: int = 0
+
+
+DEFAULT_PROFILES = {
+    "encounters": CardinalityProfile(mean=12.0, dispersion=0.8),
+    "diagnoses": CardinalityProfile(mean=18.0, dispersion=0.6),
+    "medications": CardinalityProfile(mean=9.0, dispersion=0.4),
+    "procedures": CardinalityProfile(mean=4.0, dispersion=0.5),
+    "insurance": CardinalityProfile(mean=1.4, dispersion=4.0, minimum=1),
+}
+
+ENTITY_COLUMNS = {
+    "patients": ("person_id", "date_of_birth", "sex", "zip3", "as_of_date"),
+    "encounters": (
+        "encounter_id",
+        "person_id",
+        "encounter_date",
+        "encounter_type",
+        "year",
+    ),
+    "diagnoses": ("person_id", "icd10_code", "diagnosis_date", "year"),
+    "medications": (
+        "order_id",
+        "person_id",
+        "drug_ndc",
+        "start_date",
+        "days_supply",
+        "year",
+    ),
+    "procedures": ("person_id", "procedure_code", "procedure_date", "year"),
+    "insurance": (
+        "person_id",
+        "payer",
+        "plan_type",
+        "coverage_start",
+        "coverage_end",
+        "year",
+    ),
+}
+
+# Event entities are partitioned by calendar year; patients by person chunk.
+PARTITION_COLUMNS = {entity: "year" for entity in DEFAULT_PROFILES} | {
+    "patients": "chunk"
+}
+
+
+@dataclass(frozen=True)
+class SyntheticDatasetSummary:
+    """Written to `<out_dir>/synthetic.json`."""
+
+    seed: int
+    persons: int
+    chunk_size: int
+    row_counts: dict[str, int]
+    profiles: dict[str, dict[str, float]]
+    format_version: int = FORMAT_VERSION
+
+
+def entity_columns(entity: str) -> tuple[str, ...]:
+    """Canonical columns generated for an entity (excluding partition keys)."""
+
+    return tuple(
+        column
+        for column in ENTITY_COLUMNS[entity]
+        if column != PARTITION_COLUMNS[entity]
+    )
+
+
+def synthetic_mapping(table_prefix: str = "synthetic") -> dict[str, object]:
+    """Mapping YAML payload for the generated entities (canonical == physical)."""
+
+    return {
+        "entities": {
+            entity: {
+                "table": f"{table_prefix}.{entity}",
+                "columns": {column: column for column in entity_columns(entity)},
+            }
+            for entity in ENTITY_COLUMNS
+        }
+    }
+
+
+def generate_dataset(
+    out_dir: str | Path,
+    *,
+    persons: int,
+    seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    entities: list[str] | None = None,
+    profiles: dict[str, CardinalityProfile] | None = None,
+) -> SyntheticDatasetSummary:
+    """Generate partitioned Parquet for the canonical entities.
+
+    Files are laid out as `<out_dir>/<entity>/<partition>=<value>/part-<chunk>.parquet`
+    (hive partitioning), readable as one dataset per entity directory.
+
+    Args:
+        out_dir: Output directory (existing entity directories are replaced).
+        persons: Number of persons (rows in `patients`).
+        seed: Seed for reproducible output.
+        chunk_size: Persons generated and written per chunk; bounds memory.
+        entities: Entities to write (default: all six canonical entities).
+        profiles: Per-entity cardinality overrides.
+
+    Returns:
+        SyntheticDatasetSummary with row counts per entity.
+    """
+
+    np, pa, pq = _import_arrow_stack()
+
+    selected = list(entities or ENTITY_COLUMNS)
+    unknown = sorted(set(selected) - set(ENTITY_COLUMNS))
+    if unknown:
+        raise ConfigurationError(f"Unknown synthetic entities: {unknown}")
+    if persons < 1 or chunk_size < 1:
+        raise ConfigurationError("persons and chunk_size must be positive")
+    cardinalities = DEFAULT_PROFILES | (profiles or {})
+
+    out_dir = Path(out_dir)
+    for entity in selected:
+        _clear_dir(out_dir / entity)
+
+    code_weights = _code_weights(np, seed)
+    row_counts = dict.fromkeys(selected, 0)
+    for chunk, start in enumerate(range(0, persons, chunk_size)):
+        size = min(chunk_size, persons - start)
+        generator = _ChunkGenerator(np, pa, seed, chunk, start, size, code_weights)
+        for entity in selected:
+            if entity == "patients":
+                table = generator.patients()
+            else:
+                table = generator.events(entity, cardinalities[entity])
+            row_counts[entity] += table.num_rows
+            _write_partitions(pa, pq, table, out_dir / entity, entity, chunk)
+
+    summary = SyntheticDatasetSummary(
+        seed=seed,
+        persons=persons,
+        chunk_size=chunk_size,
+        row_counts=row_counts,
+        profiles={
+            entity: asdict(cardinalities[entity])
+            for entity in selected
+            if entity in cardinalities
+        },
+    )
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "synthetic.json").write_text(
+        json.dumps(asdict(summary), indent=2, sort_keys=True)
+    )
+    return summary
+
+
+class _ChunkGenerator:
+    """Builds the Arrow tables for one chunk of persons."""
+
+    def __init__(
+        self, np, pa, seed: int, chunk: int, start: int, size: int, code_weights
+    ) -> None:
+        self._np = np
+        self._pa = pa
+        self._seed = seed
+        self._chunk = chunk
+        self._size = size
+        self._code_weights = code_weights
+        self._birth_days = self._rng("persons").integers(
+            _days(_BIRTH_RANGE[0]), _days(_BIRTH_RANGE[1]), size, dtype=np.int32
+        )
+        self._person_ids = _prefixed_ids(pa, "P", np.arange(start, start + size), 10)
+
+    def _rng(self, stream: str):
+        # Independent streams keep each entity's data the same whichever
+        # subset of entities is generated.
+        index = ["persons", *ENTITY_COLUMNS].index(stream)
+        return self._np.random.default_rng([self._seed, self._chunk, index])
+
+    def patients(self):
+        np, pa, rng = self._np, self._pa, self._rng("patients")
+        as_of = rng.integers(
+            _days(_AS_OF_RANGE[0]), _days(_AS_OF_RANGE[1]), self._size, dtype=np.int32
+        )
+        return pa.table(
+            {
+                "person_id": self._person_ids,
+                "date_of_birth": _dates(pa, self._birth_days),
+                "sex": _categorical(
+                    pa, rng, ("F", "M", "U"), self._size, (0.51, 0.48, 0.01)
+                ),
+                "zip3": _categorical(
+                    pa, rng, tuple(f"{value:03d}" for value in range(1000)), self._size
+                ),
+                "as_of_date": _dates(pa, as_of),
+                "chunk": pa.array(np.full(self._size, self._chunk, dtype=np.int32)),
+            }
+        )
+
+    def _codes(self, rng, entity: str, size: int):
+        vocabulary, weights = self._code_weights[entity]
+        return _categorical(self._pa, rng, vocabulary, size, weights)
+
+    def events(self, entity: str, profile: CardinalityProfile):
+        np, pa, rng = self._np, self._pa, self._rng(entity)
+        counts = _per_person_counts(np, rng, profile, self._size)
+        owners = np.repeat(np.arange(self._size), counts)
+        rows = len(owners)
+        event_days = np.maximum(
+            rng.integers(
+                _days(_EVENT_RANGE[0]), _days(_EVENT_RANGE[1]), rows, dtype=np.int32
+            ),
+            self._birth_days[owners],
+        )
+        person_ids = self._person_ids.take(pa.array(owners))
+        years = pa.array(
+            event_days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int32)
+            + 1970
+        )
+        # Ids are unique across chunks: the chunk index is the high part and
+        # the row number within the chunk the low part.
+        row_ids = (np.int64(self._chunk) << 32) + np.arange(rows, dtype=np.int64)
+
+        if entity == "encounters":
+            return pa.table(
+                {
+                    "encounter_id": _prefixed_ids(pa, "E", row_ids, 16),
+                    "person_id": person_ids,
+                    "encounter_date": _dates(pa, event_days),
+                    "encounter_type": _categorical(
+                        pa,
+                        rng,
+                        ("outpatient", "inpatient", "emergency", "telehealth"),
+                        rows,
+                        (0.7, 0.08, 0.12, 0.1),
+                    ),
+                    "year": years,
+                }
+            )
+        if entity == "diagnoses":
+            return pa.table(
+                {
+                    "person_id": person_ids,
+                    "icd10_code": self._codes(rng, "diagnoses", rows),
+                    "diagnosis_date": _dates(pa, event_days),
+                    "year": years,
+                }
+            )
+        if entity == "medications":
+            return pa.table(
+                {
+                    "order_id": _prefixed_ids(pa, "O", row_ids, 16),
+                    "person_id": person_ids,
+                    "drug_ndc": self._codes(rng, "medications", rows),
+                    "start_date": _dates(pa, event_days),
+                    "days_supply": pa.array(
+                        rng.choice(np.array([7, 14, 30, 60, 90], dtype=np.int32), rows)
+                    ),
+                    "year": years,
+                }
+            )
+        if entity == "procedures":
+            return pa.table(
+                {
+                    "person_id": person_ids,
+                    "procedure_code": self._codes(rng, "procedures", rows),
+                    "procedure_date": _dates(pa, event_days),
+                    "year": years,
+                }
+            )
+        coverage_days = rng.integers(90, 3 * 365, rows, dtype=np.int32)
+        return pa.table(
+            {
+                "person_id": person_ids,
+                "payer": _categorical(
+                    pa,
+                    rng,
+                    ("commercial", "medicare", "medicaid", "self_pay"),
+                    rows,
+                    (0.55, 0.25, 0.17, 0.03),
+                ),
+                "plan_type": _categorical(pa, rng, ("HMO", "PPO", "EPO", "POS"), rows),
+                "coverage_start": _dates(pa, event_days),
+                "coverage_end": _dates(pa, event_days + coverage_days),
+                "year": years,
+            }
+        )
+
+
+def _per_person_counts(np, rng, profile: CardinalityProfile, size: int):
+    dispersion = profile.dispersion
+    probability = dispersion / (dispersion + max(profile.mean - profile.minimum, 0.0))
+    counts = rng.negative_binomial(dispersion, min(probability, 1.0), size)
+    return counts.astype(np.int64) + profile.minimum
+
+
+def _prefixed_ids(pa, prefix: str, values, width: int):
+    import pyarrow.compute as pc
+
+    digits = pc.utf8_lpad(
+        pc.cast(pa.array(values), pa.string()), width=width, padding="0"
+    )
+    return pc.binary_join_element_wise(prefix, digits, "")
+
+
+def _dates(pa, days):
+    return pa.array(days, type=pa.int32()).cast(pa.date32())
+
+
+def _categorical(pa, rng, values: tuple[str, ...], size: int, weights=None):
+    indices = rng.choice(len(values), size, p=weights).astype("int32")
+    return pa.DictionaryArray.from_arrays(pa.array(indices), pa.array(values))
+
+
+def _code_weights(np, seed: int, exponent: float = 1.1) -> dict[str, tuple]:
+    """Zipf-like code weights per coded entity: a few codes dominate, most are rare.
+
+    The code-to-rank permutation depends on the seed alone, never the chunk,
+    so the same codes are common in every chunk and the skew holds at any
+    dataset size.
+    """
+
+    vocabularies = {
+        "diagnoses": _icd10_vocabulary(),
+        "medications": _ndc_vocabulary(),
+        "procedures": _cpt_vocabulary(),
+    }
+    weights = {}
+    for index, (entity, vocabulary) in enumerate(vocabularies.items()):
+        # Two-part seeds never collide with the (seed, chunk, entity) streams.
+        ranks = np.random.default_rng([seed, index]).permutation(len(vocabulary)) + 1.0
+        entity_weights = ranks**-exponent
+        weights[entity] = (vocabulary, entity_weights / entity_weights.sum())
+    return weights
+
+
+def _icd10_vocabulary() -> tuple[str, ...]:
+    letters = "ABCDEFGHIJKLMNOPQRSTZ"
+    return tuple(
+        f"{letter}{major:02d}.{minor}"
+        for letter in letters
+        for major in range(0, 100, 3)
+        for minor in range(3)
+    )
+
+
+def _ndc_vocabulary() -> tuple[str, ...]:
+    return tuple(
+        f"{labeler:05d}-{product:04d}-01"
+        for labeler in range(40)
+        for product in range(50)
+    )
+
+
+def _cpt_vocabulary() -> tuple[str, ...]:
+    return tuple(f"{code:05d}" for code in range(10000, 99999, 47))
+
+
+def _days(value: date) -> int:
+    return (value - _EPOCH).days
+
+
+def _write_partitions(pa, pq, table, entity_dir: Path, entity: str, chunk: int) -> None:
+    import pyarrow.compute as pc
+
+    column = PARTITION_COLUMNS[entity]
+    keys = table.column(column)
+    data = table.drop_columns([column])
+    for value in pc.unique(keys).to_pylist():
+        part = data.filter(pc.equal(keys, value))
+        partition_dir = entity_dir / f"{column}={value}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        pq.write_table(part, partition_dir / f"part-{chunk:05d}.parquet")
+
+
+def _clear_dir(path: Path) -> None:
+    if not path.exists():
+        return
+    for parquet in sorted(path.rglob("*.parquet")):
+        parquet.unlink()
+    for directory in sorted(path.rglob("*"), reverse=True):
+        if directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+
+
+def _import_arrow_stack():
+    try:
+        import numpy as np
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ConfigurationError(
+            "Synthetic data generation requires the 'synthetic' extra (numpy, pyarrow)"
+        ) from exc
+    return np, pa, pq
@@ -0,0 +1,240 @@
+"""Watch mode: recompile a pipeline when its inputs change."""
+
+import difflib
+import importlib.util
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import structlog
+
+from spark_preprocessor.compiler import compile_document, write_project
+from spark_preprocessor.errors import ConfigurationError, SparkPreprocessorError
+from spark_preprocessor.features import (
+    DEFAULT_REGISTRY,
+    FeatureRegistry,
+    registering_into,
+)
+from spark_preprocessor.schema import (
+    PipelineDocument,
+    load_pipeline_document,
+    load_schema_snapshot,
+)
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 0.2
+
+
+@dataclass(frozen=True)
+class WatchCycle:
+    """The outcome of one recompilation."""
+
+    trigger: list[str]
+    added: list[str] = field(default_factory=list)
+    changed: dict[str, str] = field(default_factory=dict)
+    removed: list[str] = field(default_factory=list)
+    error: str | None = None
+    seconds: float = 0.0
+
+
+def watch_compile(
+    pipeline_path: str | Path,
+    out_dir: str | Path,
+    *,
+    schema_snapshot: str | Path | None = None,
+    feature_modules: list[Path] | None = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    on_cycle: Callable[[WatchCycle], None] | None = None,
+    stop: threading.Event | None = None,
+) -> None:
+    """Compile, then recompile whenever a watched input changes.
+
+    Watched inputs are the pipeline document, the mapping files it includes
+    (as of its last successful load), the schema snapshot, and local feature
+    modules (Python files that call `register_feature` on import).
+    Changes are debounced: a cycle starts once no watched file has changed
+    for `debounce` seconds. Feature modules are re-executed into a fresh copy
+    of the default registry only when one of them changed.
+
+    Each cycle compiles in memory and syncs the result with `write_project`,
+    so unchanged artifacts keep their timestamps. Compile errors are reported
+    and the watch continues.
+
+    Args:
+        pipeline_path: Pipeline YAML to compile.
+        out_dir: Output directory for the compiled project.
+        schema_snapshot: Optional physical schema snapshot.
+        feature_modules: Local feature modules to load and watch.
+        debounce: Quiet period before recompiling, in seconds.
+        poll_interval: How often inputs are checked, in seconds.
+        on_cycle: Called with every cycle's outcome (after it is logged).
+        stop: Event that ends the watch; otherwise it runs until interrupted.
+    """
+
+    pipeline_path = Path(pipeline_path)
+    out_dir = Path(out_dir)
+    feature_modules = [Path(path) for path in feature_modules or []]
+    stop = stop or threading.Event()
+    inputs = [pipeline_path, *feature_modules]
+    if schema_snapshot is not None:
+        inputs.append(Path(schema_snapshot))
+    watched = list(inputs)
+
+    log = structlog.get_logger()
+    registry: FeatureRegistry | None = None
+    state = _stat_all(watched)
+    trigger = [str(path) for path in watched]
+    log.info("watch_started", pipeline=str(pipeline_path), watched=trigger)
+    while True:
+        started = time.perf_counter()
+        cycle: WatchCycle
+        try:
+            if registry is None or any(
+                str(path) in trigger for path in feature_modules
+            ):
+                registry = None  # reload next cycle if this load fails
+                registry = load_feature_modules(feature_modules)
+            document = load_pipeline_document(pipeline_path)
+            watched = [*inputs, *document.mapping_files]
+            for path, stat in _stat_all(watched).items():
+                state.setdefault(path, stat)
+            added, changed, removed = _compile_and_sync(
+                document, out_dir, schema_snapshot, registry
+            )
+            cycle = WatchCycle(trigger, added, changed, removed)
+        except SparkPreprocessorError as exc:
+            cycle = WatchCycle(trigger, error=str(exc))
+        cycle = replace(cycle, seconds=round(time.perf_counter() - started, 3))
+        _log_cycle(log, cycle)
+        if on_cycle is not None:
+            on_cycle(cycle)
+
+        trigger = []
+        while not trigger:
+            if stop.wait(poll_interval):
+                log.info("watch_stopped", pipeline=str(pipeline_path))
+                return
+            current = _stat_all(watched)
+            trigger = sorted(
+                str(path) for path in watched if current[path] != state.get(path)
+            )
+        # Debounce: wait for the inputs to settle.
+        while True:
+            if stop.wait(debounce):
+                log.info("watch_stopped", pipeline=str(pipeline_path))
+                return
+            settled = _stat_all(watched)
+            trigger = sorted(
+                set(trigger)
+                | {str(path) for path in watched if settled[path] != current[path]}
+            )
+            if settled == current:
+                break
+            current = settled
+        state = current
+
+
+def _stat_all(paths: list[Path]) -> dict[Path, tuple[int, int] | None]:
+    snapshot: dict[Path, tuple[int, int] | None] = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            snapshot[path] = None
+        else:
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def load_feature_modules(feature_modules: list[Path]) -> FeatureRegistry:
+    """Execute local feature modules into a copy of the default registry."""
+
+    registry = DEFAULT_REGISTRY.copy()
+    with registering_into(registry):
+        for path in feature_modules:
+            _exec_feature_module(path)
+    return registry
+
+
+def _exec_feature_module(path: Path) -> None:
+    # A fresh module object each time, so edits take effect on reload.
+    module_name = f"_watch_features_{abs(hash(path.resolve()))}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ConfigurationError(f"Cannot load feature module: {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception as exc:
+        raise ConfigurationError(
+            f"Feature module {path} failed to load: {exc}"
+        ) from exc
+
+
+def _compile_and_sync(
+    document: PipelineDocument,
+    out_dir: Path,
+    schema_snapshot: str | Path | None,
+    registry: FeatureRegistry,
+) -> tuple[list[str], dict[str, str], list[str]]:
+    """Compile in memory and sync into `out_dir`.
+
+    Returns the added, changed (with a `+added -removed` line summary), and
+    removed model files.
+    """
+
+    project = compile_document(
+        document,
+        schema_snapshot=(
+            load_schema_snapshot(Path(schema_snapshot)) if schema_snapshot else None
+        ),
+        registry=registry,
+    )
+    before = {
+        relative: (out_dir / relative).read_text()
+        for relative in project.files
+        if relative.startswith("models/") and (out_dir / relative).is_file()
+    }
+    changes = write_project(project, out_dir)
+    changed: dict[str, str] = {}
+    for relative in changes.changed:
+        if relative in before:
+            summary = _line_summary(before[relative], project.files[relative])
+            if summary:
+                changed[relative] = summary
+    return (
+        [relative for relative in changes.added if relative.startswith("models/")],
+        changed,
+        [relative for relative in changes.removed if relative.startswith("models/")],
+    )
+
+
+def _line_summary(before: str, after: str) -> str:
+    diff = list(difflib.ndiff(before.splitlines(), after.splitlines()))
+    plus = sum(line.startswith("+ ") for line in diff)
+    minus = sum(line.startswith("- ") for line in diff)
+    return f"+{plus} -{minus}" if plus or minus else ""
+
+
+def _log_cycle(log, cycle: WatchCycle) -> None:
+    if cycle.error is not None:
+        log.error(
+            "watch_compile_failed",
+            trigger=cycle.trigger,
+            error=cycle.error,
+            seconds=cycle.seconds,
+        )
+        return
+    log.info(
+        "watch_compiled",
+        trigger=cycle.trigger,
+        added=cycle.added,
+        changed=cycle.changed,
+        removed=cycle.removed,
+        seconds=cycle.seconds,
+    )
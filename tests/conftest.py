@@ -8,7 +8,6 @@ from spark_preprocessor.features import registry as feature_registry
 @pytest.fixture(autouse=True)
 def _restore_feature_registry() -> Generator[None, None, None]:
     """Keep feature registry mutations from leaking across tests."""
-    snapshot = dict(feature_registry._REGISTRY)
+    saved = feature_registry.DEFAULT_REGISTRY.copy()
     yield
-    feature_registry._REGISTRY.clear()
-    feature_registry._REGISTRY.update(snapshot)
+    feature_registry.DEFAULT_REGISTRY.restore(saved)
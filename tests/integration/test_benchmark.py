@@ -0,0 +1,20 @@
+import json
+from pathlib import Path
+
+from spark_preprocessor.benchmark import run_suite
+
+SUITE = Path(__file__).resolve().parents[2] / "benchmarks" / "suite.yaml"
+
+
+def test_reference_suite_runs_on_small_synthetic_data(tmp_path: Path) -> None:
+    results, regressions = run_suite(SUITE, tmp_path, scales=[300])
+
+    assert regressions == []
+    assert [result.pipeline for result in results] == ["demographics", "utilization"]
+    utilization = {timing.model: timing for timing in results[1].models}
+    assert utilization["marts.utilization"].rows == 300
+    assert utilization["features.enc__person"].rows <= 300
+    assert utilization["marts.utilization"].peak_rss_mb > 0
+    saved = json.loads((tmp_path / "results.json").read_text())
+    assert saved[0]["persons"] == 300
+    assert (tmp_path / "data" / "300" / "synthetic.json").exists()
@@ -1,4 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import nullcontext as does_not_raise
+import sys
 from pathlib import Path
 
 import json
@@ -6,14 +8,24 @@ import pytest
 import yaml
 from sqlglot import parse_one
 
-from spark_preprocessor.compiler import compile_pipeline
-from spark_preprocessor.errors import ConfigurationError, ValidationError
+from spark_preprocessor.compiler import (
+    compile_document,
+    compile_documents,
+    compile_pipeline,
+    compile_project,
+    write_project,
+)
+from spark_preprocessor.errors import ConfigurationError, FeatureNotFoundError, ValidationError
 from spark_preprocessor.features.base import (
     ColumnSpec,
     FeatureAssets,
     FeatureMetadata,
+    FeatureParamSpec,
+    JoinModelSpec,
+    SqlmeshModelSpec,
 )
-from spark_preprocessor.features.registry import register_feature
+from spark_preprocessor.features.registry import DEFAULT_REGISTRY, FeatureRegistry, register_feature
+from spark_preprocessor.schema import PipelineDocument
 
 
 class _DupFeatureA:
@@ -92,10 +104,160 @@ class _DerivedFeature:
         )
 
 
+class _CrossJoinFeature:
+    meta = FeatureMetadata(
+        key="test.cross_join",
+        description=None,
+        params=(),
+        requirements=(),
+        provides=(ColumnSpec(name="pairs", dtype="bigint"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(
+            models=[
+                SqlmeshModelSpec(
+                    name="features.pairs",
+                    sql=(
+                        "SELECT a.person_id, COUNT(*) AS pairs "
+                        "FROM semantic.patients a CROSS JOIN semantic.patients b "
+                        "GROUP BY a.person_id"
+                    ),
+                    kind="TABLE",
+                    tags=[],
+                )
+            ],
+            join_models=[
+                JoinModelSpec(
+                    model_name="features.pairs",
+                    alias="pr",
+                    on="p.person_id = pr.person_id",
+                    join_type="LEFT",
+                )
+            ],
+            select_expressions=["pr.pairs AS pairs"],
+            tests=[],
+        )
+
+
+class _ClientFeature:
+    meta = FeatureMetadata(
+        key="test.client",
+        description=None,
+        params=(),
+        requirements=(),
+        provides=(ColumnSpec(name="client_val", dtype="int"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def build(self, ctx, params):
+        return FeatureAssets(
+            models=[],
+            join_models=[],
+            select_expressions=[f"{self.value} AS client_val"],
+            tests=[],
+        )
+
+
+class _ClientDoubleFeature:
+    meta = FeatureMetadata(
+        key="test.client_double",
+        description=None,
+        params=(),
+        requirements=(),
+        provides=(ColumnSpec(name="client_double", dtype="int"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(
+            models=[],
+            join_models=[],
+            select_expressions=["client_val * 2 AS client_double"],
+            tests=[],
+        )
+
+
+class _ThresholdFeature:
+    meta = FeatureMetadata(
+        key="test.threshold",
+        description=None,
+        params=(FeatureParamSpec(name="threshold", type="int"),),
+        requirements=(),
+        provides=(ColumnSpec(name="is_over", dtype="boolean"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(
+            models=[
+                SqlmeshModelSpec(
+                    name="features.over_threshold",
+                    sql=(
+                        "SELECT person_id, COUNT(*) > {threshold} AS is_over "
+                        "FROM semantic.patients GROUP BY person_id"
+                    ).format(**params),
+                    kind="TABLE",
+                    tags=[],
+                )
+            ],
+            join_models=[
+                JoinModelSpec(
+                    model_name="features.over_threshold",
+                    alias="ot",
+                    on="p.person_id = ot.person_id",
+                    join_type="LEFT",
+                )
+            ],
+            select_expressions=["ot.is_over AS is_over"],
+            tests=[],
+        )
+
+
+class _ThresholdViewFeature:
+    meta = FeatureMetadata(
+        key="test.threshold_view",
+        description=None,
+        params=(),
+        requirements=(),
+        provides=(ColumnSpec(name="over_flag", dtype="boolean"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(
+            models=[
+                SqlmeshModelSpec(
+                    name="features.over_flag",
+                    sql="SELECT person_id, is_over AS over_flag FROM features.over_threshold",
+                    kind="VIEW",
+                    tags=[],
+                )
+            ],
+            join_models=[
+                JoinModelSpec(
+                    model_name="features.over_flag",
+                    alias="of",
+                    on="p.person_id = of.person_id",
+                    join_type="LEFT",
+                )
+            ],
+            select_expressions=["of.over_flag AS over_flag"],
+            tests=[],
+        )
+
+
 register_feature(_DupFeatureA())
 register_feature(_DupFeatureB())
 register_feature(_BaseFeature())
 register_feature(_DerivedFeature())
+register_feature(_CrossJoinFeature())
+register_feature(_ThresholdFeature())
+register_feature(_ThresholdViewFeature())
 
 
 def _write_pipeline(path: Path, payload: dict) -> Path:
@@ -164,6 +326,166 @@ def test_compile_outputs_and_renders_sql(tmp_path: Path) -> None:
     parse_one(sql, dialect="spark")
 
     assert report.included_features == ["age", "age_bucket"]
+    assert not (out_dir / "manifest" / "lineage.json").exists()
+
+
+def test_compile_writes_lineage_on_request(tmp_path: Path) -> None:
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", _base_payload())
+    out_dir = tmp_path / "out"
+
+    compile_pipeline(pipeline_path, out_dir, lineage=True)
+
+    lineage = json.loads((out_dir / "manifest" / "lineage.json").read_text())
+    assert lineage["unresolved"] == []
+    assert {"age", "age_bucket"} <= set(lineage["columns"])
+    assert lineage["columns"]["age"]["models"] == ["semantic.patients"]
+
+
+def test_compile_document_builds_project_in_memory(tmp_path: Path, monkeypatch) -> None:
+    document = PipelineDocument.model_validate(_base_payload())
+    monkeypatch.chdir(tmp_path)
+
+    project = compile_document(document)
+
+    assert list(tmp_path.iterdir()) == []
+    assert project.report.included_features == ["age", "age_bucket"]
+    assert project.rendered_sql == project.files["rendered/enriched__client_x_enriched.sql"]
+    assert json.loads(project.files["manifest/compile_report.json"])["pipeline_name"] == "client_x_enriched"
+    parse_one(project.rendered_sql, dialect="spark")
+
+    out_dir = tmp_path / "out"
+    (out_dir / "models").mkdir(parents=True)
+    (out_dir / "models" / "stale.sql").write_text("SELECT 1")
+    write_project(project, out_dir)
+    written = {path.relative_to(out_dir).as_posix() for path in out_dir.rglob("*") if path.is_file()}
+    assert written == {*project.files, "manifest/files.json"}
+    assert (out_dir / "tests").is_dir()
+
+
+def test_recompiling_unchanged_pipeline_changes_no_files(tmp_path: Path) -> None:
+    document = PipelineDocument.model_validate(_base_payload())
+    out_dir = tmp_path / "out"
+    write_project(compile_document(document), out_dir)
+    mtimes = {path: path.stat().st_mtime_ns for path in out_dir.rglob("*") if path.is_file()}
+
+    project = compile_document(document)
+    changes = write_project(project, out_dir)
+
+    assert (changes.added, changes.changed, changes.removed) == ([], [], [])
+    assert {path: path.stat().st_mtime_ns for path in out_dir.rglob("*") if path.is_file()} == mtimes
+    assert "compiled_at" not in project.rendered_sql
+    assert json.loads((out_dir / "manifest" / "compile_report.json").read_text())["compiled_at"]
+
+
+def _project_payload(name: str, features: list[dict]) -> dict:
+    payload = _base_payload()
+    payload["pipeline"]["name"] = name
+    payload["pipeline"]["output"]["table"] = f"catalog.schema.{name}"
+    payload["features"] = features
+    payload["profiling"] = {"enabled": False}
+    return payload
+
+
+def test_compile_project_shares_semantic_and_feature_models(tmp_path: Path) -> None:
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text(yaml.safe_dump(_base_payload()["mapping"]))
+    shared = {"key": "test.threshold", "params": {"threshold": 2}}
+    paths = []
+    for name, extra in (("first", _base_payload()["features"][0]), ("second", {"key": "test.base"})):
+        payload = _project_payload(name, [shared, extra])
+        payload["mapping"] = {"include": "mapping.yaml"}
+        paths.append(_write_pipeline(tmp_path / f"{name}.yaml", payload))
+    out_dir = tmp_path / "out"
+
+    report = compile_project(paths, out_dir, lineage=True)
+
+    assert [pipeline.pipeline_name for pipeline in report.pipelines] == ["first", "second"]
+    assert report.shared_models == {
+        "semantic.patients": ["first", "second"],
+        "features.over_threshold": ["first", "second"],
+    }
+    written = {path.relative_to(out_dir).as_posix() for path in out_dir.rglob("*.sql")}
+    assert written == {
+        "audits/assert_row_count_matches_spine.sql",
+        "models/semantic/patients.sql",
+        "models/features/test.threshold/features__over_threshold.sql",
+        "models/marts/enriched__first.sql",
+        "models/marts/enriched__second.sql",
+        "rendered/enriched__first.sql",
+        "rendered/enriched__second.sql",
+    }
+    models = json.loads((out_dir / "manifest" / "models.json").read_text())["models"]
+    assert [model["name"] for model in models] == [
+        "semantic.patients",
+        "features.over_threshold",
+        "catalog.schema.first",
+        "catalog.schema.second",
+    ]
+    pipeline_report = json.loads((out_dir / "manifest" / "pipelines" / "second" / "compile_report.json").read_text())
+    assert pipeline_report["included_features"] == ["test.threshold", "test.base"]
+    assert json.loads((out_dir / "manifest" / "project.json").read_text())["pipelines"] == ["first", "second"]
+    lineage = json.loads((out_dir / "manifest" / "pipelines" / "first" / "lineage.json").read_text())
+    assert lineage["output_table"] == "catalog.schema.first"
+
+
+def test_compile_documents_merges_audits_of_shared_models() -> None:
+    spine_only = PipelineDocument.model_validate(_project_payload("plain", []))
+    joined = PipelineDocument.model_validate(
+        _project_payload("joined", [{"key": "test.threshold", "params": {"threshold": 1}}])
+    )
+
+    project = compile_documents([spine_only, joined])
+
+    single = compile_document(joined).files["models/features/test.threshold/features__over_threshold.sql"]
+    assert project.files["models/features/test.threshold/features__over_threshold.sql"] == single
+    assert "unique_combination_of_columns(columns := (person_id))" in single
+    assert project.report.shared_models == {"semantic.patients": ["plain", "joined"]}
+
+
+@pytest.mark.parametrize(
+    ("second", "message"),
+    [
+        (_project_payload("first", []), "Duplicate pipeline name: first"),
+        ({**_project_payload("other", []), "mapping": {"entities": {}}}, "do not share a mapping"),
+        (
+            _project_payload("other", [{"key": "test.threshold", "params": {"threshold": 5}}]),
+            "compile different definitions of features.over_threshold",
+        ),
+    ],
+)
+def test_compile_documents_rejects_conflicting_pipelines(second: dict, message: str) -> None:
+    first = _project_payload("first", [{"key": "test.threshold", "params": {"threshold": 2}}])
+    documents = [PipelineDocument.model_validate(payload) for payload in (first, second)]
+
+    with pytest.raises(ConfigurationError, match=message):
+        compile_documents(documents)
+
+
+def test_shared_features_are_content_addressed() -> None:
+    features = [{"key": "test.threshold", "params": {"threshold": 2}}, {"key": "test.threshold_view"}]
+
+    def compiled(name: str, table: str = "catalog.schema.patients_raw", enabled: bool = True):
+        payload = _project_payload(name, features)
+        payload["mapping"]["entities"]["patients"]["table"] = table
+        payload["pipeline"]["shared_features"] = {"enabled": enabled}
+        return compile_document(PipelineDocument.model_validate(payload))
+
+    first, second = compiled("first"), compiled("second")
+    shared = first.report.feature_tables["content_addressed"]
+    assert len(shared) == 1 and shared[0].startswith("shared_features.over_threshold__")
+    assert first.report.feature_tables == {"content_addressed": shared, "pipeline_local": ["features.over_flag"]}
+    assert second.report.feature_tables["content_addressed"] == shared
+    assert compiled("other", table="catalog.other.patients_raw").report.feature_tables["content_addressed"] != shared
+    assert compiled("plain", enabled=False).report.feature_tables == {
+        "content_addressed": [],
+        "pipeline_local": ["features.over_threshold", "features.over_flag"],
+    }
+
+    assert f"LEFT JOIN {shared[0]} ot" in first.rendered_sql
+    view = next(text for path, text in first.files.items() if path.endswith("features__over_flag.sql"))
+    assert f"FROM {shared[0]}" in view
+    models = json.loads(first.files["manifest/models.json"])["models"]
+    assert [model.get("shared", False) for model in models] == [False, True, False, False]
 
 
 def test_warn_skip_on_missing_column_ref(tmp_path: Path) -> None:
@@ -262,3 +584,155 @@ def test_profiling_notebook_sampling_mode(tmp_path: Path) -> None:
     notebook = (out_dir / "notebooks" / "profile__client_x_enriched.py").read_text()
     assert "sampling_mode = 'random'" in notebook
     assert "df = df.orderBy(F.rand())" in notebook
+
+
+def test_compile_emits_external_models_for_typed_tables(tmp_path: Path) -> None:
+    payload = _base_payload()
+    payload["mapping"]["entities"]["patients"]["types"] = {"date_of_birth": "DATE"}
+    snapshot_path = tmp_path / "snapshot.yaml"
+    snapshot_path.write_text(
+        yaml.safe_dump(
+            {"catalog.schema.patients_raw": {"member_id": "STRING", "as_of_date": "DATE"}}
+        )
+    )
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
+    out_dir = tmp_path / "out"
+
+    report = compile_pipeline(pipeline_path, out_dir, schema_snapshot=snapshot_path)
+
+    external = yaml.safe_load((out_dir / "external_models.yaml").read_text())
+    assert external == [
+        {
+            "name": "catalog.schema.patients_raw",
+            "columns": {"as_of_date": "DATE", "dob": "DATE", "member_id": "STRING"},
+        }
+    ]
+    assert report.external_models == {
+        "typed": ["catalog.schema.patients_raw"],
+        "untyped": [],
+    }
+
+
+def test_compile_declares_mart_columns_when_fully_typed(tmp_path: Path) -> None:
+    payload = _base_payload()
+    payload["mapping"]["entities"]["patients"]["types"] = {"as_of_date": "DATE"}
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
+    out_dir = tmp_path / "out"
+
+    compile_pipeline(pipeline_path, out_dir)
+
+    semantic = (out_dir / "models" / "semantic" / "patients.sql").read_text()
+    assert "CAST(member_id AS STRING) AS person_id" in semantic
+    mart = (out_dir / "models" / "marts" / "enriched__client_x_enriched.sql").read_text()
+    assert "person_id STRING,\n    age INT,\n    age_bucket STRING" in mart
+
+
+def test_compile_generates_spine_uniqueness_and_row_count_audits(tmp_path: Path) -> None:
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", _base_payload())
+    out_dir = tmp_path / "out"
+
+    compile_pipeline(pipeline_path, out_dir)
+
+    semantic = (out_dir / "models" / "semantic" / "patients.sql").read_text()
+    assert "unique_combination_of_columns(columns := (person_id))" in semantic
+    mart = (out_dir / "models" / "marts" / "enriched__client_x_enriched.sql").read_text()
+    assert "assert_row_count_matches_spine(spine := semantic.patients)" in mart
+    audit = (out_dir / "audits" / "assert_row_count_matches_spine.sql").read_text()
+    assert "name assert_row_count_matches_spine" in audit
+
+
+@pytest.mark.parametrize(
+    ("lint", "expectation", "findings"),
+    [
+        ({}, does_not_raise(), ["cross-join"]),
+        ({"policy": "fail"}, pytest.raises(ValidationError, match="Lint failed"), None),
+        ({"policy": "fail", "ignore": ["cross-join"]}, does_not_raise(), []),
+    ],
+)
+def test_compile_lints_feature_sql(lint: dict, expectation, findings, tmp_path: Path) -> None:
+    payload = _base_payload()
+    payload["pipeline"]["lint"] = lint
+    payload["features"] = [{"key": "test.cross_join"}]
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
+    out_dir = tmp_path / "out"
+
+    with expectation:
+        compile_pipeline(pipeline_path, out_dir)
+    if findings is None:
+        return
+
+    report = json.loads((out_dir / "manifest" / "compile_report.json").read_text())
+    assert [finding["rule"] for finding in report["lint"]["findings"]] == findings
+    assert report["lint"]["metrics"]["features.pairs"]["join_count"] == 1
+    assert report["lint"]["metrics"]["catalog.schema.enriched_client_x"]["join_count"] == 1
+
+
+def test_compile_with_explicit_registries_in_parallel_threads(tmp_path: Path) -> None:
+    payload = _base_payload()
+    payload["features"].append({"key": "test.client"})
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
+    registries = {}
+    for value in (10, 20):
+        registries[value] = DEFAULT_REGISTRY.copy()
+        registries[value].register(_ClientFeature(value))
+
+    def compile_with(value: int) -> str:
+        out_dir = tmp_path / f"out_{value}"
+        compile_pipeline(pipeline_path, out_dir, registry=registries[value])
+        return (out_dir / "rendered" / "enriched__client_x_enriched.sql").read_text()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        rendered = dict(zip((10, 20), pool.map(compile_with, (10, 20))))
+
+    assert "10 AS client_val" in rendered[10]
+    assert "20 AS client_val" in rendered[20]
+    with pytest.raises(FeatureNotFoundError, match="test.client"):
+        compile_pipeline(pipeline_path, tmp_path / "out_default")
+
+
+def test_compile_imports_only_referenced_plugin_features(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    for module, value in (("_compile_plugin_used", 10), ("_compile_plugin_unused", 20)):
+        (tmp_path / f"{module}.py").write_text(
+            "from tests.integration.test_compiler import _ClientFeature\n"
+            f"FEATURE = _ClientFeature({value})\n"
+        )
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = FeatureRegistry(DEFAULT_REGISTRY.snapshot().values())
+    registry.register_lazy(
+        {"test.client": "_compile_plugin_used:FEATURE", "test.other": "_compile_plugin_unused:FEATURE"}
+    )
+
+    payload = _base_payload()
+    payload["features"].append({"key": "test.client"})
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
+    compile_pipeline(pipeline_path, tmp_path / "out", registry=registry)
+
+    rendered = (tmp_path / "out" / "rendered" / "enriched__client_x_enriched.sql").read_text()
+    assert "10 AS client_val" in rendered
+    assert "_compile_plugin_used" in sys.modules
+    assert "_compile_plugin_unused" not in sys.modules
+
+
+def test_compile_reports_missing_plugin_dependency_before_loading_it(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "_compile_plugin_provider.py").write_text(
+        "from tests.integration.test_compiler import _ClientFeature\nFEATURE = _ClientFeature(10)\n"
+    )
+    monkeypatch.delitem(sys.modules, "_compile_plugin_provider", raising=False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = FeatureRegistry([*DEFAULT_REGISTRY.snapshot().values(), _ClientDoubleFeature()])
+    registry.register_lazy(
+        {"test.client": "_compile_plugin_provider:FEATURE", "test.unrelated": "_compile_plugin_missing:FEATURE"},
+        provides={"test.client": ["client_val"], "test.unrelated": ["other_val"]},
+    )
+
+    payload = _base_payload()
+    payload["features"] = [{"key": "test.client_double"}]
+    document = PipelineDocument.model_validate(payload)
+    with pytest.raises(ValidationError, match=r"missing dependent feature outputs.*test\.client"):
+        compile_document(document, registry=registry)
+    assert "test.unrelated" not in registry.snapshot()
+
+    payload["features"] = [{"key": "test.client"}, {"key": "test.client_double"}]
+    project = compile_document(PipelineDocument.model_validate(payload), registry=registry)
+    assert project.report.included_features == ["test.client", "test.client_double"]
@@ -0,0 +1,204 @@
+import json
+import socket
+import threading
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+import yaml
+
+from spark_preprocessor import client, server
+from spark_preprocessor.errors import ConfigurationError
+
+
+def _payload() -> dict:
+    return {
+        "mapping": {
+            "entities": {
+                "patients": {
+                    "table": "catalog.schema.patients_raw",
+                    "columns": {
+                        "person_id": "member_id",
+                        "date_of_birth": "dob",
+                        "as_of_date": "as_of_date",
+                    },
+                }
+            }
+        },
+        "pipeline": {
+            "name": "served",
+            "version": "v1",
+            "grain": "PERSON",
+            "spine": {
+                "entity": "patients",
+                "key": "person_id",
+                "columns": ["person_id"],
+            },
+            "output": {"table": "catalog.schema.served", "materialization": "table"},
+        },
+        "features": [
+            {"key": "age", "params": {"start": "date_of_birth", "end": "as_of_date"}}
+        ],
+    }
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Generator[Path]:
+    path = tmp_path / "s.sock"
+    thread = threading.Thread(target=server.serve, args=(path,), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not path.exists():
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.01)
+    yield path
+    if thread.is_alive():
+        client.send_request(path, {"command": "shutdown"})
+        thread.join(timeout=10)
+    assert not path.exists()
+
+
+def test_server_compiles_validates_and_renders(
+    socket_path: Path, tmp_path: Path, monkeypatch
+) -> None:
+    pipeline = tmp_path / "pipeline.yaml"
+    pipeline.write_text(yaml.safe_dump(_payload()))
+    loads: list[Path] = []
+    original_load = server.load_pipeline_document
+    monkeypatch.setattr(
+        server,
+        "load_pipeline_document",
+        lambda path: loads.append(path) or original_load(path),
+    )
+
+    out = tmp_path / "out"
+    compiled = client.send_request(
+        socket_path, {"command": "compile", "pipeline": str(pipeline), "out": str(out)}
+    )
+    assert compiled["ok"], compiled
+    assert compiled["result"]["included_features"] == ["age"]
+    assert (out / "manifest" / "compile_report.json").exists()
+
+    validated = client.send_request(
+        socket_path, {"command": "validate", "pipeline": str(pipeline)}
+    )
+    assert validated["result"]["included_features"] == ["age"]
+    (out / "manifest" / "compile_report.json").unlink()
+    rendered = client.send_request(
+        socket_path, {"command": "render", "pipeline": str(pipeline)}
+    )
+    assert "AS age" in rendered["result"]["sql"]
+    assert not (out / "manifest" / "compile_report.json").exists()
+    assert len(loads) == 1
+
+    payload = _payload()
+    payload["features"] = []
+    pipeline.write_text(yaml.safe_dump(payload))
+    validated = client.send_request(
+        socket_path, {"command": "validate", "pipeline": str(pipeline)}
+    )
+    assert validated["result"]["included_features"] == []
+    assert len(loads) == 2
+
+
+@pytest.mark.parametrize(
+    ("request_payload", "error"),
+    [
+        (
+            {"command": "compile", "pipeline": "missing.yaml", "out": "out"},
+            "Pipeline file not found",
+        ),
+        ({"command": "compile"}, "Request is missing 'pipeline'"),
+        ({"command": "explode"}, "Unknown command: explode"),
+    ],
+)
+def test_server_reports_request_errors(
+    socket_path: Path, request_payload: dict, error: str
+) -> None:
+    response = client.send_request(socket_path, request_payload)
+    assert response["ok"] is False
+    assert error in response["error"]
+    assert client.send_request(socket_path, {"command": "ping"})["ok"]
+
+
+def test_server_rejects_second_server_on_live_socket(socket_path: Path) -> None:
+    with pytest.raises(ConfigurationError, match="already listening"):
+        server.serve(socket_path)
+
+
+def test_client_main_prints_response_and_exit_code(socket_path: Path, capsys) -> None:
+    def printed() -> dict:
+        # The in-process server logs to stdout too; the client prints one JSON line.
+        return json.loads(
+            next(
+                line
+                for line in capsys.readouterr().out.splitlines()
+                if line.startswith("{")
+            )
+        )
+
+    client.main(["--socket", str(socket_path), "ping"])
+    assert printed()["ok"] is True
+
+    with pytest.raises(SystemExit) as excinfo:
+        client.main(
+            [
+                "--socket",
+                str(socket_path),
+                "compile",
+                "--pipeline",
+                "missing.yaml",
+                "--out",
+                "out",
+            ]
+        )
+    assert excinfo.value.code == 1
+    assert "Pipeline file not found" in printed()["error"]
+
+
+def test_server_answers_invalid_json(socket_path: Path) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(str(socket_path))
+        conn.sendall(b"not json\n")
+        response = json.loads(conn.makefile("rb").readline())
+    assert response["ok"] is False
+    assert response["error"].startswith("Invalid request")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(str(socket_path))
+        conn.sendall(b"[1, 2]\n")
+        response = json.loads(conn.makefile("rb").readline())
+    assert response == {
+        "ok": False,
+        "error": "Invalid request: request must be a JSON object",
+    }
+
+
+def test_server_reloads_documents_when_included_mapping_changes(
+    socket_path: Path, tmp_path: Path
+) -> None:
+    payload = _payload()
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text(yaml.safe_dump(payload["mapping"]))
+    payload["mapping"] = {"include": "mapping.yaml"}
+    pipeline = tmp_path / "pipeline.yaml"
+    pipeline.write_text(yaml.safe_dump(payload))
+
+    request = {"command": "validate", "pipeline": str(pipeline)}
+    assert client.send_request(socket_path, request)["result"]["included_features"] == [
+        "age"
+    ]
+
+    mapping.write_text(
+        yaml.safe_dump(
+            {
+                "entities": {
+                    "patients": {"table": "t", "columns": {"person_id": "member_id"}}
+                }
+            }
+        )
+    )
+    response = client.send_request(socket_path, request)
+    assert response["ok"] is False
+    assert "missing columns" in response["error"]
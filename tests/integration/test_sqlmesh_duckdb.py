@@ -7,9 +7,24 @@ from sqlmesh.core.config.connection import DuckDBConnectionConfig
 from sqlmesh.core.config.gateway import GatewayConfig
 from sqlmesh.core.context import Context
 
-from spark_preprocessor.compiler import compile_pipeline
-from spark_preprocessor.features.base import ColumnSpec, FeatureAssets, FeatureMetadata
+from spark_preprocessor.archive import open_project, write_archive
+from spark_preprocessor.compiler import (
+    compile_document,
+    compile_pipeline,
+    compile_project,
+)
+from spark_preprocessor.features.base import (
+    ColumnSpec,
+    FeatureAssets,
+    FeatureMetadata,
+    FeatureParamSpec,
+    JoinModelSpec,
+    SqlmeshModelSpec,
+)
 from spark_preprocessor.features.registry import register_feature
+from spark_preprocessor.runtime.apply_pipeline import apply_models
+from spark_preprocessor.runtime.checkpoint import load_checkpoint, load_model_manifest
+from spark_preprocessor.schema import PipelineDocument
 
 
 class _DuckDBBaseFeature:
@@ -31,7 +46,41 @@ class _DuckDBBaseFeature:
         )
 
 
+class _DuckDBSharedFeature:
+    meta = FeatureMetadata(
+        key="test.duckdb_shared",
+        description=None,
+        params=(),
+        requirements=(),
+        provides=(ColumnSpec(name="person_rows", dtype="bigint"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(
+            models=[
+                SqlmeshModelSpec(
+                    name="features.person_rows",
+                    sql="SELECT person_id, COUNT(*) AS person_rows FROM semantic.patients GROUP BY person_id",
+                    kind="TABLE",
+                    tags=[],
+                )
+            ],
+            join_models=[
+                JoinModelSpec(
+                    model_name="features.person_rows",
+                    alias="pr",
+                    on="p.person_id = pr.person_id",
+                    join_type="LEFT",
+                )
+            ],
+            select_expressions=["pr.person_rows AS person_rows"],
+            tests=[],
+        )
+
+
 register_feature(_DuckDBBaseFeature())
+register_feature(_DuckDBSharedFeature())
 
 
 def _write_pipeline(path: Path, payload: dict) -> Path:
@@ -39,8 +88,8 @@ def _write_pipeline(path: Path, payload: dict) -> Path:
     return path
 
 
-def test_sqlmesh_duckdb_smoke(tmp_path: Path) -> None:
-    payload = {
+def _smoke_payload() -> dict:
+    return {
         "mapping": {
             "entities": {
                 "patients": {
@@ -65,10 +114,8 @@ def test_sqlmesh_duckdb_smoke(tmp_path: Path) -> None:
         "profiling": {"enabled": False},
     }
 
-    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
-    out_dir = tmp_path / "out"
-    compile_pipeline(pipeline_path, out_dir)
 
+def _duckdb_config(tmp_path: Path) -> tuple[Config, Path]:
     db_path = tmp_path / "duckdb.db"
     conn = duckdb.connect(str(db_path))
     conn.execute("CREATE TABLE patients_raw (person_id VARCHAR)")
@@ -83,6 +130,15 @@ def test_sqlmesh_duckdb_smoke(tmp_path: Path) -> None:
         },
         model_defaults=ModelDefaultsConfig(dialect="spark"),
     )
+    return config, db_path
+
+
+def test_sqlmesh_duckdb_smoke(tmp_path: Path) -> None:
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", _smoke_payload())
+    out_dir = tmp_path / "out"
+    compile_pipeline(pipeline_path, out_dir)
+
+    config, db_path = _duckdb_config(tmp_path)
     context = Context(paths=out_dir, config=config)
     plan = context.plan(no_prompts=True)
     context.apply(plan)
@@ -92,3 +148,307 @@ def test_sqlmesh_duckdb_smoke(tmp_path: Path) -> None:
     conn.close()
 
     assert rows == [("p1", 1)]
+
+
+def test_sqlmesh_duckdb_applies_project_archive(tmp_path: Path) -> None:
+    archive = write_archive(
+        compile_document(PipelineDocument.model_validate(_smoke_payload())), tmp_path / "project.zip"
+    )
+
+    config, db_path = _duckdb_config(tmp_path)
+    with open_project(archive) as project_dir:
+        models = load_model_manifest(project_dir)
+        assert models is not None
+        apply_models(
+            Context(paths=project_dir, config=config),
+            models,
+            environment=None,
+            checkpoint_path=tmp_path / "checkpoint.json",
+        )
+    assert not project_dir.exists()
+
+    conn = duckdb.connect(str(db_path))
+    rows = conn.execute("SELECT person_id, base_val FROM semantic.enriched_output").fetchall()
+    conn.close()
+    assert rows == [("p1", 1)]
+
+
+def test_sqlmesh_duckdb_applies_merged_project(tmp_path: Path) -> None:
+    paths = []
+    for name in ("first", "second"):
+        payload = _smoke_payload()
+        payload["pipeline"]["name"] = name
+        payload["pipeline"]["output"]["table"] = f"semantic.{name}_output"
+        paths.append(_write_pipeline(tmp_path / f"{name}.yaml", payload))
+    out_dir = tmp_path / "out"
+    compile_project(paths, out_dir)
+    models = load_model_manifest(out_dir)
+    assert models is not None
+
+    config, db_path = _duckdb_config(tmp_path)
+    applied = apply_models(
+        Context(paths=out_dir, config=config),
+        models,
+        environment=None,
+        checkpoint_path=tmp_path / "checkpoint.json",
+    )
+    assert applied == ["semantic.patients", "semantic.first_output", "semantic.second_output"]
+
+    conn = duckdb.connect(str(db_path))
+    for name in ("first", "second"):
+        rows = conn.execute(f"SELECT person_id, base_val FROM semantic.{name}_output").fetchall()
+        assert rows == [("p1", 1)]
+    conn.close()
+
+
+def test_sqlmesh_duckdb_reuses_shared_feature_tables(tmp_path: Path) -> None:
+    projects = {}
+    for name in ("first", "second"):
+        payload = _smoke_payload()
+        payload["pipeline"]["name"] = name
+        payload["pipeline"]["output"]["table"] = f"semantic.{name}_output"
+        payload["pipeline"]["shared_features"] = {"enabled": True}
+        payload["features"] = [{"key": "test.duckdb_shared"}]
+        report = compile_pipeline(_write_pipeline(tmp_path / f"{name}.yaml", payload), tmp_path / name)
+        projects[name] = (tmp_path / name, report)
+    shared = projects["first"][1].feature_tables["content_addressed"]
+    assert shared == projects["second"][1].feature_tables["content_addressed"]
+    assert shared[0].startswith("shared_features.person_rows__")
+
+    config, db_path = _duckdb_config(tmp_path)
+
+    def apply(name: str, **kwargs) -> list[str]:
+        project_dir = projects[name][0]
+        models = load_model_manifest(project_dir)
+        assert models is not None
+        return apply_models(
+            Context(paths=project_dir, config=config),
+            models,
+            environment=None,
+            checkpoint_path=tmp_path / f"{name}.checkpoint.json",
+            **kwargs,
+        )
+
+    def query(sql: str) -> list[tuple]:
+        conn = duckdb.connect(str(db_path))
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    assert apply("first") == ["semantic.patients", shared[0], "semantic.first_output"]
+    assert apply("second", shared_max_age=3600) == ["semantic.patients", "semantic.second_output"]
+    assert load_checkpoint(tmp_path / "second.checkpoint.json", None).completed[shared[0]].shared_table == "reused"
+    assert apply("second", shared_max_age=0) == ["semantic.patients", shared[0], "semantic.second_output"]
+    assert load_checkpoint(tmp_path / "second.checkpoint.json", None).completed[shared[0]].shared_table == "recomputed"
+
+    # Reruns recompute shared tables by default, so upstream changes show up.
+    conn = duckdb.connect(str(db_path))
+    conn.execute("INSERT INTO patients_raw VALUES ('p2')")
+    conn.close()
+    assert apply("second") == ["semantic.patients", shared[0], "semantic.second_output"]
+    assert query(f"SELECT person_id, person_rows FROM {shared[0]} ORDER BY person_id") == [("p1", 1), ("p2", 1)]
+    assert query("SELECT name, row_count FROM shared_features.shared_table_registry") == [(shared[0], 2)]
+    assert query("SELECT person_id, person_rows FROM semantic.second_output ORDER BY person_id") == [
+        ("p1", 1),
+        ("p2", 1),
+    ]
+
+
+def test_sqlmesh_duckdb_model_checkpoints_resume(tmp_path: Path) -> None:
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", _smoke_payload())
+    out_dir = tmp_path / "out"
+    compile_pipeline(pipeline_path, out_dir)
+    models = load_model_manifest(out_dir)
+    assert models is not None
+    assert [model.name for model in models] == [
+        "semantic.patients",
+        "semantic.enriched_output",
+    ]
+
+    config, _ = _duckdb_config(tmp_path)
+    checkpoint_path = tmp_path / "checkpoint.json"
+    applied = apply_models(
+        Context(paths=out_dir, config=config),
+        models,
+        environment=None,
+        checkpoint_path=checkpoint_path,
+    )
+    assert applied == ["semantic.patients", "semantic.enriched_output"]
+
+    resumed = apply_models(
+        Context(paths=out_dir, config=config),
+        models,
+        environment=None,
+        checkpoint_path=checkpoint_path,
+        resume=True,
+    )
+    assert resumed == []
+
+
+def test_run_local_binds_csv_and_arrow_sources(tmp_path: Path) -> None:
+    import pyarrow as pa
+    from pyarrow import feather
+
+    from spark_preprocessor.runtime.local import parse_source, run_local
+
+    payload = _smoke_payload()
+    payload["mapping"]["entities"]["patients"]["table"] = "raw.patients"
+    payload["mapping"]["entities"]["encounters"] = {
+        "table": "raw.encounters",
+        "columns": {"person_id": "pid"},
+    }
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
+    (tmp_path / "patients.csv").write_text("person_id\np1\np2\n")
+    feather.write_feather(pa.table({"pid": ["p1"]}), tmp_path / "encounters.arrow")
+
+    result = run_local(
+        pipeline_path,
+        tmp_path / "out",
+        [
+            parse_source(f"raw.patients={tmp_path / 'patients.csv'}"),
+            parse_source(f"raw.encounters={tmp_path / 'encounters.arrow'}"),
+        ],
+        database=tmp_path / "local.duckdb",
+    )
+
+    assert result.output_table == "semantic.enriched_output"
+    assert result.applied_models == [
+        "semantic.encounters",
+        "semantic.patients",
+        "semantic.enriched_output",
+    ]
+    assert "gateways" in yaml.safe_load((tmp_path / "out" / "sqlmesh.yaml").read_text())
+    conn = duckdb.connect(str(tmp_path / "local.duckdb"))
+    rows = conn.execute(
+        "SELECT person_id, base_val FROM semantic.enriched_output ORDER BY person_id"
+    ).fetchall()
+    encounters = conn.execute("SELECT count(*) FROM raw.encounters").fetchone()
+    conn.close()
+    assert rows == [("p1", 1), ("p2", 1)]
+    assert encounters == (1,)
+
+
+def test_execute_local_streams_output_as_arrow_batches(tmp_path: Path) -> None:
+    from spark_preprocessor.runtime.local import execute_local, parse_source
+
+    payload = _smoke_payload()
+    payload["mapping"]["entities"]["patients"]["table"] = "raw.clinical.patients"
+    pipeline_path = _write_pipeline(tmp_path / "pipeline.yaml", payload)
+    rows = "\n".join(f"p{index}" for index in range(5))
+    (tmp_path / "patients.csv").write_text(f"person_id\n{rows}\n")
+
+    reader = execute_local(
+        pipeline_path,
+        tmp_path / "out",
+        [parse_source(f"raw.clinical.patients={tmp_path / 'patients.csv'}")],
+        database=tmp_path / "local.duckdb",
+        batch_size=2,
+    )
+
+    assert reader.schema.names == ["person_id", "base_val"]
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    assert sorted(value for batch in batches for value in batch.column(0).to_pylist()) == [
+        f"p{index}" for index in range(5)
+    ]
+
+
+class _VisitCountFeature:
+    meta = FeatureMetadata(
+        key="test.visit_count",
+        description=None,
+        params=(FeatureParamSpec(name="on", type="str"),),
+        requirements=(),
+        provides=(ColumnSpec(name="visits", dtype="bigint"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(
+            models=[
+                SqlmeshModelSpec(
+                    name="features.visit_count",
+                    sql="SELECT person_id, COUNT(*) AS visits FROM semantic.encounters GROUP BY person_id",
+                    kind="TABLE",
+                    tags=[],
+                )
+            ],
+            join_models=[
+                JoinModelSpec(
+                    model_name="features.visit_count",
+                    alias="vc",
+                    on=params["on"],
+                    join_type="LEFT",
+                    # Declared so deliberately fanning-out joins still compile.
+                    grain=("person_id",),
+                )
+            ],
+            select_expressions=["vc.visits AS visits"],
+            tests=[],
+        )
+
+
+def test_captured_plans_diff_detects_join_fan_out(tmp_path: Path) -> None:
+    from spark_preprocessor.plans import diff_plans, load_plans
+    from spark_preprocessor.runtime.local import parse_source
+
+    payload = _smoke_payload()
+    payload["mapping"]["entities"]["encounters"] = {
+        "table": "raw.encounters",
+        "columns": {"person_id": "pid"},
+    }
+    (tmp_path / "encounters.csv").write_text("pid\np1\np1\np2\n")
+    sample = [parse_source(f"raw.encounters={tmp_path / 'encounters.csv'}")]
+    register_feature(_VisitCountFeature())
+
+    for name, on in (("before", "p.person_id = vc.person_id"), ("after", "1 = 1")):
+        payload["features"] = [{"key": "test.visit_count", "params": {"on": on}}]
+        pipeline_path = _write_pipeline(tmp_path / f"{name}.yaml", payload)
+        compile_pipeline(pipeline_path, tmp_path / name, capture_plans=True, plan_sources=sample)
+
+    before = load_plans(tmp_path / "before")
+    assert before["tables"] == {"patients_raw": "empty", "raw.encounters": "sample"}
+    mart = before["models"]["semantic.enriched_output"]
+    assert mart["join_count"] == 1
+    assert mart["joins"][0]["operator"] == "HASH_JOIN"
+    assert before["models"]["features.visit_count"]["estimated_cardinality"] > 0
+
+    changes = diff_plans(before, load_plans(tmp_path / "after"))
+    assert {change.model for change in changes} == {"semantic.enriched_output"}
+    assert "joins" in {change.change for change in changes}
+    assert diff_plans(before, before) == []
+
+
+def test_run_local_audits_fail_on_join_fan_out(tmp_path: Path) -> None:
+    import pytest
+    from sqlmesh.utils.errors import PlanError
+
+    from spark_preprocessor.runtime.local import parse_source, run_local
+
+    payload = _smoke_payload()
+    payload["mapping"]["entities"]["patients"]["table"] = "raw.patients"
+    payload["mapping"]["entities"]["encounters"] = {
+        "table": "raw.encounters",
+        "columns": {"person_id": "pid"},
+    }
+    (tmp_path / "patients.csv").write_text("person_id\np1\np2\n")
+    (tmp_path / "encounters.csv").write_text("pid\np1\np1\np2\n")
+    sources = [
+        parse_source(f"raw.patients={tmp_path / 'patients.csv'}"),
+        parse_source(f"raw.encounters={tmp_path / 'encounters.csv'}"),
+    ]
+    register_feature(_VisitCountFeature())
+
+    def run(name: str, on: str):
+        payload["features"] = [{"key": "test.visit_count", "params": {"on": on}}]
+        pipeline_path = _write_pipeline(tmp_path / f"{name}.yaml", payload)
+        return run_local(
+            pipeline_path, tmp_path / name, sources, database=tmp_path / f"{name}.duckdb"
+        )
+
+    assert run("unique", "p.person_id = vc.person_id").applied_models[-1] == (
+        "semantic.enriched_output"
+    )
+    with pytest.raises(PlanError):
+        run("fan_out", "1 = 1")
@@ -0,0 +1,158 @@
+import queue
+import threading
+from pathlib import Path
+
+import yaml
+
+from spark_preprocessor.watch import WatchCycle, watch_compile
+
+_FEATURE_MODULE = """
+from spark_preprocessor.features.base import ColumnSpec, FeatureAssets, FeatureMetadata
+from spark_preprocessor.features.registry import register_feature
+
+
+class _LocalFeature:
+    meta = FeatureMetadata(
+        key="local.value",
+        description=None,
+        params=(),
+        requirements=(),
+        provides=(ColumnSpec(name="local_val", dtype="int"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(models=[], join_models=[], select_expressions=["{value} AS local_val"], tests=[])
+
+
+register_feature(_LocalFeature())
+"""
+
+
+def _payload(features: list[dict]) -> dict:
+    return {
+        "mapping": {
+            "entities": {
+                "patients": {
+                    "table": "catalog.schema.patients_raw",
+                    "columns": {
+                        "person_id": "member_id",
+                        "date_of_birth": "dob",
+                        "as_of_date": "as_of_date",
+                    },
+                }
+            }
+        },
+        "pipeline": {
+            "name": "watched",
+            "version": "v1",
+            "grain": "PERSON",
+            "spine": {
+                "entity": "patients",
+                "key": "person_id",
+                "columns": ["person_id"],
+            },
+            "output": {"table": "catalog.schema.watched", "materialization": "table"},
+        },
+        "features": features,
+    }
+
+
+def test_watch_recompiles_changed_inputs(tmp_path: Path) -> None:
+    pipeline = tmp_path / "pipeline.yaml"
+    module = tmp_path / "local_features.py"
+    out = tmp_path / "out"
+    age = {"key": "age", "params": {"start": "date_of_birth", "end": "as_of_date"}}
+    pipeline.write_text(yaml.safe_dump(_payload([age])))
+    module.write_text(_FEATURE_MODULE.format(value=1))
+
+    cycles: queue.Queue[WatchCycle] = queue.Queue()
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch_compile,
+        args=(pipeline, out),
+        kwargs={
+            "feature_modules": [module],
+            "debounce": 0.05,
+            "poll_interval": 0.02,
+            "on_cycle": cycles.put,
+            "stop": stop,
+        },
+        daemon=True,
+    )
+    thread.start()
+    try:
+        mart = "models/marts/enriched__watched.sql"
+        first = cycles.get(timeout=30)
+        assert first.error is None
+        assert "models/semantic/patients.sql" in first.added
+        semantic_mtime = (
+            (out / "models" / "semantic" / "patients.sql").stat().st_mtime_ns
+        )
+
+        pipeline.write_text(yaml.safe_dump(_payload([age, {"key": "local.value"}])))
+        second = cycles.get(timeout=30)
+        assert second.trigger == [str(pipeline)]
+        assert second.added == []
+        assert list(second.changed) == [mart]
+        assert (
+            out / "models" / "semantic" / "patients.sql"
+        ).stat().st_mtime_ns == semantic_mtime
+
+        module.write_text(_FEATURE_MODULE.format(value=2))
+        third = cycles.get(timeout=30)
+        assert third.trigger == [str(module)]
+        assert third.changed == {mart: "+1 -1"}
+        assert "2 AS local_val" in (out / mart).read_text()
+
+        pipeline.write_text(yaml.safe_dump(_payload([{"key": "unknown.feature"}])))
+        failed = cycles.get(timeout=30)
+        assert "unknown.feature" in failed.error
+        assert "2 AS local_val" in (out / mart).read_text()
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert not list(tmp_path.glob(".watch-*"))
+
+
+def test_watch_recompiles_when_included_mapping_changes(tmp_path: Path) -> None:
+    payload = _payload(
+        [{"key": "age", "params": {"start": "date_of_birth", "end": "as_of_date"}}]
+    )
+    mapping = tmp_path / "mapping.yaml"
+    mapping.write_text(yaml.safe_dump(payload["mapping"]))
+    payload["mapping"] = {"include": "mapping.yaml"}
+    pipeline = tmp_path / "pipeline.yaml"
+    pipeline.write_text(yaml.safe_dump(payload))
+    out = tmp_path / "out"
+
+    cycles: queue.Queue[WatchCycle] = queue.Queue()
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch_compile,
+        args=(pipeline, out),
+        kwargs={
+            "debounce": 0.05,
+            "poll_interval": 0.02,
+            "on_cycle": cycles.put,
+            "stop": stop,
+        },
+        daemon=True,
+    )
+    thread.start()
+    try:
+        assert cycles.get(timeout=30).error is None
+        renamed = yaml.safe_load(mapping.read_text())
+        renamed["entities"]["patients"]["table"] = "catalog.schema.patients_v2"
+        mapping.write_text(yaml.safe_dump(renamed))
+        cycle = cycles.get(timeout=30)
+        assert cycle.trigger == [str(mapping)]
+        assert "models/semantic/patients.sql" in cycle.changed
+        assert (
+            "patients_v2" in (out / "models" / "semantic" / "patients.sql").read_text()
+        )
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+    assert not thread.is_alive()
@@ -144,3 +144,245 @@ def test_main_reraises_unexpected_exception(tmp_path: Path) -> None:
             else:
                 sys.modules[key] = original
         monkeypatch.undo()
+
+
+class _FakeAdapter:
+    def __init__(self, existing: set[str], counts: dict[str, int]):
+        self.existing = existing
+        self.counts = counts
+
+    def table_exists(self, name: str) -> bool:
+        return name in self.existing
+
+    def fetchone(self, sql: str):
+        table = sql.rsplit(" ", 1)[-1]
+        return (self.counts.get(table, 0),)
+
+
+class _FakeModelContext:
+    def __init__(self, adapter: _FakeAdapter, fail_on: str | None = None):
+        self.engine_adapter = adapter
+        self.fail_on = fail_on
+        self.applied: list[str] = []
+        self.restated: list[str] = []
+        # Models depend on every model before them in the manifest.
+        self.dag = SimpleNamespace(upstream=lambda fqn: set(_names()[: _names().index(fqn)]))
+
+    def get_model(self, name: str):
+        return SimpleNamespace(fqn=name)
+
+    def plan(self, *, environment, no_prompts: bool, select_models: list[str], restate_models=None):
+        [name] = select_models
+        missing = [] if name in self.engine_adapter.existing and not restate_models else [name]
+        return SimpleNamespace(model=name, missing_intervals=missing, restated=bool(restate_models))
+
+    def apply(self, plan):
+        if plan.model == self.fail_on:
+            raise RuntimeError(f"failed {plan.model}")
+        self.applied.append(plan.model)
+        if plan.restated:
+            self.restated.append(plan.model)
+        self.engine_adapter.existing.add(plan.model)
+
+
+def _names() -> list[str]:
+    return [model.name for model in _manifest_models()]
+
+
+def _manifest_models():
+    from spark_preprocessor.runtime.checkpoint import ModelEntry
+
+    return [
+        ModelEntry(name="semantic.patients", path="a", kind="VIEW", fingerprint="f1"),
+        ModelEntry(name="features.x", path="b", kind="TABLE", fingerprint="f2"),
+        ModelEntry(name="marts.out", path="c", kind="TABLE", fingerprint="f3"),
+    ]
+
+
+def test_apply_models_resumes_from_first_incomplete_model(tmp_path: Path) -> None:
+    checkpoint_path = tmp_path / "cp.json"
+    adapter = _FakeAdapter(existing=set(), counts={"features.x": 5, "marts.out": 5})
+    failing = _FakeModelContext(adapter, fail_on="marts.out")
+    with pytest.raises(RuntimeError, match="failed marts.out"):
+        apply_pipeline.apply_models(
+            failing, _manifest_models(), environment=None, checkpoint_path=checkpoint_path
+        )
+    assert failing.applied == ["semantic.patients", "features.x"]
+
+    resumed = _FakeModelContext(adapter)
+    applied = apply_pipeline.apply_models(
+        resumed,
+        _manifest_models(),
+        environment=None,
+        checkpoint_path=checkpoint_path,
+        resume=True,
+    )
+    assert applied == ["marts.out"]
+
+
+def test_apply_models_reapplies_when_output_verification_fails(tmp_path: Path) -> None:
+    checkpoint_path = tmp_path / "cp.json"
+    adapter = _FakeAdapter(existing=set(), counts={"features.x": 5, "marts.out": 5})
+    apply_pipeline.apply_models(
+        _FakeModelContext(adapter), _manifest_models(), environment=None, checkpoint_path=checkpoint_path
+    )
+
+    adapter.counts["features.x"] = 3
+    resumed = _FakeModelContext(adapter)
+    applied = apply_pipeline.apply_models(
+        resumed,
+        _manifest_models(),
+        environment=None,
+        checkpoint_path=checkpoint_path,
+        resume=True,
+    )
+    assert applied == ["features.x", "marts.out"]
+
+
+def test_apply_models_without_resume_starts_over(tmp_path: Path) -> None:
+    checkpoint_path = tmp_path / "cp.json"
+    adapter = _FakeAdapter(existing=set(), counts={})
+    apply_pipeline.apply_models(
+        _FakeModelContext(adapter), _manifest_models(), environment=None, checkpoint_path=checkpoint_path
+    )
+    rerun = _FakeModelContext(adapter)
+    applied = apply_pipeline.apply_models(
+        rerun, _manifest_models(), environment=None, checkpoint_path=checkpoint_path
+    )
+    assert applied == ["semantic.patients", "features.x", "marts.out"]
+
+
+@pytest.mark.parametrize(
+    ("shared_max_age", "recorded_rows", "restated"),
+    [
+        (None, 5, ["features.x", "marts.out"]),
+        (3600, 5, []),
+        (3600, 4, ["features.x", "marts.out"]),
+        (0, 5, ["features.x", "marts.out"]),
+    ],
+)
+def test_apply_models_restates_shared_tables_unless_reusable(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, shared_max_age, recorded_rows: int, restated: list[str]
+) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    from spark_preprocessor.runtime.checkpoint import ModelEntry, load_checkpoint
+    from spark_preprocessor.runtime.shared_tables import SharedTableRecord
+
+    models = _manifest_models()
+    models[1] = ModelEntry(name="features.x", path="b", kind="TABLE", fingerprint="f2", shared=True)
+    adapter = _FakeAdapter(existing=set(_names()), counts={"features.x": 5, "marts.out": 5})
+    recorded_at = (datetime.now(UTC) - timedelta(minutes=1)).isoformat()
+    monkeypatch.setattr(
+        apply_pipeline,
+        "load_shared_record",
+        lambda adapter, model, environment: SharedTableRecord(row_count=recorded_rows, materialized_at=recorded_at),
+    )
+    monkeypatch.setattr(apply_pipeline, "record_shared_table", lambda *args: None)
+    context = _FakeModelContext(adapter)
+
+    applied = apply_pipeline.apply_models(
+        context, models, environment=None, checkpoint_path=tmp_path / "cp.json", shared_max_age=shared_max_age
+    )
+
+    assert context.restated == restated
+    assert applied == [name for name in _names() if name != "features.x" or restated]
+    completed = load_checkpoint(tmp_path / "cp.json", None).completed
+    assert completed["features.x"].shared_table == ("recomputed" if restated else "reused")
+    assert completed["marts.out"].shared_table is None
+
+
+def test_main_uses_model_manifest_when_present(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    project = tmp_path / "proj"
+    (project / "manifest").mkdir(parents=True)
+    (project / "manifest" / "models.json").write_text(
+        '{"models": [{"name": "semantic.patients", "path": "a", "kind": "VIEW", "fingerprint": "f1"}]}'
+    )
+    captured: dict[str, object] = {}
+
+    class FakeContext:
+        def __init__(self, *, paths: Path):
+            self.paths = paths
+
+    def fake_apply_models(context, models, *, environment, checkpoint_path, resume, shared_max_age):
+        captured.update(
+            models=[m.name for m in models],
+            checkpoint_path=checkpoint_path,
+            resume=resume,
+            shared_max_age=shared_max_age,
+        )
+        return []
+
+    monkeypatch.setattr(
+        apply_pipeline,
+        "load_pipeline_document",
+        lambda _path: SimpleNamespace(
+            pipeline=SimpleNamespace(name="p", version="v", output=SimpleNamespace(table="t"))
+        ),
+    )
+    monkeypatch.setattr(apply_pipeline, "apply_models", fake_apply_models)
+
+    import sys
+    import types
+
+    fake_sqlmesh = types.SimpleNamespace(
+        core=types.SimpleNamespace(context=types.SimpleNamespace(Context=FakeContext))
+    )
+    monkeypatch.setitem(sys.modules, "sqlmesh", fake_sqlmesh)
+    monkeypatch.setitem(sys.modules, "sqlmesh.core", fake_sqlmesh.core)
+    monkeypatch.setitem(sys.modules, "sqlmesh.core.context", fake_sqlmesh.core.context)
+
+    apply_pipeline.main(["--pipeline", "p.yaml", "--project", str(project), "--resume", "--shared-max-age", "3600"])
+
+    assert captured == {
+        "models": ["semantic.patients"],
+        "checkpoint_path": project / ".checkpoints" / "prod.json",
+        "resume": True,
+        "shared_max_age": 3600.0,
+    }
+
+
+def test_main_preflight_fails_before_planning(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from spark_preprocessor.schema import MappingSpec
+
+    class FakeAdapter:
+        dialect = "duckdb"
+
+        def fetchall(self, sql: str):
+            assert "information_schema.columns" in sql
+            return [("db", "main", "patients_raw", "other_col", "VARCHAR")]
+
+    class FakeContext:
+        def __init__(self, *, paths: Path):
+            self.engine_adapter = FakeAdapter()
+
+        def plan(self, **_kwargs):
+            raise AssertionError("plan must not run after a failed preflight")
+
+    mapping = MappingSpec.model_validate(
+        {"entities": {"patients": {"table": "patients_raw", "columns": {"person_id": "member_id"}}}}
+    )
+    monkeypatch.setattr(
+        apply_pipeline,
+        "load_pipeline_document",
+        lambda _path: SimpleNamespace(
+            mapping=mapping,
+            pipeline=SimpleNamespace(name="p", version="v", output=SimpleNamespace(table="t")),
+        ),
+    )
+
+    import sys
+    import types
+
+    fake_sqlmesh = types.SimpleNamespace(
+        core=types.SimpleNamespace(context=types.SimpleNamespace(Context=FakeContext))
+    )
+    monkeypatch.setitem(sys.modules, "sqlmesh", fake_sqlmesh)
+    monkeypatch.setitem(sys.modules, "sqlmesh.core", fake_sqlmesh.core)
+    monkeypatch.setitem(sys.modules, "sqlmesh.core.context", fake_sqlmesh.core.context)
+
+    with pytest.raises(SystemExit) as excinfo:
+        apply_pipeline.main(
+            ["--pipeline", "p.yaml", "--project", str(tmp_path / "proj"), "--preflight"]
+        )
+    assert excinfo.value.code == 1
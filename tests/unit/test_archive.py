@@ -0,0 +1,85 @@
+import json
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from spark_preprocessor.archive import open_project, read_archive, write_archive
+from spark_preprocessor.errors import ConfigurationError, ValidationError
+
+
+def _project(files: dict[str, str]) -> SimpleNamespace:
+    report = SimpleNamespace(
+        pipeline_name="p",
+        pipeline_version="v1",
+        compiled_at="2024-01-01T00:00:00+00:00",
+    )
+    return SimpleNamespace(report=report, files=files)
+
+
+def _rewrite(archive: Path, changes: dict[str, bytes]) -> None:
+    with zipfile.ZipFile(archive) as source:
+        contents = {name: source.read(name) for name in source.namelist()}
+    contents.update(changes)
+    with zipfile.ZipFile(archive, "w") as target:
+        for name, content in contents.items():
+            target.writestr(name, content)
+
+
+def test_archive_round_trip_is_deterministic(tmp_path: Path) -> None:
+    files = {"models/marts/m.sql": "SELECT 1", "sqlmesh.yaml": "gateways: {}\n"}
+    first = write_archive(_project(files), tmp_path / "a" / "project.zip")
+    second = write_archive(_project(files), tmp_path / "b" / "project.zip")
+
+    assert first.read_bytes() == second.read_bytes()
+    assert list(first.parent.iterdir()) == [first]
+    contents = read_archive(first)
+    assert contents["models/marts/m.sql"] == b"SELECT 1"
+    assert json.loads(contents["manifest/archive.json"])["pipeline_version"] == "v1"
+    assert set(json.loads(contents["manifest/files.json"])["files"]) == set(files)
+
+
+def test_open_project_extracts_archives_and_passes_directories_through(
+    tmp_path: Path,
+) -> None:
+    archive = write_archive(
+        _project({"models/m.sql": "SELECT 1"}), tmp_path / "project.zip"
+    )
+    with open_project(archive) as project_dir:
+        assert (project_dir / "models" / "m.sql").read_text() == "SELECT 1"
+    assert not project_dir.exists()
+
+    with open_project(tmp_path) as project_dir:
+        assert project_dir == tmp_path
+
+
+@pytest.mark.parametrize(
+    ("changes", "error", "match"),
+    [
+        ({"models/m.sql": b"SELECT 2"}, ValidationError, "corrupt models/m.sql"),
+        ({"models/extra.sql": b"SELECT 3"}, ValidationError, "unlisted files"),
+        (
+            {"manifest/archive.json": b'{"format_version": 99}'},
+            ConfigurationError,
+            "Unsupported project archive",
+        ),
+        ({"manifest/files.json": b"{}"}, ConfigurationError, "Not a project archive"),
+    ],
+)
+def test_read_archive_rejects_tampered_archives(
+    tmp_path: Path, changes: dict, error: type, match: str
+) -> None:
+    archive = write_archive(
+        _project({"models/m.sql": "SELECT 1"}), tmp_path / "project.zip"
+    )
+    _rewrite(archive, changes)
+    with pytest.raises(error, match=match):
+        read_archive(archive)
+
+
+def test_read_archive_rejects_non_zip(tmp_path: Path) -> None:
+    path = tmp_path / "project.zip"
+    path.write_text("not a zip")
+    with pytest.raises(ConfigurationError, match="Cannot read project archive"):
+        read_archive(path)
@@ -0,0 +1,167 @@
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from spark_preprocessor import benchmark
+from spark_preprocessor.benchmark import (
+    DEFAULT_TOLERANCE,
+    BenchmarkResult,
+    ModelTiming,
+    _PeakRssSampler,
+    check_regressions,
+    compare_to_baselines,
+    load_suite,
+    record_baselines,
+)
+from spark_preprocessor.errors import ConfigurationError, ValidationError
+from spark_preprocessor.synthetic import DEFAULT_PROFILES, FORMAT_VERSION
+
+
+def _result(seconds: float, rows: int | None, peak: float = 100.0) -> BenchmarkResult:
+    return BenchmarkResult(
+        pipeline="p",
+        persons=1000,
+        seconds=seconds,
+        models=[
+            ModelTiming(
+                model="marts.p",
+                seconds=seconds,
+                rows=rows,
+                rows_per_second=None,
+                peak_rss_mb=peak,
+            )
+        ],
+    )
+
+
+BASELINES = {
+    "p": {"1000": {"marts.p": {"seconds": 10.0, "rows": 1000, "peak_rss_mb": 100.0}}}
+}
+
+
+@pytest.mark.parametrize(
+    ("result", "metrics"),
+    [
+        (_result(12.0, 1000), []),
+        (_result(10.4, 1000), []),
+        (_result(16.0, 1000), ["seconds"]),
+        (_result(10.0, 1500), ["rows"]),
+        (_result(10.0, 1000, peak=200.0), ["peak_rss_mb"]),
+    ],
+)
+def test_compare_to_baselines_flags_regressions(
+    result: BenchmarkResult, metrics: list[str]
+) -> None:
+    regressions = compare_to_baselines([result], BASELINES, DEFAULT_TOLERANCE)
+    assert [regression.metric for regression in regressions] == metrics
+
+
+def test_compare_to_baselines_ignores_fast_models_and_missing_baselines() -> None:
+    fast = {
+        "p": {"1000": {"marts.p": {"seconds": 0.2, "rows": 1000, "peak_rss_mb": 100.0}}}
+    }
+    assert compare_to_baselines([_result(0.9, 1000)], fast, DEFAULT_TOLERANCE) == []
+    assert compare_to_baselines([_result(99.0, 5)], {}, DEFAULT_TOLERANCE) == []
+
+
+def test_compare_to_baselines_requires_baselines_at_required_scales() -> None:
+    regressions = compare_to_baselines(
+        [_result(3.0, 42)], {}, DEFAULT_TOLERANCE, required_scales=[1000]
+    )
+    assert [regression.metric for regression in regressions] == ["baseline"]
+    assert regressions[0].render() == "p@1000 marts.p: no baseline"
+    assert (
+        compare_to_baselines(
+            [_result(3.0, 42)], {}, DEFAULT_TOLERANCE, required_scales=[10]
+        )
+        == []
+    )
+
+
+def test_ensure_data_regenerates_stale_datasets(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    generated: list[dict] = []
+
+    def fake_generate(out_dir: Path, **kwargs: object) -> None:
+        generated.append(kwargs)
+        summary = {
+            "persons": kwargs["persons"],
+            "seed": kwargs["seed"],
+            "chunk_size": kwargs["chunk_size"],
+            "format_version": FORMAT_VERSION,
+            "profiles": {
+                entity: asdict(profile) for entity, profile in DEFAULT_PROFILES.items()
+            },
+        }
+        out_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / "synthetic.json").write_text(json.dumps(summary))
+
+    monkeypatch.setattr(benchmark, "generate_dataset", fake_generate)
+    data_dir = tmp_path / "data"
+    benchmark._ensure_data(data_dir, 100, 42)
+    benchmark._ensure_data(data_dir, 100, 42)
+    assert len(generated) == 1
+
+    summary_path = data_dir / "synthetic.json"
+    for key, value in (("format_version", FORMAT_VERSION - 1), ("chunk_size", 7)):
+        summary = json.loads(summary_path.read_text())
+        summary[key] = value
+        summary_path.write_text(json.dumps(summary))
+        benchmark._ensure_data(data_dir, 100, 42)
+    summary = json.loads(summary_path.read_text())
+    summary["profiles"]["encounters"]["mean"] = 1.0
+    summary_path.write_text(json.dumps(summary))
+    benchmark._ensure_data(data_dir, 100, 42)
+    assert len(generated) == 4
+
+
+def test_record_baselines_round_trips_with_compare() -> None:
+    result = _result(3.0, 42)
+    baselines = record_baselines([result], {"other": {"1": {}}})
+    assert set(baselines) == {"other", "p"}
+    assert baselines["p"]["1000"]["marts.p"] == {
+        "seconds": 3.0,
+        "rows": 42,
+        "peak_rss_mb": 100.0,
+    }
+    assert compare_to_baselines([result], baselines, DEFAULT_TOLERANCE) == []
+
+
+def test_check_regressions_raises_with_details() -> None:
+    check_regressions([])
+    regressions = compare_to_baselines(
+        [_result(10.0, 1500)], BASELINES, DEFAULT_TOLERANCE
+    )
+    with pytest.raises(
+        ValidationError, match="p@1000 marts.p rows: baseline 1000, observed 1500"
+    ):
+        check_regressions(regressions)
+
+
+def test_load_suite_resolves_paths_relative_to_suite(tmp_path: Path) -> None:
+    suite_path = tmp_path / "suite.yaml"
+    suite_path.write_text(
+        "pipelines: [pipelines/a.yaml]\nscales: [10]\nbaselines: baselines.json\n"
+        "tolerance:\n  seconds: 0.1\n"
+    )
+    suite = load_suite(suite_path)
+    assert suite.pipelines == [tmp_path / "pipelines" / "a.yaml"]
+    assert suite.baselines == tmp_path / "baselines.json"
+    assert suite.features is None
+    assert suite.tolerance["seconds"] == 0.1
+    assert suite.tolerance["peak_rss_mb"] == DEFAULT_TOLERANCE["peak_rss_mb"]
+
+    suite_path.write_text("scales: [10]\n")
+    with pytest.raises(ConfigurationError, match="Invalid benchmark suite"):
+        load_suite(suite_path)
+
+
+def test_peak_rss_sampler_reports_process_memory() -> None:
+    with _PeakRssSampler(interval=0.01) as sampler:
+        payload = bytearray(32 * 2**20)
+        peak = sampler.take_peak()
+    del payload
+    assert peak > 32 * 2**20
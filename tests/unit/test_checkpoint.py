@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from spark_preprocessor.errors import ConfigurationError
+from spark_preprocessor.runtime.checkpoint import (
+    Checkpoint,
+    ModelEntry,
+    default_checkpoint_path,
+    environment_table,
+    load_checkpoint,
+    load_model_manifest,
+    resume_index,
+    save_checkpoint,
+)
+
+
+def _models() -> list[ModelEntry]:
+    return [
+        ModelEntry(
+            name="semantic.patients", path="a.sql", kind="VIEW", fingerprint="f1"
+        ),
+        ModelEntry(name="features.x", path="b.sql", kind="TABLE", fingerprint="f2"),
+        ModelEntry(name="marts.out", path="c.sql", kind="TABLE", fingerprint="f3"),
+    ]
+
+
+def test_load_model_manifest_returns_none_when_missing(tmp_path: Path) -> None:
+    assert load_model_manifest(tmp_path) is None
+
+
+def test_load_model_manifest_parses_entries(tmp_path: Path) -> None:
+    (tmp_path / "manifest").mkdir()
+    (tmp_path / "manifest" / "models.json").write_text(
+        json.dumps(
+            {"models": [{"name": "a", "path": "p", "kind": "VIEW", "fingerprint": "f"}]}
+        )
+    )
+    assert load_model_manifest(tmp_path) == [
+        ModelEntry(name="a", path="p", kind="VIEW", fingerprint="f")
+    ]
+
+
+def test_load_model_manifest_rejects_malformed_file(tmp_path: Path) -> None:
+    (tmp_path / "manifest").mkdir()
+    (tmp_path / "manifest" / "models.json").write_text("{}")
+    with pytest.raises(ConfigurationError):
+        load_model_manifest(tmp_path)
+
+
+def test_checkpoint_round_trip(tmp_path: Path) -> None:
+    path = default_checkpoint_path(tmp_path, "dev")
+    checkpoint = Checkpoint(environment="dev")
+    checkpoint.record(_models()[1], row_count=10)
+    save_checkpoint(path, checkpoint)
+
+    loaded = load_checkpoint(path, "dev")
+    assert loaded.completed["features.x"].fingerprint == "f2"
+    assert loaded.completed["features.x"].row_count == 10
+
+
+def test_default_checkpoint_path_for_archive_is_beside_it(tmp_path: Path) -> None:
+    archive = tmp_path / "client_x-v1.zip"
+    archive.write_bytes(b"")
+    assert (
+        default_checkpoint_path(archive, None)
+        == tmp_path / ".checkpoints" / "client_x-v1" / "prod.json"
+    )
+    assert (
+        default_checkpoint_path(tmp_path, "dev")
+        == tmp_path / ".checkpoints" / "dev.json"
+    )
+
+
+def test_load_checkpoint_ignores_other_environment(tmp_path: Path) -> None:
+    path = tmp_path / "cp.json"
+    checkpoint = Checkpoint(environment="dev")
+    checkpoint.record(_models()[0])
+    save_checkpoint(path, checkpoint)
+    assert load_checkpoint(path, None).completed == {}
+
+
+def test_load_checkpoint_rejects_malformed_file(tmp_path: Path) -> None:
+    path = tmp_path / "cp.json"
+    path.write_text("not json")
+    with pytest.raises(ConfigurationError):
+        load_checkpoint(path, None)
+
+
+def test_resume_index_stops_at_first_changed_fingerprint() -> None:
+    models = _models()
+    checkpoint = Checkpoint(environment=None)
+    for model in models:
+        checkpoint.record(model)
+    changed = [models[0], ModelEntry("features.x", "b.sql", "TABLE", "new"), models[2]]
+    assert resume_index(changed, checkpoint, lambda _m, _r: True) == 1
+    assert resume_index(models, checkpoint, lambda _m, _r: True) == 3
+
+
+def test_resume_index_requires_verified_outputs() -> None:
+    models = _models()
+    checkpoint = Checkpoint(environment=None)
+    for model in models:
+        checkpoint.record(model)
+    assert resume_index(models, checkpoint, lambda m, _r: m.name != "marts.out") == 2
+
+
+@pytest.mark.parametrize(
+    "name,environment,expected",
+    [
+        ("semantic.patients", None, "semantic.patients"),
+        ("semantic.patients", "prod", "semantic.patients"),
+        ("semantic.patients", "dev", "semantic__dev.patients"),
+        ("cat.schema.t", "dev", "cat.schema__dev.t"),
+        ("t", "dev", "t"),
+    ],
+)
+def test_environment_table(name: str, environment: str | None, expected: str) -> None:
+    assert environment_table(name, environment) == expected
@@ -3,8 +3,11 @@ from pathlib import Path
 from types import SimpleNamespace
 
 import pytest
+import sqlglot
+import yaml
 
 import spark_preprocessor.cli as cli
+from spark_preprocessor import compiler, scaffold, schema
 from spark_preprocessor.errors import ConfigurationError
 
 
@@ -31,7 +34,7 @@ def test_main_dispatches_subcommands(tmp_path: Path, argv: list[str], expectatio
     """CLI dispatch calls the correct handler without doing real work."""
     called = {"compile": 0, "scaffold": 0, "parse": 0}
 
-    def fake_compile_pipeline(pipeline: Path, out: Path):
+    def fake_compile_pipeline(pipeline: Path, out: Path, **_kwargs):
         called["compile"] += 1
         out.mkdir(parents=True, exist_ok=True)
         report = SimpleNamespace(
@@ -39,11 +42,13 @@ def test_main_dispatches_subcommands(tmp_path: Path, argv: list[str], expectatio
             pipeline_version="v",
             output_table="t",
         )
-        # For `test` command, main reads rendered SQL.
-        (out / "rendered").mkdir(parents=True, exist_ok=True)
-        (out / "rendered" / "enriched__p.sql").write_text("SELECT 1 AS x")
         return report
 
+    def fake_compile_document(document, **_kwargs):
+        called["compile"] += 1
+        # The `test` command validates the rendered SQL in memory.
+        return SimpleNamespace(report=SimpleNamespace(pipeline_name="p"), rendered_sql="SELECT 1 AS x")
+
     def fake_scaffold_pipeline(mapping: Path, out: Path) -> Path:
         called["scaffold"] += 1
         out.mkdir(parents=True, exist_ok=True)
@@ -59,9 +64,12 @@ def test_main_dispatches_subcommands(tmp_path: Path, argv: list[str], expectatio
     # Avoid logging config affecting global state.
     monkeypatch = pytest.MonkeyPatch()
     monkeypatch.setattr(cli, "_configure_logging", lambda: None)
-    monkeypatch.setattr(cli, "compile_pipeline", fake_compile_pipeline)
-    monkeypatch.setattr(cli, "scaffold_pipeline", fake_scaffold_pipeline)
-    monkeypatch.setattr(cli, "parse_one", fake_parse_one)
+    monkeypatch.setattr(compiler, "compile_pipeline", fake_compile_pipeline)
+    monkeypatch.setattr(compiler, "compile_document", fake_compile_document)
+    monkeypatch.setattr(compiler, "write_project", lambda project, out: None)
+    monkeypatch.setattr(schema, "load_pipeline_document", lambda path: None)
+    monkeypatch.setattr(scaffold, "scaffold_pipeline", fake_scaffold_pipeline)
+    monkeypatch.setattr(sqlglot, "parse_one", fake_parse_one)
 
     try:
         # Normalize paths so the fake compiler writes somewhere real.
@@ -103,7 +111,7 @@ def test_main_exits_nonzero_on_domain_error() -> None:
     def boom(*_args, **_kwargs):
         raise ConfigurationError("nope")
 
-    monkeypatch.setattr(cli, "compile_pipeline", boom)
+    monkeypatch.setattr(compiler, "compile_pipeline", boom)
     try:
         with pytest.raises(SystemExit) as excinfo:
             cli.main(["compile", "--pipeline", "p.yaml", "--out", "out"])
@@ -111,3 +119,259 @@ def test_main_exits_nonzero_on_domain_error() -> None:
     finally:
         monkeypatch.undo()
 
+
+
+def _preflight_pipeline(tmp_path: Path, physical: str) -> Path:
+    import yaml
+
+    path = tmp_path / "pipeline.yaml"
+    path.write_text(
+        yaml.safe_dump(
+            {
+                "mapping": {
+                    "entities": {
+                        "patients": {"table": "patients_raw", "columns": {"person_id": physical}}
+                    }
+                },
+                "pipeline": {
+                    "name": "p",
+                    "version": "v",
+                    "spine": {"entity": "patients", "key": "person_id", "columns": ["person_id"]},
+                    "output": {"table": "t"},
+                },
+            }
+        )
+    )
+    return path
+
+
+def test_preflight_command_checks_duckdb_catalog(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import duckdb
+
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    db_path = tmp_path / "catalog.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute("CREATE TABLE patients_raw (member_id VARCHAR)")
+    conn.close()
+
+    good = _preflight_pipeline(tmp_path, "member_id")
+    snapshot_path = tmp_path / "snapshot" / "schema.yaml"
+    cli.main(
+        [
+            "preflight",
+            "--pipeline",
+            str(good),
+            "--duckdb",
+            str(db_path),
+            "--snapshot-out",
+            str(snapshot_path),
+        ]
+    )
+    assert yaml.safe_load(snapshot_path.read_text()) == {
+        "patients_raw": {"member_id": "VARCHAR"}
+    }
+
+    bad = _preflight_pipeline(tmp_path, "renamed_id")
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(["preflight", "--pipeline", str(bad), "--duckdb", str(db_path)])
+    assert excinfo.value.code == 1
+
+
+def test_preflight_command_requires_existing_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    pipeline = _preflight_pipeline(tmp_path, "member_id")
+    with pytest.raises(SystemExit):
+        cli.main(["preflight", "--pipeline", str(pipeline), "--duckdb", str(tmp_path / "nope.db")])
+
+
+def test_run_command_binds_sources_and_runs_locally(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from spark_preprocessor.runtime import local
+
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    source = tmp_path / "patients.csv"
+    source.write_text("member_id\np1\n")
+    captured: dict[str, object] = {}
+
+    def fake_run_local(pipeline, out, sources, **kwargs):
+        captured.update(pipeline=pipeline, sources=sources, **kwargs)
+        return local.LocalRunResult(
+            pipeline_name="p",
+            output_table="t",
+            database=kwargs["database"],
+            applied_models=["t"],
+            gateway=local.DuckDBGatewayConfig(database=str(kwargs["database"])),
+        )
+
+    monkeypatch.setattr(local, "run_local", fake_run_local)
+    cli.main(
+        [
+            "run",
+            "--pipeline",
+            "p.yaml",
+            "--out",
+            str(tmp_path / "out"),
+            "--source",
+            f"patients_raw={source}",
+            "--memory-limit",
+            "2GB",
+            "--threads",
+            "4",
+        ]
+    )
+
+    assert captured["sources"] == [local.LocalSource("patients_raw", source.resolve(), "csv")]
+    assert captured["memory_limit"] == "2GB"
+    assert captured["threads"] == 4
+
+
+def test_generate_command_writes_synthetic_data(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    cli.main(["generate", "--out", str(tmp_path), "--persons", "10", "--seed", "1", "--entity", "patients"])
+    assert (tmp_path / "patients" / "chunk=0").is_dir()
+    assert not (tmp_path / "encounters").exists()
+
+
+def test_bench_command_fails_on_regressions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from spark_preprocessor import benchmark
+
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    regression = benchmark.Regression("p", 10, "marts.p", "rows", 10, 20)
+    outcomes = iter([([], []), ([], [regression])])
+    monkeypatch.setattr(benchmark, "run_suite", lambda *args, **kwargs: next(outcomes))
+
+    argv = ["bench", "--suite", "suite.yaml", "--work-dir", str(tmp_path), "--scale", "10"]
+    cli.main(argv)
+    with pytest.raises(SystemExit):
+        cli.main(argv)
+
+
+def test_plan_diff_command_fails_on_structural_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import json
+
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    summary = {"shape": "SEQ_SCAN", "join_count": 0, "cross_products": 0, "joins": []}
+    for name, shape in (("before", "SEQ_SCAN"), ("same", "SEQ_SCAN"), ("after", "FILTER(SEQ_SCAN)")):
+        (tmp_path / name / "manifest").mkdir(parents=True)
+        payload = {"models": {"m": summary | {"shape": shape}}}
+        (tmp_path / name / "manifest" / "plans.json").write_text(json.dumps(payload))
+
+    cli.main(["plan-diff", "--before", str(tmp_path / "before"), "--after", str(tmp_path / "same")])
+    with pytest.raises(SystemExit):
+        cli.main(["plan-diff", "--before", str(tmp_path / "before"), "--after", str(tmp_path / "after")])
+
+
+def test_compile_command_captures_plans_with_sample_sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    sample = tmp_path / "patients.csv"
+    sample.write_text("person_id\np1\n")
+    captured: dict[str, object] = {}
+
+    def fake_compile_pipeline(pipeline: Path, out: Path, **kwargs):
+        captured.update(kwargs)
+        return SimpleNamespace(pipeline_name="p", pipeline_version="v", output_table="t")
+
+    monkeypatch.setattr(compiler, "compile_pipeline", fake_compile_pipeline)
+    cli.main(["compile", "--pipeline", "p.yaml", "--out", "out", "--plan-source", f"raw.patients={sample}"])
+
+    assert captured["capture_plans"] is True
+    assert [source.table for source in captured["plan_sources"]] == ["raw.patients"]
+
+
+def test_lineage_command_lists_affected_outputs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import json
+
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    logged: list[dict] = []
+    monkeypatch.setattr(
+        cli, "_logger", lambda: SimpleNamespace(info=lambda event, **kw: logged.append(kw), error=lambda event, **kw: None)
+    )
+    (tmp_path / "manifest").mkdir()
+    lineage = {"output_table": "marts.m", "index": {"cat.raw.patients.dob": ["age", "age_bucket"]}}
+    (tmp_path / "manifest" / "lineage.json").write_text(json.dumps(lineage))
+
+    cli.main(["lineage", "--project", str(tmp_path), "--column", "patients.dob"])
+    assert logged[-1]["outputs"] == ["age", "age_bucket"]
+
+    with pytest.raises(SystemExit):
+        cli.main(["lineage", "--project", str(tmp_path / "missing"), "--column", "patients.dob"])
+
+
+def test_features_search_command_filters_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    logged: list[dict] = []
+    monkeypatch.setattr(cli, "_logger", lambda: SimpleNamespace(info=lambda event, **kw: logged.append(kw)))
+
+    cli.main(["features", "search", "--provides", "age"])
+    assert logged[-1] == {"count": 1, "features": {"age": ["age"]}}
+
+    cli.main(["features", "search", "--grain", "PERSON"])
+    assert {"age", "age_bucket"} <= set(logged[-1]["features"])
+
+
+def test_compile_command_watch_and_feature_modules(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from spark_preprocessor import watch
+
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    watched: dict[str, object] = {}
+    compiled: dict[str, object] = {}
+    monkeypatch.setattr(watch, "watch_compile", lambda pipeline, out, **kwargs: watched.update(kwargs))
+    monkeypatch.setattr(
+        compiler,
+        "compile_pipeline",
+        lambda pipeline, out, **kwargs: compiled.update(kwargs)
+        or SimpleNamespace(pipeline_name="p", pipeline_version="v", output_table="t"),
+    )
+    module = tmp_path / "local.py"
+    module.write_text("")
+
+    cli.main(["compile", "--pipeline", "p.yaml", "--out", "out", "--watch", "--features-module", str(module)])
+    assert watched["feature_modules"] == [module]
+    assert compiled == {}
+
+    cli.main(["compile", "--pipeline", "p.yaml", "--out", "out", "--features-module", str(module)])
+    assert compiled["registry"] is not None
+    assert compiled["lineage"] is False
+
+    cli.main(["compile", "--pipeline", "p.yaml", "--out", "out", "--lineage"])
+    assert compiled["lineage"] is True
+
+    with pytest.raises(SystemExit):
+        cli.main(["compile", "--pipeline", "p.yaml", "--out", "out", "--watch", "--capture-plans"])
+    with pytest.raises(SystemExit):
+        cli.main(["compile", "--pipeline", "p.yaml", "--out", "out", "--watch", "--lineage"])
+
+
+def test_compile_command_writes_archive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from spark_preprocessor.archive import read_archive
+
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    pipeline = _preflight_pipeline(tmp_path, "member_id")
+    archive = tmp_path / "dist" / "p.zip"
+
+    cli.main(["compile", "--pipeline", str(pipeline), "--out", str(archive), "--archive"])
+    assert "models/marts/enriched__p.sql" in read_archive(archive)
+
+    with pytest.raises(SystemExit):
+        cli.main(["compile", "--pipeline", str(pipeline), "--out", str(archive), "--archive", "--watch"])
+
+
+def test_compile_project_command_passes_every_pipeline(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cli, "_configure_logging", lambda: None)
+    logged: list[dict] = []
+    monkeypatch.setattr(cli, "_logger", lambda: SimpleNamespace(info=lambda event, **kw: logged.append(kw)))
+    captured: dict[str, object] = {}
+
+    def fake_compile_project(pipelines, out, **kwargs):
+        captured.update(pipelines=pipelines, out=out, **kwargs)
+        return SimpleNamespace(
+            pipelines=[SimpleNamespace(pipeline_name="a"), SimpleNamespace(pipeline_name="b")],
+            shared_models={"semantic.patients": ["a", "b"]},
+        )
+
+    monkeypatch.setattr(compiler, "compile_project", fake_compile_project)
+    cli.main(["compile-project", "--pipeline", "a.yaml", "--pipeline", "b.yaml", "--out", "out"])
+
+    assert captured["pipelines"] == [Path("a.yaml"), Path("b.yaml")]
+    assert captured["registry"] is None
+    assert captured["lineage"] is False
+    assert logged[-1] == {"pipelines": ["a", "b"], "shared_models": ["semantic.patients"]}
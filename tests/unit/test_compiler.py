@@ -1,24 +1,33 @@
 from contextlib import nullcontext as does_not_raise
+import hashlib
+import json
+from types import SimpleNamespace
 
 import pytest
 
 from spark_preprocessor.compiler import (
     BuiltFeature,
+    CompiledProject,
+    ProjectChanges,
     SelectExpression,
+    _build_external_models,
     _build_features,
     _build_semantic_models,
+    _check_join_key_types,
     _check_param_type,
-    _ensure_layout,
+    _join_grains,
     _render_semantic_sql,
     _validate_params,
     _validate_pipeline,
-    _write_sqlmesh_project,
-    _wipe_out_dir,
+    _sqlmesh_project_files,
+    _with_audits,
     _apply_reference_renames,
     _expression_references,
     _parse_select_expressions,
     _resolve_select_expressions,
     _split_derived_expressions,
+    _unresolved_columns,
+    write_project,
 )
 from spark_preprocessor.errors import ConfigurationError, ValidationError
 from spark_preprocessor.features.base import (
@@ -52,6 +61,17 @@ def test_parse_select_expressions_parses_alias() -> None:
     assert parsed == [SelectExpression(expression="1", alias="foo", source_feature="f")]
 
 
+def test_unresolved_columns_ignores_known_and_qualified_columns() -> None:
+    exprs = [SelectExpression(expression="p.a + b + c + out", alias="out", source_feature="f")]
+    assert _unresolved_columns("f", exprs, {"b"}) == {"c"}
+
+
+def test_unresolved_columns_rejects_invalid_sql() -> None:
+    exprs = [SelectExpression(expression="b +* (", alias="out", source_feature="f")]
+    with pytest.raises(ValidationError, match="Feature 'f' has an invalid select expression"):
+        _unresolved_columns("f", exprs, set())
+
+
 def test_expression_references_uses_word_boundaries() -> None:
     refs = _expression_references("foo + foobar + bar", {"foo", "bar"})
     assert refs == {"foo", "bar"}
@@ -588,8 +608,9 @@ def test_build_features_fails_on_missing_dependency_with_fail_policy() -> None:
             "features": [{"key": "unit.needs_x_fail"}],
         }
     )
-    with pytest.raises(ValidationError, match="missing dependent feature outputs"):
+    with pytest.raises(ValidationError, match="missing dependent feature outputs") as excinfo:
         _build_features(doc, ctx)
+    assert "'x': ['unit.provides_x_fail']" in str(excinfo.value)
 
 
 def test_build_features_rejects_select_alias_mismatch() -> None:
@@ -672,19 +693,42 @@ def test_build_semantic_models_includes_reference_models() -> None:
     assert "semantic.reference__icd10" in names
 
 
-def test_wipe_out_dir_removes_existing_contents(tmp_path) -> None:
+def test_write_project_syncs_only_changed_files(tmp_path) -> None:
     out_dir = tmp_path / "out"
-    out_dir.mkdir()
-    (out_dir / "stale.txt").write_text("x")
-    _wipe_out_dir(out_dir)
-    assert out_dir.exists()
-    assert not (out_dir / "stale.txt").exists()
+    report = SimpleNamespace(pipeline_name="p")
+    write_project(
+        CompiledProject(
+            report=report,
+            files={"models/a.sql": "SELECT 1", "models/b.sql": "SELECT 2", "models/old/gone.sql": "SELECT 3"},
+        ),
+        out_dir,
+    )
+    (out_dir / ".cache").mkdir()
+    (out_dir / ".cache" / "entry").write_text("kept")
+    unchanged_mtime = (out_dir / "models" / "a.sql").stat().st_mtime_ns
 
+    files = {"models/a.sql": "SELECT 1", "models/b.sql": "SELECT 22", "rendered/c.sql": "SELECT 4"}
+    changes = write_project(CompiledProject(report=report, files=files), out_dir)
 
-def test_write_sqlmesh_project_writes_feature_models_and_tests(tmp_path) -> None:
-    out_dir = tmp_path / "out"
-    _ensure_layout(out_dir)
+    assert changes == ProjectChanges(
+        added=["rendered/c.sql"],
+        changed=["manifest/files.json", "models/b.sql"],
+        removed=["models/old/gone.sql"],
+    )
+    assert (out_dir / "models" / "a.sql").stat().st_mtime_ns == unchanged_mtime
+    assert (out_dir / "models" / "b.sql").read_text() == "SELECT 22"
+    assert not (out_dir / "models" / "old").exists()
+    assert (out_dir / "tests").is_dir()
+    assert (out_dir / ".cache" / "entry").read_text() == "kept"
+    assert not list(out_dir.glob(".staging-*"))
+    manifest = json.loads((out_dir / "manifest" / "files.json").read_text())["files"]
+    assert set(manifest) == set(files)
+    assert manifest["models/b.sql"] == {"sha256": hashlib.sha256(b"SELECT 22").hexdigest(), "size": 9}
 
+    assert write_project(CompiledProject(report=report, files=files), out_dir) == ProjectChanges()
+
+
+def test_sqlmesh_project_files_include_feature_models_and_tests() -> None:
     semantic_models = [
         SqlmeshModelSpec(name="semantic.patients", sql="SELECT 1 AS person_id", kind="VIEW", tags=[])
     ]
@@ -721,17 +765,250 @@ def test_write_sqlmesh_project_writes_feature_models_and_tests(tmp_path) -> None
         select_expressions=[],
     )
 
-    _write_sqlmesh_project(
-        out_dir=out_dir,
+    files = _sqlmesh_project_files(
         semantic_models=semantic_models,
         features=[feature],
         final_model=final_model,
         pipeline_name="p",
     )
 
-    assert (out_dir / "models" / "semantic" / "patients.sql").exists()
-    assert (
-        out_dir / "models" / "features" / "unit.feature_assets" / "feature__some_model.sql"
-    ).exists()
-    assert (out_dir / "models" / "marts" / "enriched__p.sql").exists()
-    assert (out_dir / "tests" / "unit_feature_test.yaml").read_text() == "test: ok\n"
+    assert "models/semantic/patients.sql" in files
+    assert "models/features/unit.feature_assets/feature__some_model.sql" in files
+    assert "models/marts/enriched__p.sql" in files
+    assert "audits/assert_row_count_matches_spine.sql" in files
+    assert files["tests/unit_feature_test.yaml"] == "test: ok\n"
+
+
+def test_validate_pipeline_rejects_types_for_unmapped_columns() -> None:
+    document = PipelineDocument.model_validate(
+        {
+            "mapping": {
+                "entities": {
+                    "patients": {
+                        "table": "t",
+                        "columns": {"person_id": "x"},
+                        "types": {"date_of_birth": "DATE"},
+                    }
+                }
+            },
+            "pipeline": {
+                "name": "p",
+                "version": "v",
+                "spine": {"entity": "patients", "key": "person_id", "columns": ["person_id"]},
+                "output": {"table": "t"},
+            },
+        }
+    )
+    with pytest.raises(ConfigurationError, match="types reference unmapped columns"):
+        _validate_pipeline(document, default_semantic_contract())
+
+
+def test_build_external_models_resolves_types_by_precedence() -> None:
+    mapping = MappingSpec.model_validate(
+        {
+            "entities": {
+                "patients": {
+                    "table": "raw.patients",
+                    "columns": {"person_id": "member_id", "date_of_birth": "dob", "zip": "zip"},
+                    "types": {"date_of_birth": "DATE", "zip": "STRING"},
+                },
+                "encounters": {"table": "raw.encounters", "columns": {"person_id": "pid", "note": "note"}},
+                "diagnoses": {"table": "diagnoses_raw", "columns": {"person_id": "pid"}},
+            }
+        }
+    )
+    contract = default_semantic_contract()
+    contract.recommended_types["patients"] = {"person_id": "STRING"}
+    snapshot = {"raw.patients": {"zip": "INT"}}
+
+    typed, untyped = _build_external_models(mapping, contract, snapshot)
+
+    assert typed == [
+        {
+            "name": "raw.patients",
+            "columns": {"dob": "DATE", "member_id": "STRING", "zip": "INT"},
+        }
+    ]
+    assert untyped == ["diagnoses_raw", "raw.encounters"]
+
+
+def _typed_patients_document(types: dict[str, str]) -> PipelineDocument:
+    return PipelineDocument.model_validate(
+        {
+            "mapping": {
+                "entities": {
+                    "patients": {
+                        "table": "raw.patients",
+                        "columns": {"person_id": "member_id", "date_of_birth": "dob"},
+                        "types": types,
+                    }
+                },
+                "references": {"icd10": {"table": "raw.icd10", "columns": {"code": "code"}}},
+            },
+            "pipeline": {
+                "name": "p",
+                "version": "v",
+                "spine": {"entity": "patients", "key": "person_id", "columns": ["person_id"]},
+                "output": {"table": "t"},
+            },
+        }
+    )
+
+
+def test_build_semantic_models_keeps_declared_source_types() -> None:
+    doc = _typed_patients_document({"person_id": "BIGINT", "date_of_birth": "date"})
+    models = {m.name: m for m in _build_semantic_models(doc, default_semantic_contract())}
+
+    patients = models["semantic.patients"]
+    assert "member_id AS person_id" in patients.sql
+    assert "CAST(" not in patients.sql
+    assert patients.columns == {"date_of_birth": "DATE", "person_id": "BIGINT"}
+    assert models["semantic.reference__icd10"].columns is None
+
+
+def test_build_semantic_models_casts_undeclared_columns_to_recommended_types() -> None:
+    # Pins the typed semantic layer's breaking change: an untyped person_id is
+    # cast to STRING (and date_of_birth to DATE) in every semantic view.
+    doc = _typed_patients_document({})
+    patients = _build_semantic_models(doc, default_semantic_contract())[0]
+
+    assert "CAST(member_id AS STRING) AS person_id" in patients.sql
+    assert "CAST(dob AS DATE) AS date_of_birth" in patients.sql
+    assert patients.columns == {"date_of_birth": "DATE", "person_id": "STRING"}
+
+
+def _join_feature(
+    on: str, model_columns: dict[str, str], grain: tuple[str, ...] | None = None
+) -> BuiltFeature:
+    return BuiltFeature(
+        key="unit.joined",
+        metadata=FeatureMetadata(
+            key="unit.joined",
+            description=None,
+            params=(),
+            requirements=(),
+            provides=(),
+        ),
+        assets=FeatureAssets(
+            models=[
+                SqlmeshModelSpec(
+                    name="feature.joined",
+                    sql="SELECT 1",
+                    kind="VIEW",
+                    tags=[],
+                    columns=model_columns,
+                )
+            ],
+            join_models=[
+                JoinModelSpec(
+                    model_name="feature.joined", alias="j", on=on, join_type="LEFT", grain=grain
+                )
+            ],
+            select_expressions=[],
+            tests=[],
+        ),
+        select_expressions=[],
+    )
+
+
+@pytest.mark.parametrize(
+    ("joined_type", "expectation"),
+    [
+        ("STRING", does_not_raise()),
+        ("BIGINT", pytest.raises(ValidationError, match="Join key type mismatch")),
+    ],
+)
+def test_check_join_key_types(joined_type: str, expectation) -> None:
+    ctx = BuildContext(
+        pipeline_name="p",
+        spine_entity="patients",
+        spine_alias="p",
+        mapping=MappingSpec.model_validate({"entities": {}}),
+        semantic_contract=default_semantic_contract(),
+        naming=NamingConfig(),
+    )
+    feature = _join_feature("p.person_id = j.person_id AND j.n > 0", {"person_id": joined_type})
+    model_types = {
+        "semantic.patients": {"person_id": "STRING"},
+        "feature.joined": {"person_id": joined_type},
+    }
+    with expectation:
+        _check_join_key_types([feature], ctx, model_types)
+
+
+def _join_ctx() -> BuildContext:
+    return BuildContext(
+        pipeline_name="p",
+        spine_entity="patients",
+        spine_alias="p",
+        mapping=MappingSpec.model_validate({"entities": {}}),
+        semantic_contract=default_semantic_contract(),
+        naming=NamingConfig(),
+    )
+
+
+@pytest.mark.parametrize(
+    ("on", "grain", "expected"),
+    [
+        ("p.person_id = j.person_id", None, {("person_id",)}),
+        ("j.pid = p.person_id AND (p.as_of_date = j.as_of)", None, {("as_of", "pid")}),
+        ("p.person_id = j.person_id AND j.n > 0", ("person_id", "n"), {("person_id", "n")}),
+        ("j.flag = 1", ("person_id",), {("person_id",)}),
+    ],
+)
+def test_join_grains_infers_equi_join_columns(on: str, grain, expected) -> None:
+    feature = _join_feature(on, {"person_id": "STRING"}, grain)
+    grains = _join_grains([feature], _join_ctx(), "person_id", {})
+    assert grains.get("feature.joined") == expected
+
+
+@pytest.mark.parametrize(
+    "on",
+    [
+        "p.person_id > j.person_id",
+        "p.person_id = j.person_id OR j.shared",
+        "p.person_id BETWEEN j.low AND j.high",
+        "p.person_id = p.other_id",
+    ],
+)
+def test_join_grains_rejects_non_equi_spine_key_joins(on: str) -> None:
+    feature = _join_feature(on, {"person_id": "STRING"})
+    with pytest.raises(ValidationError, match="Non-equi joins on spine key"):
+        _join_grains([feature], _join_ctx(), "person_id", {})
+
+
+@pytest.mark.parametrize("on", ["1 = 1", "j.flag = 1", "p.as_of_date > j.start_date"])
+def test_join_grains_rejects_joins_without_spine_equality(on: str) -> None:
+    feature = _join_feature(on, {"person_id": "STRING"})
+    with pytest.raises(ValidationError, match="Joins without an equality on a spine column"):
+        _join_grains([feature], _join_ctx(), "person_id", {})
+
+
+def test_join_grains_rejects_unknown_grain_columns() -> None:
+    feature = _join_feature("p.person_id = j.person_id", {"person_id": "STRING"}, ("pid",))
+    with pytest.raises(ValidationError, match="Join grain references unknown columns"):
+        _join_grains(
+            [feature], _join_ctx(), "person_id", {"feature.joined": {"person_id": "STRING"}}
+        )
+
+
+def test_with_audits_appends_unique_audits_once() -> None:
+    model = SqlmeshModelSpec(
+        name="feature.joined",
+        sql="SELECT 1",
+        kind="VIEW",
+        tags=[],
+        audits=["not_null(columns := (person_id))"],
+    )
+    grains = {"feature.joined": {("person_id",), ("as_of", "person_id")}}
+
+    audited = _with_audits(_with_audits(model, grains), grains)
+
+    assert audited.audits == [
+        "not_null(columns := (person_id))",
+        "unique_combination_of_columns(columns := (as_of, person_id))",
+        "unique_combination_of_columns(columns := (person_id))",
+    ]
+    assert _with_audits(
+        SqlmeshModelSpec(name="x", sql="SELECT 1", kind="VIEW", tags=[]), grains
+    ).audits is None
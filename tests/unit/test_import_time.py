@@ -0,0 +1,102 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+import spark_preprocessor
+
+# Import-time budget (microseconds) for CLI startup, third-party libraries
+# included. structlog (about 100 ms with rich and asyncio) is imported only by
+# the first log call, once a command's work is done; `--help` never loads it,
+# and `scaffold` loads it last, for its completion event, outside the budget.
+BUDGET_US = 100_000
+RUNS = 5
+
+_ROW = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+_HEAVY = (
+    "pydantic",
+    "sqlglot",
+    "sqlmesh",
+    "duckdb",
+    "spark_preprocessor.schema",
+    "spark_preprocessor.compiler",
+    "spark_preprocessor.features",
+)
+
+
+def _startup_imports(
+    argv: list[str], tmp_path: Path
+) -> tuple[list[str], dict[str, int]]:
+    """Top-level modules imported by a CLI run, in order, and their import times."""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith("COV_CORE")
+    }
+    src = str(Path(spark_preprocessor.__file__).resolve().parents[1])
+    env["PYTHONPATH"] = os.pathsep.join([src, env.get("PYTHONPATH", "")])
+    code = f"from spark_preprocessor import main\nmain({argv!r})\n"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    rows = [
+        match.groups()
+        for line in result.stderr.splitlines()
+        if (match := _ROW.match(line))
+    ]
+    names = [name for _, _, _, name in rows]
+    # Everything up to `site` is interpreter startup.
+    rows = rows[names.index("site") + 1 :] if "site" in names else rows
+    modules = [name for _, _, _, name in rows]
+    top_level = {
+        name: int(cumulative) for _, cumulative, indent, name in rows if not indent
+    }
+    return modules, top_level
+
+
+@pytest.mark.parametrize(
+    ("argv", "logs"),
+    [
+        (["--help"], False),
+        (["scaffold", "--mapping", "mapping.yaml", "--out", "out"], True),
+    ],
+)
+def test_cli_startup_import_budget(tmp_path: Path, argv: list[str], logs: bool) -> None:
+    (tmp_path / "mapping.yaml").write_text(
+        yaml.safe_dump(
+            {
+                "entities": {
+                    "patients": {
+                        "table": "raw.patients",
+                        "columns": {"person_id": "pid"},
+                    }
+                }
+            }
+        )
+    )
+    runs = [_startup_imports(argv, tmp_path) for _ in range(RUNS)]
+
+    for modules, top_level in runs:
+        for module in _HEAVY:
+            assert module not in modules
+        if logs:
+            # structlog is only imported by the completion event, after the work.
+            assert list(top_level)[-1] == "structlog"
+        else:
+            assert "structlog" not in modules
+    best_us = min(
+        sum(cumulative for name, cumulative in top_level.items() if name != "structlog")
+        for _, top_level in runs
+    )
+    assert best_us < BUDGET_US
@@ -0,0 +1,129 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from spark_preprocessor import lineage as lineage_module
+from spark_preprocessor.errors import ConfigurationError
+from spark_preprocessor.features.base import SqlmeshModelSpec
+from spark_preprocessor.lineage import affected_outputs, build_lineage, load_lineage
+
+
+def _model(name: str, sql: str) -> SqlmeshModelSpec:
+    return SqlmeshModelSpec(name=name, sql=sql, kind="VIEW", tags=[])
+
+
+def _models() -> list[SqlmeshModelSpec]:
+    return [
+        _model(
+            "semantic.patients",
+            "SELECT member_id AS person_id, CAST(dob AS DATE) AS date_of_birth FROM cat.raw.members",
+        ),
+        _model(
+            "semantic.encounters",
+            "SELECT pid AS person_id, enc_type AS encounter_type FROM cat.raw.visits",
+        ),
+        _model(
+            "features.inpatient",
+            "SELECT person_id, SUM(CASE WHEN encounter_type = 'IP' THEN 1 ELSE 0 END) AS ip "
+            "FROM semantic.encounters GROUP BY person_id",
+        ),
+        _model(
+            "marts.out",
+            "WITH base AS (SELECT p.person_id AS person_id, p.date_of_birth AS date_of_birth, "
+            "ip.ip AS ip, 1 AS one FROM semantic.patients p "
+            "LEFT JOIN features.inpatient ip ON p.person_id = ip.person_id) "
+            "SELECT base.*, ip * 2 AS ip_doubled FROM base",
+        ),
+    ]
+
+
+def test_build_lineage_traces_output_columns_to_physical_columns() -> None:
+    lineage = build_lineage(_models(), "marts.out")
+
+    assert lineage["output_table"] == "marts.out"
+    assert lineage["unresolved"] == []
+    assert lineage["columns"]["ip_doubled"] == {
+        "sources": ["cat.raw.visits.enc_type"],
+        "models": ["features.inpatient", "semantic.encounters"],
+    }
+    assert lineage["columns"]["one"] == {"sources": [], "models": []}
+    assert lineage["index"] == {
+        "cat.raw.members.dob": ["date_of_birth"],
+        "cat.raw.members.member_id": ["person_id"],
+        "cat.raw.visits.enc_type": ["ip", "ip_doubled"],
+    }
+
+
+def test_build_lineage_reports_untraceable_columns() -> None:
+    models = [
+        _model("marts.out", "SELECT a.x AS x, y AS y FROM t1 a JOIN t2 b ON a.k = b.k"),
+    ]
+    lineage = build_lineage(models, "marts.out")
+    assert lineage["columns"]["x"]["sources"] == ["t1.x"]
+    assert lineage["unresolved"] == ["y"]
+    assert "y" not in lineage["columns"]
+
+
+def test_build_lineage_binds_stars_and_unqualified_columns_with_schema() -> None:
+    models = [
+        _model("semantic.patients", "SELECT * FROM cat.raw.members"),
+        _model(
+            "marts.out",
+            "SELECT p.member_id AS person_id, dob, enc_type FROM semantic.patients p "
+            "JOIN cat.raw.visits v ON p.member_id = v.pid",
+        ),
+    ]
+    physical = {
+        "cat.raw.members": {"member_id": "STRING", "dob": None},
+        "cat.raw.visits": {"pid": "STRING", "enc_type": "STRING"},
+    }
+
+    without_schema = build_lineage(models, "marts.out")
+    assert {"dob", "enc_type"} <= set(without_schema["unresolved"])
+
+    lineage = build_lineage(models, "marts.out", physical)
+    assert lineage["unresolved"] == []
+    assert lineage["columns"]["dob"] == {
+        "sources": ["cat.raw.members.dob"],
+        "models": ["semantic.patients"],
+    }
+    assert lineage["columns"]["enc_type"]["sources"] == ["cat.raw.visits.enc_type"]
+
+
+def test_build_lineage_parses_each_model_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    parsed: list[str] = []
+    original = lineage_module.parse_one
+
+    def counting_parse_one(sql: str, **kwargs: object) -> object:
+        parsed.append(sql)
+        return original(sql, **kwargs)
+
+    monkeypatch.setattr(lineage_module, "parse_one", counting_parse_one)
+    build_lineage(_models(), "marts.out")
+
+    assert len(parsed) == len(_models())
+
+
+@pytest.mark.parametrize(
+    ("column", "expected"),
+    [
+        ("cat.raw.visits.enc_type", ["ip", "ip_doubled"]),
+        ("VISITS.ENC_TYPE", ["ip", "ip_doubled"]),
+        ("members.dob", ["date_of_birth"]),
+        ("visits.pid", []),
+    ],
+)
+def test_affected_outputs_matches_suffixes_case_insensitively(
+    column: str, expected: list[str]
+) -> None:
+    assert affected_outputs(build_lineage(_models(), "marts.out"), column) == expected
+
+
+def test_load_lineage_validates_manifest(tmp_path: Path) -> None:
+    with pytest.raises(ConfigurationError, match="Lineage manifest not found"):
+        load_lineage(tmp_path)
+    (tmp_path / "manifest").mkdir()
+    (tmp_path / "manifest" / "lineage.json").write_text(json.dumps({"index": []}))
+    with pytest.raises(ConfigurationError, match="Invalid lineage manifest"):
+        load_lineage(tmp_path)
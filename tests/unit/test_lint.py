@@ -0,0 +1,158 @@
+import pytest
+
+from spark_preprocessor.errors import ValidationError
+from spark_preprocessor.features.base import (
+    BuildContext,
+    JoinModelSpec,
+    SqlmeshModelSpec,
+)
+from spark_preprocessor.lint import (
+    LintFinding,
+    check_lint,
+    lint_join,
+    lint_model,
+    lint_select_expression,
+    sql_metrics,
+)
+from spark_preprocessor.schema import MappingSpec, NamingConfig
+from spark_preprocessor.semantic_contract import default_semantic_contract
+
+
+def _ctx() -> BuildContext:
+    mapping = MappingSpec.model_validate(
+        {
+            "entities": {
+                "patients": {"table": "raw.patients", "columns": {"person_id": "id"}},
+                "encounters": {
+                    "table": "raw.encounters",
+                    "columns": {"person_id": "pid"},
+                },
+            }
+        }
+    )
+    return BuildContext(
+        pipeline_name="p",
+        spine_entity="patients",
+        spine_alias="p",
+        mapping=mapping,
+        semantic_contract=default_semantic_contract(),
+        naming=NamingConfig(),
+    )
+
+
+def _rules(sql: str, kind: str = "TABLE") -> list[str]:
+    model = SqlmeshModelSpec(name="features.m", sql=sql, kind=kind, tags=[])
+    return [finding.rule for finding in lint_model("unit.f", model, _ctx())]
+
+
+@pytest.mark.parametrize(
+    ("sql", "kind", "expected"),
+    [
+        (
+            "SELECT person_id, COUNT(*) AS n FROM semantic.encounters GROUP BY person_id",
+            "TABLE",
+            [],
+        ),
+        (
+            "SELECT person_id FROM semantic.encounters ORDER BY person_id",
+            "VIEW",
+            ["order-by-in-view"],
+        ),
+        (
+            "SELECT person_id FROM semantic.encounters ORDER BY person_id",
+            "TABLE",
+            ["order-by-without-limit"],
+        ),
+        (
+            "SELECT person_id FROM semantic.encounters ORDER BY person_id LIMIT 10",
+            "VIEW",
+            [],
+        ),
+        (
+            "SELECT person_id, ROW_NUMBER() OVER (PARTITION BY person_id ORDER BY 1) AS rn FROM semantic.encounters",
+            "VIEW",
+            [],
+        ),
+        ("SELECT * FROM raw.encounters", "TABLE", ["select-star-raw-table"]),
+        ("SELECT e.* FROM semantic.encounters e", "TABLE", ["select-star"]),
+        (
+            "SELECT my_udf(person_id) AS x FROM semantic.encounters",
+            "TABLE",
+            ["udf-call"],
+        ),
+        (
+            "SELECT a.person_id FROM semantic.encounters a CROSS JOIN semantic.patients b",
+            "TABLE",
+            ["cross-join"],
+        ),
+        (
+            "SELECT a.person_id FROM semantic.encounters a JOIN semantic.patients b ON a.x < b.y",
+            "TABLE",
+            ["non-equi-join"],
+        ),
+        (
+            (
+                "SELECT a.person_id FROM semantic.encounters a JOIN semantic.patients b "
+                "ON a.person_id = b.person_id AND a.x < b.y"
+            ),
+            "TABLE",
+            [],
+        ),
+        (
+            "SELECT DISTINCT person_id FROM semantic.encounters",
+            "TABLE",
+            ["distinct-over-history"],
+        ),
+        (
+            "SELECT DISTINCT person_id FROM semantic.encounters WHERE year = 2024",
+            "TABLE",
+            [],
+        ),
+        ("SELECT DISTINCT person_id FROM semantic.patients", "TABLE", []),
+    ],
+)
+def test_lint_model_flags_expensive_patterns(
+    sql: str, kind: str, expected: list[str]
+) -> None:
+    assert _rules(sql, kind) == expected
+
+
+@pytest.mark.parametrize(
+    ("on", "expected"),
+    [
+        ("p.person_id = j.person_id", []),
+        ("p.as_of_date BETWEEN j.start AND j.end", ["non-equi-join"]),
+        ("1 = 1", ["non-equi-join"]),
+    ],
+)
+def test_lint_join_requires_a_column_equality(on: str, expected: list[str]) -> None:
+    join = JoinModelSpec(model_name="features.m", alias="j", on=on, join_type="LEFT")
+    assert [finding.rule for finding in lint_join("unit.f", join)] == expected
+
+
+def test_lint_select_expression_flags_udfs_and_subqueries() -> None:
+    findings = lint_select_expression(
+        "unit.f", "score_udf(p.x) + (SELECT MAX(y) FROM semantic.encounters)"
+    )
+    assert [(finding.rule, finding.severity) for finding in findings] == [
+        ("udf-call", "warning"),
+        ("subquery-in-select", "warning"),
+    ]
+
+
+def test_sql_metrics_counts_joins_depth_and_size() -> None:
+    sql = "SELECT a.x FROM t a LEFT JOIN u b ON a.x = b.x LEFT JOIN v c ON a.x = c.x"
+    metrics = sql_metrics(sql)
+    assert metrics.join_count == 2
+    assert metrics.expression_depth > 2
+    assert metrics.sql_size == len(sql)
+
+
+def test_check_lint_fails_only_on_errors_under_fail_policy() -> None:
+    warning = LintFinding("udf-call", "warning", "unit.f", "select", "udf")
+    error = LintFinding("cross-join", "error", "unit.f", "features.m", "CROSS JOIN t")
+
+    check_lint([warning, error], "warn")
+    check_lint([warning], "fail")
+    with pytest.raises(ValidationError, match="Lint failed \\(1 errors\\)"):
+        check_lint([warning, error], "fail")
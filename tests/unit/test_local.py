@@ -0,0 +1,95 @@
+from contextlib import nullcontext as does_not_raise
+from pathlib import Path
+
+import pytest
+
+from spark_preprocessor.errors import ConfigurationError
+from spark_preprocessor.runtime.local import (
+    LocalSource,
+    _check_sources,
+    build_gateway,
+    parse_source,
+    sqlmesh_config,
+)
+from spark_preprocessor.schema import MappingSpec
+
+
+def _mapping(*tables: str) -> MappingSpec:
+    return MappingSpec.model_validate(
+        {
+            "entities": {
+                f"e{index}": {"table": table, "columns": {"person_id": "pid"}}
+                for index, table in enumerate(tables)
+            }
+        }
+    )
+
+
+def test_parse_source_detects_formats(tmp_path: Path) -> None:
+    (tmp_path / "a.csv").write_text("x\n1\n")
+    (tmp_path / "b.feather").write_bytes(b"")
+    (tmp_path / "dataset").mkdir()
+
+    assert parse_source(f"raw.a={tmp_path / 'a.csv'}").format == "csv"
+    assert parse_source(f"b={tmp_path / 'b.feather'}").format == "arrow"
+    assert parse_source(f"c={tmp_path / 'dataset'}") == LocalSource(
+        table="c", path=(tmp_path / "dataset").resolve(), format="parquet"
+    )
+
+
+@pytest.mark.parametrize(
+    ("spec", "match"),
+    [
+        ("no_separator", "expected TABLE=PATH"),
+        ("t=data.xlsx", "Unsupported source format"),
+        ("t=missing.csv", "Source not found"),
+    ],
+)
+def test_parse_source_rejects_invalid_specs(spec: str, match: str) -> None:
+    with pytest.raises(ConfigurationError, match=match):
+        parse_source(spec)
+
+
+@pytest.mark.parametrize(
+    ("bound", "expectation"),
+    [
+        (["raw.a", "raw.b"], does_not_raise()),
+        (["raw.a"], pytest.raises(ConfigurationError, match="without a source")),
+        (
+            ["raw.a", "raw.b", "raw.c"],
+            pytest.raises(ConfigurationError, match="do not match"),
+        ),
+        (
+            ["raw.a", "raw.a", "raw.b"],
+            pytest.raises(ConfigurationError, match="more than once"),
+        ),
+    ],
+)
+def test_check_sources_requires_exact_bindings(bound: list[str], expectation) -> None:
+    sources = [LocalSource(table, Path("x.csv"), "csv") for table in bound]
+    with expectation:
+        _check_sources(_mapping("raw.a", "raw.b"), sources)
+
+
+def test_build_gateway_attaches_foreign_catalogs(tmp_path: Path) -> None:
+    gateway = build_gateway(
+        _mapping("raw.clinical.patients", "local.s.t", "s.u"),
+        tmp_path / "local.duckdb",
+        memory_limit="1GB",
+        threads=2,
+    )
+
+    assert gateway.catalogs == {"raw": str(tmp_path / "raw.duckdb")}
+    assert gateway.connection() == {
+        "type": "duckdb",
+        "catalogs": {
+            "local": str(tmp_path / "local.duckdb"),
+            "raw": str(tmp_path / "raw.duckdb"),
+        },
+        "connector_config": {"memory_limit": "1GB", "threads": 2},
+    }
+    config = sqlmesh_config(gateway)
+    assert config.default_gateway == "duckdb"
+
+    with pytest.raises(ConfigurationError, match="reserved"):
+        build_gateway(_mapping("raw.clinical.patients"), tmp_path / "main.duckdb")
@@ -0,0 +1,158 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from spark_preprocessor.errors import ConfigurationError, ValidationError
+from spark_preprocessor.plans import (
+    PlanChange,
+    check_plan_diff,
+    diff_plans,
+    load_plans,
+    summarize_plan,
+)
+
+
+def _scan(table: str, rows: int) -> dict:
+    return {
+        "name": "SEQ_SCAN",
+        "children": [],
+        "extra_info": {"Table": table, "Estimated Cardinality": str(rows)},
+    }
+
+
+def test_summarize_plan_collects_joins_and_shape() -> None:
+    plan = [
+        {
+            "name": "PROJECTION",
+            "children": [
+                {
+                    "name": "CROSS_PRODUCT",
+                    "children": [
+                        {
+                            "name": "HASH_JOIN",
+                            "children": [_scan("a", 100), _scan("b", 10)],
+                            "extra_info": {
+                                "Join Type": "LEFT",
+                                "Estimated Cardinality": "100",
+                            },
+                        },
+                        _scan("c", 5),
+                    ],
+                    "extra_info": {},
+                }
+            ],
+            "extra_info": {"Estimated Cardinality": "500"},
+        }
+    ]
+
+    summary = summarize_plan(plan)
+
+    assert (
+        summary["shape"]
+        == "PROJECTION(CROSS_PRODUCT(HASH_JOIN(SEQ_SCAN, SEQ_SCAN), SEQ_SCAN))"
+    )
+    assert summary["join_count"] == 2
+    assert summary["cross_products"] == 1
+    assert summary["estimated_cardinality"] == 500
+    assert summary["joins"] == [
+        {
+            "operator": "CROSS_PRODUCT",
+            "join_type": "CROSS",
+            "estimated_cardinality": None,
+        },
+        {"operator": "HASH_JOIN", "join_type": "LEFT", "estimated_cardinality": 100},
+    ]
+
+
+def _summary(
+    joins: list[tuple[str, str]], shape: str = "PROJECTION", rows: int = 10
+) -> dict:
+    return {
+        "kind": "TABLE",
+        "shape": shape,
+        "join_count": len(joins),
+        "cross_products": sum(join_type == "CROSS" for _, join_type in joins),
+        "joins": [
+            {
+                "operator": operator,
+                "join_type": join_type,
+                "estimated_cardinality": rows,
+            }
+            for operator, join_type in joins
+        ],
+        "estimated_cardinality": rows,
+    }
+
+
+@pytest.mark.parametrize(
+    "before,after,expected",
+    [
+        (_summary([("HASH_JOIN", "LEFT")]), _summary([("HASH_JOIN", "LEFT")]), []),
+        (
+            _summary([("HASH_JOIN", "LEFT")]),
+            _summary([("HASH_JOIN", "LEFT"), ("CROSS_PRODUCT", "CROSS")]),
+            ["join_count", "cross_products", "joins"],
+        ),
+        (
+            _summary([("HASH_JOIN", "LEFT")]),
+            _summary([("NESTED_LOOP_JOIN", "LEFT")]),
+            ["joins"],
+        ),
+        (_summary([], shape="A(B)"), _summary([], shape="A(B, C)"), ["shape"]),
+        (_summary([], rows=10), _summary([], rows=1000), ["estimated_cardinality"]),
+        (_summary([], rows=0), _summary([], rows=1000), []),
+        ({"kind": "TABLE", "error": "boom"}, _summary([]), ["error"]),
+        (None, _summary([]), ["model"]),
+    ],
+)
+def test_diff_plans_reports_structural_changes(before, after, expected) -> None:
+    old = {"models": {"m": before} if before else {}}
+    new = {"models": {"m": after}}
+
+    changes = diff_plans(old, new)
+
+    assert [change.change for change in changes] == expected
+
+
+def test_diff_plans_labels_engine_version_changes() -> None:
+    old = {
+        "engine": "duckdb",
+        "engine_version": "1.1.0",
+        "models": {"m": _summary([], shape="A(B)")},
+    }
+    new = {
+        "engine": "duckdb",
+        "engine_version": "1.2.0",
+        "models": {"m": _summary([], shape="A(C)")},
+    }
+
+    changes = diff_plans(old, new)
+
+    assert [
+        (change.model, change.change, change.engine_change) for change in changes
+    ] == [
+        ("engine", "engine_version", False),
+        ("m", "shape", True),
+    ]
+    assert changes[0].render() == "engine engine_version: duckdb 1.1.0 -> duckdb 1.2.0"
+    assert changes[1].render() == "m shape: A(B) -> A(C) (engine change)"
+    assert diff_plans(old, old) == []
+
+
+def test_load_plans_requires_snapshot(tmp_path: Path) -> None:
+    with pytest.raises(ConfigurationError, match="--capture-plans"):
+        load_plans(tmp_path)
+
+    (tmp_path / "manifest").mkdir()
+    (tmp_path / "manifest" / "plans.json").write_text(json.dumps({"models": []}))
+    with pytest.raises(ConfigurationError, match="Invalid plan snapshot"):
+        load_plans(tmp_path)
+
+
+def test_check_plan_diff_raises_on_changes() -> None:
+    check_plan_diff([])
+    with pytest.raises(
+        ValidationError, match="m joins: \\[\\] -> \\['CROSS CROSS_PRODUCT'\\]"
+    ):
+        check_plan_diff([PlanChange("m", "joins", [], ["CROSS CROSS_PRODUCT"])])
@@ -0,0 +1,153 @@
+import duckdb
+import pytest
+
+from spark_preprocessor.errors import ValidationError
+from spark_preprocessor.preflight import (
+    DATABRICKS_COLUMNS_RELATION,
+    DEFAULT_COLUMNS_RELATION,
+    check_preflight,
+    columns_relation_for,
+    parse_table_ref,
+    render_catalog_query,
+    run_preflight,
+    type_family,
+    types_compatible,
+)
+from spark_preprocessor.schema import MappingSpec
+
+
+def _mapping(
+    columns: dict[str, str], types: dict[str, str] | None = None
+) -> MappingSpec:
+    return MappingSpec.model_validate(
+        {
+            "entities": {
+                "patients": {
+                    "table": "raw.patients",
+                    "columns": columns,
+                    "types": types or {},
+                }
+            },
+            "references": {"icd10": {"table": "icd10", "columns": {"code": "code"}}},
+        }
+    )
+
+
+@pytest.fixture
+def conn():
+    connection = duckdb.connect()
+    connection.execute("CREATE SCHEMA raw")
+    connection.execute(
+        "CREATE TABLE raw.patients (member_id VARCHAR, dob DATE, score INT)"
+    )
+    connection.execute("CREATE TABLE icd10 (code VARCHAR)")
+    yield connection
+    connection.close()
+
+
+def test_parse_table_ref_splits_parts() -> None:
+    ref = parse_table_ref("cat.`schema`.tbl")
+    assert (ref.catalog, ref.schema, ref.name) == ("cat", "schema", "tbl")
+    assert parse_table_ref("tbl").schema is None
+
+
+def test_parse_table_ref_rejects_invalid_identifier() -> None:
+    with pytest.raises(ValidationError):
+        parse_table_ref("a.b.c.d")
+
+
+def test_render_catalog_query_is_one_batched_query() -> None:
+    sql = render_catalog_query([parse_table_ref("a.b.t1"), parse_table_ref("t2")])
+    assert sql.count("SELECT") == 1
+    assert "lower(table_catalog) = 'a'" in sql
+    assert "lower(table_name) = 't2'" in sql
+    assert "current_catalog()" not in sql
+
+
+def test_render_catalog_query_scopes_databricks_names_to_current_catalog() -> None:
+    sql = render_catalog_query(
+        [parse_table_ref("a.b.t1"), parse_table_ref("raw.t2")],
+        DATABRICKS_COLUMNS_RELATION,
+    )
+    assert "FROM system.information_schema.columns" in sql
+    assert (
+        "(lower(table_name) = 't2' AND lower(table_schema) = 'raw' "
+        "AND lower(table_catalog) = lower(current_catalog()))"
+    ) in sql
+    assert (
+        "(lower(table_name) = 't1' AND lower(table_schema) = 'b' AND lower(table_catalog) = 'a')"
+        in sql
+    )
+
+
+def test_run_preflight_passes_for_valid_mapping(conn) -> None:
+    queries: list[str] = []
+
+    def fetchall(sql: str):
+        queries.append(sql)
+        return conn.execute(sql).fetchall()
+
+    report = run_preflight(
+        _mapping(
+            {"person_id": "member_id", "date_of_birth": "dob"},
+            {"date_of_birth": "DATE"},
+        ),
+        fetchall,
+    )
+    assert report.ok
+    assert report.tables_checked == 2
+    assert report.columns_checked == 3
+    assert len(queries) == 1
+
+
+def test_run_preflight_reports_missing_columns_tables_and_type_mismatches(conn) -> None:
+    mapping = _mapping(
+        {"person_id": "member_id", "date_of_birth": "birth_date", "score": "score"},
+        {"person_id": "BIGINT", "score": "DOUBLE"},
+    )
+    mapping.references["icd10"].table = "missing_tbl"
+    report = run_preflight(mapping, lambda sql: conn.execute(sql).fetchall())
+    problems = {issue.render() for issue in report.issues}
+    assert problems == {
+        "raw.patients.birth_date: column not found",
+        "raw.patients.member_id: type mismatch: declared BIGINT, found VARCHAR",
+        "missing_tbl: table not found",
+    }
+    with pytest.raises(ValidationError, match="Pre-flight failed \\(3 issues\\)"):
+        check_preflight(report)
+
+
+def test_run_preflight_skips_query_for_empty_mapping() -> None:
+    def fetchall(sql: str):
+        raise AssertionError("no query expected")
+
+    report = run_preflight(MappingSpec.model_validate({"entities": {}}), fetchall)
+    assert report.ok
+
+
+@pytest.mark.parametrize(
+    "sql_type,family",
+    [
+        ("VARCHAR(20)", "string"),
+        ("bigint", "integer"),
+        ("DECIMAL(10,2)", "fractional"),
+        ("TIMESTAMP WITH TIME ZONE", "timestamp"),
+        ("array<string>", "complex"),
+        ("INTEGER[]", "complex"),
+        ("geometry", "geometry"),
+    ],
+)
+def test_type_family(sql_type: str, family: str) -> None:
+    assert type_family(sql_type) == family
+
+
+def test_types_compatible_allows_widening_only() -> None:
+    assert types_compatible("DOUBLE", "INT")
+    assert types_compatible("TIMESTAMP", "DATE")
+    assert not types_compatible("INT", "DOUBLE")
+    assert not types_compatible("DATE", "VARCHAR")
+
+
+def test_columns_relation_for_dialect() -> None:
+    assert columns_relation_for("databricks") == DATABRICKS_COLUMNS_RELATION
+    assert columns_relation_for("duckdb") == DEFAULT_COLUMNS_RELATION
@@ -1,8 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from importlib.metadata import EntryPoint
+import sys
+
 import pytest
 
-from spark_preprocessor.errors import FeatureNotFoundError, ValidationError
-from spark_preprocessor.features.base import ColumnSpec, FeatureAssets, FeatureMetadata
-from spark_preprocessor.features.registry import get_feature, list_features, register_feature
+from spark_preprocessor.errors import ConfigurationError, FeatureNotFoundError, ValidationError
+from spark_preprocessor.features.base import ColumnSpec, FeatureAssets, FeatureMetadata, FeatureRequirement
+from spark_preprocessor.features import registry as registry_module
+from spark_preprocessor.features.registry import (
+    FeatureRegistry,
+    get_feature,
+    list_features,
+    register_feature,
+    registering_into,
+)
 
 
 class _UnitFeature:
@@ -35,3 +47,195 @@ def test_list_features_includes_registered_feature() -> None:
     register_feature(_UnitFeature())
     assert "unit.registry.feature" in set(list_features())
 
+
+
+def _keyed_feature(key: str) -> _UnitFeature:
+    feature = _UnitFeature()
+    feature.meta = replace(_UnitFeature.meta, key=key)
+    return feature
+
+
+def test_registry_snapshot_is_immutable_and_unaffected_by_registration() -> None:
+    registry = FeatureRegistry([_keyed_feature("unit.a")])
+    snapshot = registry.snapshot()
+    registry.register(_keyed_feature("unit.b"))
+
+    assert set(snapshot) == {"unit.a"}
+    assert set(registry.keys()) == {"unit.a", "unit.b"}
+    with pytest.raises(TypeError):
+        snapshot["unit.c"] = _keyed_feature("unit.c")  # type: ignore[index]
+
+
+def test_registry_copy_is_independent() -> None:
+    base = FeatureRegistry([_keyed_feature("unit.a")])
+    client = base.copy()
+    client.register(_keyed_feature("unit.client"))
+
+    assert set(base.keys()) == {"unit.a"}
+    assert set(client.keys()) == {"unit.a", "unit.client"}
+    with pytest.raises(FeatureNotFoundError):
+        base.get("unit.client")
+
+
+def test_registry_concurrent_registration_keeps_every_feature() -> None:
+    registry = FeatureRegistry()
+    keys = [f"unit.concurrent_{index}" for index in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda key: registry.register(_keyed_feature(key)), keys))
+
+    assert set(registry.keys()) == set(keys)
+
+
+def _indexed_feature(key: str, provides: str, requires: dict[str, set[str]], grains) -> _UnitFeature:
+    feature = _UnitFeature()
+    feature.meta = replace(
+        _UnitFeature.meta,
+        key=key,
+        provides=(ColumnSpec(name=provides, dtype="int"),),
+        requirements=tuple(
+            FeatureRequirement(entity=entity, columns=frozenset(columns)) for entity, columns in requires.items()
+        ),
+        compatible_grains=grains,
+    )
+    return feature
+
+
+def _indexed_registry() -> FeatureRegistry:
+    return FeatureRegistry(
+        [
+            _indexed_feature("unit.ip", "ip_count", {"encounters": {"encounter_type"}}, ("PERSON",)),
+            _indexed_feature("unit.ip_v2", "ip_count", {"encounters": {"encounter_type", "start_date"}}, None),
+            _indexed_feature("unit.age", "age", {"patients": {"date_of_birth"}}, ("PERSON", "PERSON_MONTH")),
+        ]
+    )
+
+
+def test_registry_snapshot_indexes_outputs_requirements_and_grains() -> None:
+    snapshot = _indexed_registry().snapshot()
+
+    assert snapshot.providers("ip_count") == ("unit.ip", "unit.ip_v2")
+    assert snapshot.providers("unknown") == ()
+    assert set(snapshot.outputs) == {"ip_count", "age"}
+    assert snapshot.requiring("encounters", "start_date") == ("unit.ip_v2",)
+    assert set(snapshot.requiring("encounters")) == {"unit.ip", "unit.ip_v2"}
+    assert snapshot.compatible_with("PERSON_MONTH") == ("unit.age",)
+
+
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        ({}, ["unit.age", "unit.ip", "unit.ip_v2"]),
+        ({"provides": "ip_count"}, ["unit.ip", "unit.ip_v2"]),
+        ({"provides": "ip_count", "grain": "PERSON"}, ["unit.ip"]),
+        ({"requires": "encounters.start_date"}, ["unit.ip_v2"]),
+        ({"requires": "patients"}, ["unit.age"]),
+        ({"provides": "age", "requires": "encounters"}, []),
+    ],
+)
+def test_registry_snapshot_search(filters: dict[str, str], expected: list[str]) -> None:
+    assert _indexed_registry().snapshot().search(**filters) == expected
+
+
+_PLUGIN_SOURCE = """
+from spark_preprocessor.features.base import ColumnSpec, FeatureAssets, FeatureMetadata
+
+
+class PluginFeature:
+    meta = FeatureMetadata(
+        key="{key}",
+        description=None,
+        params=(),
+        requirements=(),
+        provides=(ColumnSpec(name="{column}", dtype="int"),),
+        compatible_grains=("PERSON",),
+    )
+
+    def build(self, ctx, params):
+        return FeatureAssets(models=[], join_models=[], select_expressions=["1 AS {column}"], tests=[])
+"""
+
+
+@pytest.fixture
+def plugin_registry(tmp_path, monkeypatch: pytest.MonkeyPatch) -> FeatureRegistry:
+    """A registry discovering two plugin features from fake entry points."""
+    for module, key in (("_plugin_alpha", "plugin.alpha"), ("_plugin_beta", "plugin.beta")):
+        (tmp_path / f"{module}.py").write_text(_PLUGIN_SOURCE.format(key=key, column=key.split(".")[1]))
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    group = "tests.plugin_features"
+    discovered = [
+        EntryPoint(name="plugin.alpha", value="_plugin_alpha:PluginFeature [alpha]", group=group),
+        EntryPoint(name="plugin.beta", value="_plugin_beta:PluginFeature", group=group),
+        EntryPoint(name="plugin.broken", value="_plugin_missing:PluginFeature", group=group),
+        EntryPoint(name="plugin.renamed", value="_plugin_beta:PluginFeature", group=group),
+    ]
+    monkeypatch.setattr(registry_module, "entry_points", lambda group: discovered)
+    return FeatureRegistry(entry_point_group=group)
+
+
+def test_registry_imports_plugins_only_when_loaded(plugin_registry: FeatureRegistry) -> None:
+    assert set(plugin_registry.keys()) == {"plugin.alpha", "plugin.beta", "plugin.broken", "plugin.renamed"}
+    assert "_plugin_alpha" not in sys.modules
+
+    plugin_registry.load(["plugin.alpha", "age"])
+
+    assert "_plugin_alpha" in sys.modules
+    assert "_plugin_beta" not in sys.modules
+    assert list(plugin_registry.snapshot()) == ["plugin.alpha"]
+    assert plugin_registry.get("plugin.beta").meta.key == "plugin.beta"
+    assert plugin_registry.snapshot().providers("beta") == ("plugin.beta",)
+
+
+@pytest.mark.parametrize(
+    ("key", "match"),
+    [
+        ("plugin.broken", "Cannot load feature 'plugin.broken'"),
+        ("plugin.renamed", "does not have key 'plugin.renamed'"),
+    ],
+)
+def test_registry_rejects_unloadable_plugins(plugin_registry: FeatureRegistry, key: str, match: str) -> None:
+    with pytest.raises(ConfigurationError, match=match):
+        plugin_registry.load([key])
+
+
+def test_registry_finds_lazy_providers_without_importing(plugin_registry: FeatureRegistry) -> None:
+    assert plugin_registry.lazy_providers(["alpha", "typo"]) == ["plugin.alpha"]
+    assert plugin_registry.lazy_providers(["beta", "typo"]) == []
+    assert "_plugin_alpha" not in sys.modules
+
+    plugin_registry.load(plugin_registry.lazy_providers(["alpha"]))
+    assert list(plugin_registry.snapshot()) == ["plugin.alpha"]
+    assert plugin_registry.lazy_providers(["alpha"]) == []
+
+
+def test_registry_register_lazy_without_entry_points(plugin_registry: FeatureRegistry) -> None:
+    registry = FeatureRegistry()
+    registry.register_lazy({"plugin.alpha": "_plugin_alpha:PluginFeature"}, provides={"plugin.alpha": ["alpha"]})
+    assert registry.copy().lazy_providers(["alpha"]) == ["plugin.alpha"]
+    assert registry.get("plugin.alpha").meta.key == "plugin.alpha"
+    with pytest.raises(FeatureNotFoundError):
+        registry.get("plugin.beta")
+
+
+def test_registering_into_redirects_register_feature() -> None:
+    target = FeatureRegistry()
+    with registering_into(target):
+        register_feature(_keyed_feature("unit.redirected"))
+
+    assert list(target.keys()) == ["unit.redirected"]
+    assert "unit.redirected" not in set(list_features())
+
+
+def test_registry_restore_resets_lazy_and_discovery_state(plugin_registry: FeatureRegistry) -> None:
+    saved = plugin_registry.copy()
+    plugin_registry.register_lazy({"extra.key": "_plugin_beta:PluginFeature"}, provides={"extra.key": ["beta"]})
+    plugin_registry.load(["plugin.alpha"])
+    assert plugin_registry._discovered
+
+    plugin_registry.restore(saved)
+
+    assert list(plugin_registry.snapshot()) == []
+    assert not plugin_registry._discovered
+    assert "extra.key" not in plugin_registry.manifest()
+    assert plugin_registry.lazy_providers(["beta"]) == []
+    assert plugin_registry.lazy_providers(["alpha"]) == ["plugin.alpha"]
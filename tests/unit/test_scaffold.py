@@ -5,36 +5,42 @@ import yaml
 
 from spark_preprocessor.errors import ConfigurationError
 from spark_preprocessor.scaffold import _default_spine, scaffold_pipeline
-from spark_preprocessor.schema import MappingSpec
+from spark_preprocessor.schema import load_pipeline_document
 
 
 def test_default_spine_prefers_patients_person_id() -> None:
-    mapping = MappingSpec.model_validate(
-        {
-            "entities": {
-                "patients": {"table": "t", "columns": {"person_id": "pid", "x": "x"}}
-            }
-        }
+    assert _default_spine({"patients": ["person_id", "x"]}) == (
+        "patients",
+        "person_id",
+        ["person_id"],
     )
-    assert _default_spine(mapping) == ("patients", "person_id", ["person_id"])
 
 
 def test_default_spine_falls_back_to_sorted_entity_and_column() -> None:
-    mapping = MappingSpec.model_validate(
-        {
-            "entities": {
-                "z": {"table": "t", "columns": {"b": "b"}},
-                "a": {"table": "t", "columns": {"c": "c", "b": "b"}},
-            }
-        }
-    )
-    assert _default_spine(mapping) == ("a", "b", ["b"])
+    assert _default_spine({"z": ["b"], "a": ["c", "b"]}) == ("a", "b", ["b"])
 
 
 def test_default_spine_requires_at_least_one_entity() -> None:
-    mapping = MappingSpec.model_validate({"entities": {}})
     with pytest.raises(ConfigurationError):
-        _default_spine(mapping)
+        _default_spine({})
+
+
+@pytest.mark.parametrize(
+    ("content", "match"),
+    [
+        ("- not a mapping", "must be a mapping"),
+        ("entities: {patients: {table: t}}", "failed validation"),
+        ("include: other.yaml", "cannot include"),
+        ("entities: [", "Invalid mapping file"),
+    ],
+)
+def test_scaffold_pipeline_rejects_invalid_mappings(
+    tmp_path: Path, content: str, match: str
+) -> None:
+    mapping_path = tmp_path / "mapping.yaml"
+    mapping_path.write_text(content)
+    with pytest.raises(ConfigurationError, match=match):
+        scaffold_pipeline(mapping_path, tmp_path / "out")
 
 
 def test_scaffold_pipeline_writes_pipeline_yaml(tmp_path: Path) -> None:
@@ -58,4 +64,28 @@ def test_scaffold_pipeline_writes_pipeline_yaml(tmp_path: Path) -> None:
     assert pipeline_path.exists()
     data = yaml.safe_load(pipeline_path.read_text())
     assert data["pipeline"]["spine"]["entity"] == "patients"
+    assert data["mapping"] == {"include": "../mapping.yaml"}
+
 
+def test_scaffold_pipeline_loads_with_included_mapping(tmp_path: Path) -> None:
+    mapping_path = tmp_path / "mappings" / "client.yaml"
+    mapping_path.parent.mkdir()
+    mapping_path.write_text(
+        yaml.safe_dump(
+            {
+                "entities": {
+                    "patients": {
+                        "table": "patients_raw",
+                        "columns": {"person_id": "pid"},
+                    }
+                }
+            }
+        )
+    )
+    document = load_pipeline_document(
+        scaffold_pipeline(mapping_path, tmp_path / "pipelines")
+    )
+    assert document.mapping.entity_table("patients") == "patients_raw"
+    assert document.mapping_files == (
+        tmp_path / "pipelines" / "../mappings/client.yaml",
+    )
@@ -5,7 +5,12 @@ import pytest
 import yaml
 
 from spark_preprocessor.errors import ConfigurationError
-from spark_preprocessor.schema import load_mapping_spec, load_pipeline_document
+from spark_preprocessor.schema import (
+    LintConfig,
+    load_mapping_spec,
+    load_pipeline_document,
+    load_schema_snapshot,
+)
 
 
 @pytest.mark.parametrize(
@@ -87,6 +92,7 @@ def test_mapping_spec_reference_helpers() -> None:
     assert spec.has_column("icd10", "code") is True
     assert spec.entity_table("icd10") == "t2"
     assert spec.entity_columns("icd10") == {"code": "code"}
+    assert spec.entity_types("icd10") == {}
 
 
 def test_mapping_spec_unknown_entity_raises() -> None:
@@ -97,3 +103,182 @@ def test_mapping_spec_unknown_entity_raises() -> None:
     )
     with pytest.raises(ConfigurationError):
         spec.entity_table("nope")
+
+
+def test_mapping_spec_entity_types() -> None:
+    from spark_preprocessor.schema import MappingSpec
+
+    spec = MappingSpec.model_validate(
+        {
+            "entities": {
+                "patients": {"table": "t", "columns": {"person_id": "pid"}, "types": {"person_id": "STRING"}}
+            }
+        }
+    )
+    assert spec.entity_types("patients") == {"person_id": "STRING"}
+    with pytest.raises(ConfigurationError):
+        spec.entity_types("nope")
+
+
+def test_load_schema_snapshot_normalizes_names(tmp_path: Path) -> None:
+    path = tmp_path / "snapshot.yaml"
+    path.write_text(yaml.safe_dump({"Raw.Patients": {"Member_ID": "VARCHAR"}}))
+    assert load_schema_snapshot(path) == {"raw.patients": {"member_id": "VARCHAR"}}
+
+
+@pytest.mark.parametrize("content", ["- a\n- b\n", "t: not_a_mapping\n"])
+def test_load_schema_snapshot_rejects_malformed_file(tmp_path: Path, content: str) -> None:
+    path = tmp_path / "snapshot.yaml"
+    path.write_text(content)
+    with pytest.raises(ConfigurationError, match="Schema snapshot"):
+        load_schema_snapshot(path)
+
+
+def test_load_schema_snapshot_missing_file(tmp_path: Path) -> None:
+    with pytest.raises(ConfigurationError, match="not found"):
+        load_schema_snapshot(tmp_path / "missing.yaml")
+
+
+def _pipeline_payload() -> dict:
+    return {
+        "mapping": {"entities": {"patients": {"table": "t", "columns": {"person_id": "pid"}}}},
+        "pipeline": {
+            "name": "p",
+            "version": "v",
+            "spine": {"entity": "patients", "key": "person_id", "columns": ["person_id"]},
+            "output": {"table": "o"},
+        },
+    }
+
+
+def test_load_pipeline_document_reads_json(tmp_path: Path) -> None:
+    import json
+
+    path = tmp_path / "pipeline.json"
+    path.write_text(json.dumps(_pipeline_payload()))
+    assert load_pipeline_document(path).pipeline.name == "p"
+
+    path.write_text("{not json")
+    with pytest.raises(ConfigurationError, match="Invalid JSON"):
+        load_pipeline_document(path)
+
+
+def test_load_pipeline_document_cache_skips_validation(tmp_path: Path, monkeypatch) -> None:
+    from spark_preprocessor.schema import PipelineDocument
+
+    path = tmp_path / "pipeline.yaml"
+    path.write_text(yaml.safe_dump(_pipeline_payload()))
+    cache_dir = tmp_path / "cache"
+    first = load_pipeline_document(path, cache_dir=cache_dir)
+    [entry] = cache_dir.iterdir()
+
+    def no_validation(_data):
+        raise AssertionError("cached documents are not validated again")
+
+    monkeypatch.setattr(PipelineDocument, "model_validate", no_validation)
+    assert load_pipeline_document(path, cache_dir=cache_dir) == first
+
+    # Corrupt or invalid entries are misses; an edited file has a new key.
+    monkeypatch.undo()
+    header = entry.read_text().split("\n", 1)[0]
+    for garbage in ("garbage", header + "\n{\"pipeline\": 1}", "{}\n{}"):
+        entry.write_text(garbage)
+        assert load_pipeline_document(path, cache_dir=cache_dir) == first
+    payload = _pipeline_payload()
+    payload["pipeline"]["version"] = "v2"
+    path.write_text(yaml.safe_dump(payload))
+    assert load_pipeline_document(path, cache_dir=cache_dir).pipeline.version == "v2"
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def _write_mapping(path: Path, entities: dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump({"entities": entities}))
+    return path
+
+
+def _pipeline_with_mapping(path: Path, mapping: object) -> Path:
+    payload = _pipeline_payload()
+    payload["mapping"] = mapping
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(payload))
+    return path
+
+
+def test_mapping_include_is_shared_across_pipelines(tmp_path: Path) -> None:
+    _write_mapping(tmp_path / "mappings" / "client.yaml", {"patients": {"table": "t", "columns": {"person_id": "pid"}}})
+    first = _pipeline_with_mapping(tmp_path / "a" / "pipeline.yaml", {"include": "../mappings/client.yaml"})
+    second = _pipeline_with_mapping(tmp_path / "b" / "pipeline.yaml", {"include": ["../mappings/client.yaml"]})
+
+    documents = [load_pipeline_document(first), load_pipeline_document(second)]
+    assert documents[0].mapping is documents[1].mapping
+    assert documents[1].mapping_files == (tmp_path / "b" / "../mappings/client.yaml",)
+
+
+def test_mapping_include_merges_files_and_overrides(tmp_path: Path) -> None:
+    _write_mapping(
+        tmp_path / "base.yaml",
+        {
+            "patients": {"table": "t", "columns": {"person_id": "pid", "date_of_birth": "dob"}},
+            "claims": {"table": "claims_v1", "columns": {"person_id": "pid"}},
+            "labs": {"table": "labs", "columns": {"person_id": "pid"}},
+        },
+    )
+    _write_mapping(tmp_path / "client.yaml", {"claims": {"table": "claims_v2", "columns": {"person_id": "member"}}})
+    path = _pipeline_with_mapping(
+        tmp_path / "pipeline.yaml",
+        {
+            "include": ["base.yaml", "client.yaml"],
+            "entities": {
+                "patients": {"columns": {"date_of_birth": "birth_dt"}, "types": {"date_of_birth": "DATE"}},
+                "labs": None,
+            },
+        },
+    )
+
+    mapping = load_pipeline_document(path).mapping
+    assert set(mapping.entities) == {"patients", "claims"}
+    assert mapping.entity_columns("patients") == {"person_id": "pid", "date_of_birth": "birth_dt"}
+    assert mapping.entity_types("patients") == {"date_of_birth": "DATE"}
+    assert mapping.entity_table("claims") == "claims_v2"
+
+
+@pytest.mark.parametrize(
+    ("mapping", "match"),
+    [
+        ({"include": 3}, "mapping.include must be"),
+        ({"include": "base.yaml", "tables": {}}, "Unknown keys next to mapping.include"),
+        ({"include": "missing.yaml"}, "Mapping file not found"),
+        ({"include": "base.yaml", "entities": {"patients": {"table": 1}}}, "override for entities.patients"),
+        ({"include": "nested.yaml"}, "cannot include other mapping files"),
+    ],
+)
+def test_mapping_include_errors(tmp_path: Path, mapping: dict, match: str) -> None:
+    _write_mapping(tmp_path / "base.yaml", {"patients": {"table": "t", "columns": {"person_id": "pid"}}})
+    (tmp_path / "nested.yaml").write_text(yaml.safe_dump({"include": "base.yaml"}))
+    with pytest.raises(ConfigurationError, match=match):
+        load_pipeline_document(_pipeline_with_mapping(tmp_path / "pipeline.yaml", mapping))
+
+
+def test_document_cache_checks_included_mapping(tmp_path: Path) -> None:
+    mapping_path = _write_mapping(tmp_path / "mapping.yaml", {"patients": {"table": "t1", "columns": {"person_id": "pid"}}})
+    path = _pipeline_with_mapping(tmp_path / "pipeline.yaml", {"include": "mapping.yaml"})
+    cache_dir = tmp_path / "cache"
+    assert load_pipeline_document(path, cache_dir=cache_dir).mapping.entity_table("patients") == "t1"
+    cached = load_pipeline_document(path, cache_dir=cache_dir)
+    assert cached.mapping_files == (tmp_path / "mapping.yaml",)
+
+    _write_mapping(mapping_path, {"patients": {"table": "t2", "columns": {"person_id": "pid"}}})
+    assert load_pipeline_document(path, cache_dir=cache_dir).mapping.entity_table("patients") == "t2"
+
+
+@pytest.mark.parametrize(
+    ("ignore", "expectation"),
+    [
+        (["cross-join", "udf-call"], does_not_raise()),
+        (["cross_join"], pytest.raises(ConfigurationError, match=r"Unknown lint rule ids in lint.ignore: \['cross_join'\]")),
+    ],
+)
+def test_lint_config_rejects_unknown_rule_ids(ignore: list[str], expectation) -> None:
+    with expectation:
+        assert LintConfig(ignore=ignore).ignore == ignore
@@ -6,6 +6,8 @@ def test_default_semantic_contract_has_expected_required_columns() -> None:
     assert contract.version == "v1"
     assert "lower_snake_case" in contract.naming_rules
     assert contract.required_for("patients") == frozenset({"person_id"})
+    assert contract.recommended_type("encounters", "person_id") == "STRING"
+    assert contract.recommended_type("patients", "date_of_birth") == "DATE"
 
 
 def test_semantic_contract_helpers_default_to_empty_or_none() -> None:
@@ -0,0 +1,26 @@
+from datetime import UTC, datetime, timedelta
+
+from spark_preprocessor.runtime.shared_tables import (
+    SharedTableRecord,
+    is_fresh,
+    registry_table,
+)
+
+
+def test_registry_table_follows_environment_schema() -> None:
+    assert (
+        registry_table("shared_features.rows__abc", None)
+        == "shared_features.shared_table_registry"
+    )
+    assert (
+        registry_table("shared_features.rows__abc", "dev")
+        == "shared_features__dev.shared_table_registry"
+    )
+
+
+def test_is_fresh_compares_age_with_limit() -> None:
+    hour_ago = (datetime.now(UTC) - timedelta(hours=1)).isoformat()
+    record = SharedTableRecord(row_count=1, materialized_at=hour_ago)
+
+    assert is_fresh(record, 7200)
+    assert not is_fresh(record, 60)
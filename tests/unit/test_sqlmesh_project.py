@@ -2,10 +2,15 @@ import yaml
 
 from spark_preprocessor.features.base import SqlmeshModelSpec
 from spark_preprocessor.sqlmesh_project import (
+    DuckDBGatewayConfig,
     SqlmeshConfig,
+    render_external_models,
     render_models,
+    render_row_count_audit,
     render_sqlmesh_config,
     render_sqlmesh_model,
+    row_count_audit,
+    unique_audit,
 )
 
 
@@ -31,10 +36,56 @@ def test_render_sqlmesh_model_renders_tags() -> None:
     assert "tags [a, b]" in text
 
 
+def test_render_sqlmesh_model_renders_columns() -> None:
+    spec = SqlmeshModelSpec(
+        name="semantic.patients",
+        sql="SELECT 1 AS x",
+        kind="VIEW",
+        tags=[],
+        columns={"x": "INT", "y": "STRING"},
+    )
+    text = render_sqlmesh_model(spec)
+    assert "columns (\n    x INT,\n    y STRING\n  )" in text
+
+
+def test_render_sqlmesh_model_renders_audits() -> None:
+    spec = SqlmeshModelSpec(
+        name="marts.out",
+        sql="SELECT 1 AS x",
+        kind="TABLE",
+        tags=[],
+        audits=[unique_audit(["x", "y"]), row_count_audit("semantic.patients")],
+    )
+    text = render_sqlmesh_model(spec)
+    assert (
+        "audits (\n"
+        "    unique_combination_of_columns(columns := (x, y)),\n"
+        "    assert_row_count_matches_spine(spine := semantic.patients)\n"
+        "  )"
+    ) in text
+    assert render_row_count_audit().startswith(
+        "AUDIT (\n  name assert_row_count_matches_spine\n);"
+    )
+
+
 def test_render_sqlmesh_config_has_expected_shape() -> None:
     payload = yaml.safe_load(render_sqlmesh_config(SqlmeshConfig()))
     assert payload["model_defaults"]["dialect"] == "spark"
     assert payload["engine"]["type"] == "databricks"
+    assert "gateways" not in payload
+
+
+def test_render_sqlmesh_config_renders_duckdb_gateway() -> None:
+    config = SqlmeshConfig(
+        duckdb=DuckDBGatewayConfig(database="local.duckdb", threads=4)
+    )
+    payload = yaml.safe_load(render_sqlmesh_config(config))
+    assert payload["engine"]["type"] == "databricks"
+    assert payload["gateways"]["duckdb"]["connection"] == {
+        "type": "duckdb",
+        "database": "local.duckdb",
+        "connector_config": {"threads": 4},
+    }
 
 
 def test_render_models_renders_mapping() -> None:
@@ -44,3 +95,8 @@ def test_render_models_renders_mapping() -> None:
     ]
     rendered = render_models(specs)
     assert set(rendered.keys()) == {"a", "b"}
+
+
+def test_render_external_models_renders_list() -> None:
+    text = render_external_models([{"name": "raw.t", "columns": {"a": "INT"}}])
+    assert yaml.safe_load(text) == [{"name": "raw.t", "columns": {"a": "INT"}}]
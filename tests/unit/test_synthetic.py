@@ -0,0 +1,115 @@
+import json
+from collections import Counter
+from pathlib import Path
+
+import pyarrow.dataset as ds
+import pytest
+
+from spark_preprocessor.errors import ConfigurationError
+from spark_preprocessor.schema import MappingSpec
+from spark_preprocessor.semantic_contract import default_semantic_contract
+from spark_preprocessor.synthetic import (
+    ENTITY_COLUMNS,
+    FORMAT_VERSION,
+    CardinalityProfile,
+    entity_columns,
+    generate_dataset,
+    synthetic_mapping,
+)
+
+
+def _read(path: Path, entity: str):
+    return ds.dataset(path / entity, format="parquet", partitioning="hive").to_table()
+
+
+def test_generate_dataset_writes_partitioned_parquet_in_chunks(tmp_path: Path) -> None:
+    summary = generate_dataset(tmp_path, persons=250, seed=3, chunk_size=100)
+
+    assert summary.row_counts["patients"] == 250
+    assert summary.row_counts["insurance"] >= 250
+    assert sorted(p.name for p in (tmp_path / "patients").iterdir()) == [
+        "chunk=0",
+        "chunk=1",
+        "chunk=2",
+    ]
+    assert all(p.name.startswith("year=") for p in (tmp_path / "encounters").iterdir())
+    written = json.loads((tmp_path / "synthetic.json").read_text())
+    assert written["row_counts"] == summary.row_counts
+    assert written["format_version"] == FORMAT_VERSION
+    assert written["profiles"]["encounters"] == {
+        "mean": 12.0,
+        "dispersion": 0.8,
+        "minimum": 0,
+    }
+
+    patients = _read(tmp_path, "patients")
+    assert patients.num_rows == 250
+    assert len(set(patients.column("person_id").to_pylist())) == 250
+    encounters = _read(tmp_path, "encounters")
+    assert encounters.num_rows == summary.row_counts["encounters"]
+    assert set(encounters.column("person_id").to_pylist()) <= set(
+        patients.column("person_id").to_pylist()
+    )
+    assert (
+        len(set(encounters.column("encounter_id").to_pylist())) == encounters.num_rows
+    )
+
+
+def test_generate_dataset_is_reproducible_and_subset_independent(
+    tmp_path: Path,
+) -> None:
+    generate_dataset(tmp_path / "a", persons=120, seed=11, chunk_size=50)
+    generate_dataset(
+        tmp_path / "b", persons=120, seed=11, chunk_size=50, entities=["medications"]
+    )
+    generate_dataset(
+        tmp_path / "c", persons=120, seed=12, chunk_size=50, entities=["medications"]
+    )
+
+    first = _read(tmp_path / "a", "medications").sort_by("order_id")
+    assert first.equals(_read(tmp_path / "b", "medications").sort_by("order_id"))
+    assert not first.equals(_read(tmp_path / "c", "medications").sort_by("order_id"))
+    assert not (tmp_path / "b" / "patients").exists()
+
+
+def test_generate_dataset_ranks_codes_once_across_chunks(tmp_path: Path) -> None:
+    import pyarrow.parquet as pq
+
+    generate_dataset(
+        tmp_path, persons=2000, seed=5, chunk_size=500, entities=["diagnoses"]
+    )
+
+    top_codes = []
+    for chunk in range(4):
+        counts = Counter()
+        for part in (tmp_path / "diagnoses").glob(f"*/part-{chunk:05d}.parquet"):
+            counts.update(pq.read_table(part).column("icd10_code").to_pylist())
+        top_codes.append({code for code, _ in counts.most_common(3)})
+    assert all(codes == top_codes[0] for codes in top_codes)
+
+
+def test_generate_dataset_applies_cardinality_profiles(tmp_path: Path) -> None:
+    summary = generate_dataset(
+        tmp_path,
+        persons=50,
+        entities=["procedures"],
+        profiles={
+            "procedures": CardinalityProfile(mean=2.0, dispersion=1.0, minimum=2)
+        },
+    )
+    assert summary.row_counts == {"procedures": 100}
+
+
+def test_generate_dataset_rejects_unknown_entities(tmp_path: Path) -> None:
+    with pytest.raises(ConfigurationError, match="Unknown synthetic entities"):
+        generate_dataset(tmp_path, persons=1, entities=["labs"])
+
+
+def test_synthetic_mapping_covers_contract_entities() -> None:
+    assert set(ENTITY_COLUMNS) == set(default_semantic_contract().required_columns)
+    mapping = MappingSpec.model_validate(synthetic_mapping())
+    assert mapping.entity_table("encounters") == "synthetic.encounters"
+    assert "year" not in entity_columns("encounters")
+    assert all(
+        "person_id" in mapping.entity_columns(entity) for entity in ENTITY_COLUMNS
+    )
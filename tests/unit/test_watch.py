@@ -0,0 +1,6 @@
+from spark_preprocessor.watch import _line_summary
+
+
+def test_line_summary_counts_changed_lines() -> None:
+    assert _line_summary("a\nb\n", "a\nc\nd\n") == "+2 -1"
+    assert _line_summary("a\n", "a") == ""